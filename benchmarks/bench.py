@@ -0,0 +1,262 @@
+"""
+Замеры солверов на уравнениях из README: время, число вычислений правой части,
+пиковая память и погрешность относительно точного (или эталонного) решения.
+По строкам для разных n (rtol) одного метода строится диаграмма "точность - затраты".
+
+    python -m benchmarks.bench                      # все замеры
+    python -m benchmarks.bench --quick              # малые n
+    python -m benchmarks.bench --csv results.csv    # сохранить таблицу
+    python -m benchmarks.bench --save base.json     # запомнить результаты
+    python -m benchmarks.bench --compare base.json  # сравнить с запомненными (регрессии)
+"""
+import argparse
+import functools
+import csv
+import json
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+import sympy as sp
+
+from kernel import cache
+from kernel.adaptive import dopri5, cash_karp
+from kernel.auto import auto, auto_solve
+from kernel.bdf import bdf, bdf_solve
+from kernel.high_ord_solver import high_order_solve
+from kernel.rosenbrock import ros_solve, rosenbrock, symbolic, METHODS
+from kernel.slope_field import slope_field
+from kernel.stats import SolveStats
+from kernel.solvers import euler, erk1, erk2, erk3, erk4, rk5, rk8, ros1, system, adams_bashforth, \
+    adams_bashforth_moulton
+
+
+FIXED_STEP = {"euler": euler, "erk1": erk1, "erk2": erk2, "erk3": erk3, "erk4": erk4, "rk5": rk5, "rk8": rk8,
+              "ab4": functools.partial(adams_bashforth, order=4),
+              "abm4": functools.partial(adams_bashforth_moulton, order=4)}
+ADAPTIVE = {"dopri5": dopri5, "cash-karp": cash_karp}
+
+# Время считается лучшим из REPEATS запусков после прогревочного (компиляция numba)
+REPEATS = 3
+# Замедление больше этого считается регрессией при --compare
+TIME_TOLERANCE = 1.25
+
+
+class Counter:
+    """Обертка над функцией, считающая число ее вызовов."""
+
+    def __init__(self, func):
+        self.func = func
+        self.calls = 0
+
+    def __call__(self, *args):
+        self.calls += 1
+        return self.func(*args)
+
+
+class Problem:
+    """
+    Тестовое уравнение y' = f(x, y) с точным решением exact(x) (или None - тогда эталон
+    считается dopri5 с rtol=1E-12).
+    """
+
+    def __init__(self, name, f_str, interval, y0, exact=None, component=None):
+        self.name = name
+        self.f_str = f_str
+        self.interval = interval
+        self.y0 = y0
+        self.component = component  # для систем погрешность считается по этой компоненте
+
+        if isinstance(f_str, str):
+            x, y = sp.symbols('x y')
+            self.f = cache.lambdify((x, y), cache.sympify(f_str))
+        else:
+            self.f = system(f_str)[0]
+
+        if exact is None:
+            reference = dopri5(self.f, interval, y0, rtol=1E-12, atol=1E-14, dense=True)[3]
+            exact = lambda X: reference(X)
+        self.exact = exact
+
+    def error(self, X, Y) -> float:
+        Y = np.asarray(Y)
+        exact = np.asarray(self.exact(np.asarray(X)))
+        if self.component is not None:
+            Y = Y[:, self.component]
+            exact = exact[..., self.component] if exact.ndim > 1 else exact
+        return float(np.max(np.abs(Y - exact)))
+
+
+PROBLEMS = [
+    Problem("cos(x)+sin(y)", "cos(x) + sin(y)", (0., 10.), 1.),
+    Problem("stiff linear", "-50*(y - cos(x))", (0., 2.), 0.,
+            exact=lambda X: (2500 * np.cos(X) + 50 * np.sin(X) - 2500 * np.exp(-50 * X)) / 2501),
+    Problem("harmonic oscillator", ["y2", "-4*y1"], (0., 10.), np.array([0., 1.]),
+            exact=lambda X: np.sin(2 * X) / 2, component=0),
+]
+
+# Уравнение высшего порядка из README: y'' + 4y = 0, y(0) = 0, y'(0) = 1
+HIGH_ORDER = ("y_2 + 4*y", (0., 10.), (0., 1., 0.), lambda X: np.sin(2 * X) / 2)
+
+
+def measure(run):
+    """
+    :param run: функция без аргументов, запускающая солвер
+    :return: результат, лучшее время (с), пиковая память (МБ)
+    """
+    result = run()  # прогрев
+    best = np.inf
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        result = run()
+        best = min(best, time.perf_counter() - start)
+
+    tracemalloc.start()
+    run()
+    peak = tracemalloc.get_traced_memory()[1] / 2 ** 20
+    tracemalloc.stop()
+    return result, best, peak
+
+
+def row(problem, method, size, seconds, rhs, jac, peak, error):
+    return {"problem": problem, "method": method, "n": size, "time": seconds, "rhs": rhs, "jac": jac,
+            "peak_mb": peak, "error": error}
+
+
+def bench_fixed_step(problem, sizes):
+    for name, solver in FIXED_STEP.items():
+        for n in sizes:
+            (X, Y, _), seconds, peak = measure(lambda: solver(problem.f, problem.interval, problem.y0, n))
+            f = Counter(problem.f)
+            solver(f, problem.interval, problem.y0, n)
+            yield row(problem.name, name, n, seconds, f.calls, 0, peak, problem.error(X, Y))
+
+
+def bench_ros1(problem, sizes):
+    for n in sizes:
+        (X, Y, _), seconds, peak = measure(lambda: ros1(problem.f_str, problem.interval, problem.y0, .5, n))
+        # ros1 строит f по строке сам - вычисления считает он же
+        stats = SolveStats()
+        ros1(problem.f_str, problem.interval, problem.y0, .5, n, stats=stats)
+        yield row(problem.name, "ros1", n, seconds, stats.f_evals, stats.jac_evals, peak, problem.error(X, Y))
+
+
+def bench_adaptive(problem, tolerances):
+    for name, solver in ADAPTIVE.items():
+        for rtol in tolerances:
+            (X, Y, _), seconds, peak = measure(lambda: solver(problem.f, problem.interval, problem.y0,
+                                                              rtol=rtol, atol=rtol * 1E-3))
+            f = Counter(problem.f)
+            solver(f, problem.interval, problem.y0, rtol=rtol, atol=rtol * 1E-3)
+            yield row(problem.name, name, f"rtol={rtol:g}", seconds, f.calls, 0, peak, problem.error(X, Y))
+
+    f_sym, jac_sym, dfdx = symbolic(problem.f_str)
+    for name, tableau in METHODS.items():
+        for rtol in tolerances:
+            (X, Y, _), seconds, peak = measure(lambda: ros_solve(problem.f_str, problem.interval, problem.y0, name,
+                                                                 rtol=rtol, atol=rtol * 1E-3))
+            f, jac = Counter(f_sym), Counter(jac_sym)
+            rosenbrock(f, jac, problem.interval, problem.y0, tableau, rtol=rtol, atol=rtol * 1E-3, dfdx=dfdx)
+            yield row(problem.name, name, f"rtol={rtol:g}", seconds, f.calls, jac.calls, peak, problem.error(X, Y))
+
+    for rtol in tolerances:
+        (X, Y, _), seconds, peak = measure(lambda: bdf_solve(problem.f_str, problem.interval, problem.y0,
+                                                             rtol=rtol, atol=rtol * 1E-3))
+        f, jac = Counter(f_sym), Counter(jac_sym)
+        bdf(f, jac, problem.interval, problem.y0, rtol=rtol, atol=rtol * 1E-3)
+        yield row(problem.name, "bdf", f"rtol={rtol:g}", seconds, f.calls, jac.calls, peak, problem.error(X, Y))
+
+    for rtol in tolerances:
+        (X, Y, _), seconds, peak = measure(lambda: auto_solve(problem.f_str, problem.interval, problem.y0,
+                                                              rtol=rtol, atol=rtol * 1E-3))
+        f, jac = Counter(f_sym), Counter(jac_sym)
+        auto(f, jac, problem.interval, problem.y0, rtol=rtol, atol=rtol * 1E-3, dfdx=dfdx)
+        yield row(problem.name, "auto", f"rtol={rtol:g}", seconds, f.calls, jac.calls, peak, problem.error(X, Y))
+
+
+def bench_high_order(sizes):
+    F, interval, y0, exact = HIGH_ORDER
+    for n in sizes:
+        (X, Y, _), seconds, peak = measure(lambda: high_order_solve(2, F, interval, y0, n))
+        error = float(np.max(np.abs(Y - exact(X))))
+        stats = SolveStats()
+        high_order_solve(2, F, interval, y0, n, stats=stats)
+        yield row("y''+4y=0", "high_order_solve", n, seconds, stats.f_evals, stats.jac_evals, peak, error)
+
+
+def bench_slope_field(sizes):
+    x, y = sp.symbols('x y')
+    f = cache.lambdify((x, y), cache.sympify("cos(x) + sin(y)"))
+    for nx in sizes:
+        _, seconds, peak = measure(lambda: slope_field(f, (-10, 10, -10, 10), nx, nx))
+        yield row("cos(x)+sin(y)", "slope_field", f"{nx}x{nx}", seconds, nx * nx, 0, peak, float("nan"))
+
+
+def run_all(quick: bool = False):
+    sizes = [100, 1000] if quick else [100, 1000, 10000, 100000]
+    tolerances = [1E-3, 1E-6] if quick else [1E-3, 1E-6, 1E-9]
+    fields = [50, 200] if quick else [50, 200, 1000]
+
+    for problem in PROBLEMS:
+        yield from bench_fixed_step(problem, sizes)
+        yield from bench_ros1(problem, sizes)
+        yield from bench_adaptive(problem, tolerances)
+    yield from bench_high_order(sizes)
+    yield from bench_slope_field(fields)
+
+
+def print_row(r, file=sys.stdout):
+    print(f"{r['problem']:<20} {r['method']:<17} {str(r['n']):>11} {r['time']:>10.4f} {r['rhs']:>9} "
+          f"{r['jac']:>8} {r['peak_mb']:>9.2f} {r['error']:>10.2e}", file=file)
+
+
+def compare(rows, baseline_path):
+    """Сравнивает с сохраненными результатами; возвращает число регрессий."""
+    with open(baseline_path) as file:
+        baseline = {(r["problem"], r["method"], str(r["n"])): r for r in json.load(file)}
+
+    regressions = 0
+    for r in rows:
+        old = baseline.get((r["problem"], r["method"], str(r["n"])))
+        if old is None:
+            continue
+        slower = r["time"] > TIME_TOLERANCE * old["time"]
+        less_accurate = r["error"] > 2 * old["error"] + 1E-15
+        if slower or less_accurate:
+            regressions += 1
+            print(f"РЕГРЕССИЯ {r['problem']} {r['method']} {r['n']}: время {old['time']:.4f} -> {r['time']:.4f}, "
+                  f"погрешность {old['error']:.2e} -> {r['error']:.2e}", file=sys.stderr)
+    return regressions
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.bench")
+    parser.add_argument("--quick", action="store_true", help="только малые n")
+    parser.add_argument("--csv", help="записать таблицу в CSV")
+    parser.add_argument("--save", help="сохранить результаты (JSON) для --compare")
+    parser.add_argument("--compare", help="сравнить с сохраненными результатами")
+    args = parser.parse_args(argv)
+
+    print(f"{'problem':<20} {'method':<17} {'n':>11} {'time, s':>10} {'rhs':>9} {'jac':>8} {'peak, MB':>9} "
+          f"{'error':>10}")
+    rows = []
+    for r in run_all(args.quick):
+        print_row(r)
+        rows.append(r)
+
+    if args.csv:
+        with open(args.csv, "w", newline="") as file:
+            writer = csv.DictWriter(file, fieldnames=list(rows[0]))
+            writer.writeheader()
+            writer.writerows(rows)
+    if args.save:
+        with open(args.save, "w") as file:
+            json.dump(rows, file, indent=1)
+    if args.compare:
+        return 1 if compare(rows, args.compare) else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -16,5 +16,10 @@ FIELDS_MINHEIGHT = 60
 
 SOLVE_BTN_COLOR = "#32CD32"
 
+VIEW_UPDATE_DELAY = 50  # ms, задержка пересчета поля направлений после сдвига/масштабирования
+
+
+EXPORT_FILTER = "NumPy (*.npy);;HDF5 (*.h5);;Parquet (*.parquet)"
+
 
 EPS = 1E-6
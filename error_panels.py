@@ -58,3 +58,20 @@ def invalid_y0_substitute():
     panel.setStandardButtons(QMessageBox.Ok)
     retval = panel.exec_()
 
+
+def solver_failed(message):
+    panel = QMessageBox()
+    panel.setIcon(QMessageBox.Critical)
+    panel.setWindowTitle("ODESolver: ошибка")
+    panel.setText("Не удалось решить уравнение:\n" + message)
+    panel.setStandardButtons(QMessageBox.Ok)
+    retval = panel.exec_()
+
+
+def export_failed(message):
+    panel = QMessageBox()
+    panel.setIcon(QMessageBox.Critical)
+    panel.setWindowTitle("ODESolver: ошибка")
+    panel.setText("Не удалось сохранить решение:\n" + message)
+    panel.setStandardButtons(QMessageBox.Ok)
+    retval = panel.exec_()
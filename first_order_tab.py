@@ -7,19 +7,23 @@ from numpy import e, pi
 
 
 from error_panels import *
-from kernel.solvers import *
+from workers import SolverRunner
+from views import SolutionViews
 from config import *
 
 
 label_font = QFont(LABELS_FONT, LABELS_FONTSIZE)
 field_font = QFont(FIELDS_FONT, FIELDS_FONTSIZE)
 
+ADAPTIVE_METHODS = ["auto", "dopri5", "cash-karp", "ros2", "ros3", "rodas3", "bdf"]
+
 
 class FirstOrderTab(QWidget):
     def __init__(self):
         super().__init__()
         self.layout = QGridLayout()
         self.solution = None  # contains a solution of given equation with current interval and initial condition
+        self.equation = None  # kernel.equation.Equation of the last solve (its stats are shown under the runner)
 
         self.input = FirstOrderInput()
 
@@ -31,11 +35,20 @@ class FirstOrderTab(QWidget):
                                      "; color: black; border: none}")
 
 
+        self.runner = SolverRunner()
+        self.runner.busy.connect(self.solve_btn.setDisabled)
+
+        self.stats_label = QLabel(self)
+        self.stats_label.setFont(label_font)
+
         self.plot = FirstOrderPlot()
         self.plot.select_axes.currentIndexChanged.connect(self.change_axes)
+        self.plot.export_btn.clicked.connect(self.export)
 
         self.layout.addWidget(self.input, 0, 0)
         self.layout.addWidget(self.solve_btn, 1, 0)
+        self.layout.addWidget(self.runner, 2, 0)
+        self.layout.addWidget(self.stats_label, 3, 0)
         self.layout.addWidget(self.plot, 0, 1)
 
         self.layout.setColumnStretch(1, PLOT_WIDTH_RATIO)
@@ -47,42 +60,57 @@ class FirstOrderTab(QWidget):
 
     def solve(self):
         try:
-            f_str, f, x0, x1, y0, n, method, alpha = self.parse_input()
+            f_str, f, x0, x1, y0, n, method, alpha, rtol = self.parse_input()
         except TypeError:
             return
 
-        if method == "erk4":
-            self.solution = erk4(f, (x0, x1), y0, n)
-        elif method == "erk3":
-            self.solution = erk3(f, (x0, x1), y0, n)
-        elif method == "erk2":
-            self.solution = erk2(f, (x0, x1), y0, n)
-        elif method == "erk1":
-            self.solution = erk1(f, (x0, x1), y0, n)
-        elif method == "ros1":
-            self.solution = ros1(f_str, (x0, x1), y0, alpha, n)
+        # солверы и sympy загружаются при первом решении, а не при запуске приложения (см. main.py)
+        from kernel.equation import Equation
+
+        self.equation = Equation(f_str)
+        if method == "ros1":
+            method, options = "rosenbrock", dict(alpha=alpha)
+        elif method in ADAPTIVE_METHODS:
+            options = dict(rtol=rtol, atol=rtol * 1E-3)
+        else:
+            options = {}
+
+        self.runner.start(self.show_solution, self.equation.solve, method, (x0, x1), y0, n, True, **options)
+
+    def show_solution(self, solution):
+        self.solution = solution
+        self.stats_label.setText(str(self.equation.stats))
 
         self.plot.select_axes.setCurrentIndex(0)
-        self.plot.figure.clear()
-        ax = self.plot.figure.add_subplot(111)
-        ax.plot(self.solution[0], self.solution[1])
-        ax.grid(True)
-        ax.set_xlabel("x")
-        ax.set_ylabel("y")
-        self.plot.canvas.draw()
+        self.plot.views.show(self.solution)
+
+    def export(self):
+        if self.solution is None:
+            return
+
+        path, _ = QFileDialog.getSaveFileName(self, "Экспорт решения", "solution.npy", EXPORT_FILTER)
+        if not path:
+            return
+        from kernel import store
+        try:
+            store.save_solution(path, self.solution)
+        except (ImportError, ValueError, OSError) as error:
+            export_failed(str(error))
 
     def parse_input(self):
         """
-        :return: f_str, f, x0, x1, y0, n, method, alpha
+        :return: f_str, f, x0, x1, y0, n, method, alpha, rtol
         """
+        import sympy as sp
+        from kernel import cache
 
         # get f
         f_str = self.input.f_input.text()
         f_str = f_str.replace('pi', str(pi))
         try:
             x, y = sp.symbols('x y')
-            f_sym= sp.sympify(f_str)
-            f_func = sp.lambdify((x, y), f_sym, 'numpy')
+            f_sym = cache.sympify(f_str)
+            f_func = cache.lambdify((x, y), f_sym)
         except sp.SympifyError:
             invalid_f_input()
             return None
@@ -133,37 +161,26 @@ class FirstOrderTab(QWidget):
             alpha = -1
 
 
-        return f_str, f_func, x0, x1, y0, n, method, alpha
+        # get rtol
+        rtol = -1
+        if method in ADAPTIVE_METHODS:
+            try:
+                rtol = float(self.input.rtol_input.text())
+            except ValueError:
+                invalid_add_settings()
+                return None
+            if rtol <= 0:
+                invalid_add_settings()
+                return None
+
+
+        return f_str, f_func, x0, x1, y0, n, method, alpha, rtol
 
     def change_axes(self):
         if self.solution is None:
             return
 
-        axes_idx = self.plot.select_axes.currentIndex()
-        if axes_idx == 0:
-            self.plot.figure.clear()
-            ax = self.plot.figure.add_subplot(111)
-            ax.plot(self.solution[0], self.solution[1])
-            ax.grid(True)
-            ax.set_xlabel("x")
-            ax.set_ylabel("y")
-            self.plot.canvas.draw()
-        elif axes_idx == 1:
-            self.plot.figure.clear()
-            ax = self.plot.figure.add_subplot(111)
-            ax.plot(self.solution[1], self.solution[2])
-            ax.grid(True)
-            ax.set_xlabel("y")
-            ax.set_ylabel("y'")
-            self.plot.canvas.draw()
-        else:
-            self.plot.figure.clear()
-            ax = self.plot.figure.add_subplot(111)
-            ax.plot(self.solution[0], self.solution[2])
-            ax.grid(True)
-            ax.set_xlabel("x")
-            ax.set_ylabel("y'")
-            self.plot.canvas.draw()
+        self.plot.views.select(self.plot.select_axes.currentIndex())
 
 
 class FirstOrderInput(QWidget):
@@ -195,6 +212,7 @@ class FirstOrderInput(QWidget):
 
         self.method_input = None
         self.alpha_input = None
+        self.rtol_input = None
 
         add_settings = self.init_additional_settings()
         add_settings.setCheckable(True)
@@ -297,8 +315,9 @@ class FirstOrderInput(QWidget):
         method_txt.setFont(label_font)
         self.method_input = QComboBox(add_settings)
         self.method_input.setFont(field_font)
-        self.method_input.addItems(["erk4", "erk3", "erk2", "erk1", "ros1"])
+        self.method_input.addItems(["erk4", "erk3", "erk2", "erk1", "rk5", "rk8", "ab4", "abm4", "ros1"] + ADAPTIVE_METHODS)
         self.method_input.currentIndexChanged.connect(self.enable_alpha_select)
+        self.method_input.currentIndexChanged.connect(self.enable_rtol_input)
 
         alpha_txt = QLabel("Параметр alpha (для схемы ros1)", add_settings)
         alpha_txt.setFont(label_font)
@@ -309,8 +328,16 @@ class FirstOrderInput(QWidget):
 
         add_settings_layout.addWidget(method_txt, 0, 0)
         add_settings_layout.addWidget(self.method_input, 0, 1)
+        rtol_txt = QLabel("Точность rtol (для адаптивных методов)", add_settings)
+        rtol_txt.setFont(label_font)
+        self.rtol_input = QLineEdit("1E-6", add_settings)
+        self.rtol_input.setFont(field_font)
+        self.rtol_input.setEnabled(False)
+
         add_settings_layout.addWidget(alpha_txt, 2, 0)
         add_settings_layout.addWidget(self.alpha_input, 2, 1)
+        add_settings_layout.addWidget(rtol_txt, 3, 0)
+        add_settings_layout.addWidget(self.rtol_input, 3, 1)
 
         add_settings.setLayout(add_settings_layout)
 
@@ -323,6 +350,10 @@ class FirstOrderInput(QWidget):
         else:
             self.alpha_input.setEnabled(False)
 
+    def enable_rtol_input(self):
+        m = self.method_input.currentText()
+        self.rtol_input.setEnabled(m in ADAPTIVE_METHODS)
+
 
 class FirstOrderPlot(QWidget):
     def __init__(self):
@@ -336,9 +367,14 @@ class FirstOrderPlot(QWidget):
         self.figure = Figure()
         self.canvas = FigureCanvas(self.figure)
         self.toolbar = NavigationToolbar(self.canvas, self)
+        self.views = SolutionViews(self.canvas, self.toolbar)
+
+        self.export_btn = QPushButton("ЭКСПОРТ", self)
+        self.export_btn.setFont(label_font)
 
         layout.addWidget(self.select_axes)
         layout.addWidget(self.canvas)
         layout.addWidget(self.toolbar)
+        layout.addWidget(self.export_btn)
 
         self.setLayout(layout)
@@ -4,11 +4,11 @@ from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
 from matplotlib.backends.backend_qt5agg import NavigationToolbar2QT as NavigationToolbar
 from matplotlib.figure import Figure
 from numpy import pi
-import sympy as sp
 
-from kernel.high_ord_solver import high_order_solve
+from views import SolutionViews
 from config import *
 from error_panels import *
+from workers import SolverRunner
 
 
 label_font = QFont(LABELS_FONT, LABELS_FONTSIZE)
@@ -20,6 +20,7 @@ class HighOrderTab(QWidget):
         super().__init__()
         self.layout = QGridLayout()
         self.solution = None  # contains a solution of given equation with current interval and initial condition
+        self.stats = None  # kernel.stats.SolveStats of the last solve
 
         self.input = HighOrderInput()
 
@@ -30,11 +31,20 @@ class HighOrderTab(QWidget):
         self.solve_btn.setStyleSheet("QPushButton {background-color: " + SOLVE_BTN_COLOR +
                                      "; color: black; border: none}")
 
+        self.runner = SolverRunner()
+        self.runner.busy.connect(self.solve_btn.setDisabled)
+
+        self.stats_label = QLabel(self)
+        self.stats_label.setFont(label_font)
+
         self.plot = HighOrderPlot()
         self.plot.select_axes.currentIndexChanged.connect(self.change_axes)
+        self.plot.export_btn.clicked.connect(self.export)
 
         self.layout.addWidget(self.input, 0, 0)
         self.layout.addWidget(self.solve_btn, 1, 0)
+        self.layout.addWidget(self.runner, 2, 0)
+        self.layout.addWidget(self.stats_label, 3, 0)
         self.layout.addWidget(self.plot, 0, 1)
 
         self.layout.setColumnStretch(1, PLOT_WIDTH_RATIO)
@@ -50,21 +60,40 @@ class HighOrderTab(QWidget):
         except TypeError:
             return
 
-        self.solution = high_order_solve(order, F_str, (x0, x1), y0, n, alpha)
+        # солверы и sympy загружаются при первом решении, а не при запуске приложения (см. main.py)
+        from kernel.high_ord_solver import high_order_solve
+        from kernel.stats import SolveStats, instrumented
+
+        self.stats = SolveStats("rosenbrock")
+        self.runner.start(self.show_solution, instrumented, high_order_solve, order, F_str, (x0, x1), y0, n, alpha,
+                          stats=self.stats)
+
+    def show_solution(self, solution):
+        self.solution = solution
+        self.stats_label.setText(str(self.stats))
 
         self.plot.select_axes.setCurrentIndex(0)
-        self.plot.figure.clear()
-        ax = self.plot.figure.add_subplot(111)
-        ax.plot(self.solution[0], self.solution[1])
-        ax.grid(True)
-        ax.set_xlabel("x")
-        ax.set_ylabel("y")
-        self.plot.canvas.draw()
+        self.plot.views.show(self.solution)
+
+    def export(self):
+        if self.solution is None:
+            return
+
+        path, _ = QFileDialog.getSaveFileName(self, "Экспорт решения", "solution.npy", EXPORT_FILTER)
+        if not path:
+            return
+        from kernel import store
+        try:
+            store.save_solution(path, self.solution)
+        except (ImportError, ValueError, OSError) as error:
+            export_failed(str(error))
 
     def parse_input(self):
         """
         :return: order, F_str, x0, x1, y0, n, alpha
         """
+        import sympy as sp
+        from kernel import cache
 
         # get order
         order_str = self.input.order_input.text()
@@ -83,8 +112,8 @@ class HighOrderTab(QWidget):
             vars = [x, y]
             for i in range(1, order+1):
                 vars.append(sp.symbols(f'y_{i}'))
-            F_sym = sp.sympify(F_str)
-            F_func = sp.lambdify(vars, F_sym, 'numpy')
+            F_sym = cache.sympify(F_str)
+            F_func = cache.lambdify(vars, F_sym)
         except sp.SympifyError:
             invalid_f_input()
             return None
@@ -143,31 +172,7 @@ class HighOrderTab(QWidget):
         if self.solution is None:
             return
 
-        axes_idx = self.plot.select_axes.currentIndex()
-        if axes_idx == 0:
-            self.plot.figure.clear()
-            ax = self.plot.figure.add_subplot(111)
-            ax.plot(self.solution[0], self.solution[1])
-            ax.grid(True)
-            ax.set_xlabel("x")
-            ax.set_ylabel("y")
-            self.plot.canvas.draw()
-        elif axes_idx == 1:
-            self.plot.figure.clear()
-            ax = self.plot.figure.add_subplot(111)
-            ax.plot(self.solution[1], self.solution[2])
-            ax.grid(True)
-            ax.set_xlabel("y")
-            ax.set_ylabel("y'")
-            self.plot.canvas.draw()
-        else:
-            self.plot.figure.clear()
-            ax = self.plot.figure.add_subplot(111)
-            ax.plot(self.solution[0], self.solution[2])
-            ax.grid(True)
-            ax.set_xlabel("x")
-            ax.set_ylabel("y'")
-            self.plot.canvas.draw()
+        self.plot.views.select(self.plot.select_axes.currentIndex())
 
 
 class HighOrderInput(QWidget):
@@ -335,9 +340,14 @@ class HighOrderPlot(QWidget):
         self.figure = Figure()
         self.canvas = FigureCanvas(self.figure)
         self.toolbar = NavigationToolbar(self.canvas, self)
+        self.views = SolutionViews(self.canvas, self.toolbar)
+
+        self.export_btn = QPushButton("ЭКСПОРТ", self)
+        self.export_btn.setFont(label_font)
 
         layout.addWidget(self.select_axes)
         layout.addWidget(self.canvas)
         layout.addWidget(self.toolbar)
+        layout.addWidget(self.export_btn)
 
         self.setLayout(layout)
@@ -0,0 +1,70 @@
+"""
+Запуск солвера без графического интерфейса:
+
+    python -m kernel jobs.json -o results --workers 4
+    python -m kernel --equation "cos(x) + sin(y)" --interval 0 10 --y0 1 -n 100000 -o results
+    python -m kernel --kind high --order 2 --equation "y_2 + 4*y" --interval 0 3 --y0 "(0, 1, 0)"
+
+Задания из файла (JSON или CSV, см. kernel.batch.normalize) решаются параллельно,
+каждое решение записывается в отдельный файл (см. kernel.store).
+"""
+import argparse
+import sys
+
+from kernel.batch import normalize, read_jobs, run_batch
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m kernel", description="ODESolver без графического интерфейса")
+    parser.add_argument("jobs", nargs="?", help="файл с заданиями (.json или .csv)")
+    parser.add_argument("-o", "--output", default=".", help="папка для результатов")
+    parser.add_argument("-f", "--format", default="npy", choices=["npy", "h5", "parquet"],
+                        help="формат файлов результатов")
+    parser.add_argument("-w", "--workers", type=int, default=None, help="число процессов")
+
+    single = parser.add_argument_group("одно задание (вместо файла)")
+    single.add_argument("--kind", default="first", choices=["first", "high"])
+    single.add_argument("--equation", help="f(x, y) для y'=f или F(x, y, y_1, ...) для F=0")
+    single.add_argument("--order", type=int, help="порядок уравнения (для --kind high)")
+    single.add_argument("--interval", nargs=2, metavar=("X0", "X1"))
+    single.add_argument("--y0")
+    single.add_argument("-n", type=int, default=10000)
+    single.add_argument("--method")
+    single.add_argument("--alpha")
+    single.add_argument("--rtol")
+    single.add_argument("--atol")
+    single.add_argument("--every", type=int, default=1, help="сохранять каждую every-ю точку")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+
+    try:
+        if args.jobs is not None:
+            jobs = read_jobs(args.jobs)
+        elif args.equation is not None and args.interval is not None and args.y0 is not None:
+            jobs = [normalize(dict(kind=args.kind, equation=args.equation, order=args.order, interval=args.interval,
+                                   y0=args.y0, n=args.n, method=args.method, alpha=args.alpha, rtol=args.rtol,
+                                   atol=args.atol, every=args.every))]
+        else:
+            print("Нужен файл с заданиями или --equation, --interval и --y0", file=sys.stderr)
+            return 2
+    except (OSError, ValueError, KeyError, TypeError) as error:
+        print(f"Некорректные задания: {error!r}", file=sys.stderr)
+        return 2
+
+    failed = 0
+    for i, path, result in run_batch(jobs, args.output, args.format, args.workers):
+        if isinstance(result, Exception):
+            failed += 1
+            print(f"[{i}] ошибка: {result!r}", file=sys.stderr)
+        else:
+            size, seconds = result
+            print(f"[{i}] {path}: {size} точек, {seconds:.3f} с")
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,335 @@
+import numpy as np
+from typing import Callable, Tuple
+
+from kernel.stats import SolveStats
+
+
+class EmbeddedTableau:
+    """
+    Вложенная пара методов Рунге-Кутты.
+
+    c  | A
+    ===|======
+       | b      - решение порядка order
+       | b_hat  - вложенное решение для оценки погрешности
+
+    P - коэффициенты плотной выдачи (interpolant). Если P не задана,
+    используется кубическая интерполяция Эрмита по концам шага.
+    fsal - последняя стадия совпадает с f(x + h, y_new) (First Same As Last).
+    """
+
+    def __init__(self, A, b, b_hat, c, order: int, error_order: int, P=None, fsal=False):
+        self.A = np.array(A, dtype=float)
+        self.b = np.array(b, dtype=float)
+        self.b_hat = np.array(b_hat, dtype=float)
+        self.c = np.array(c, dtype=float)
+        self.E = self.b - self.b_hat
+        self.order = order
+        self.error_order = error_order
+        self.P = None if P is None else np.array(P, dtype=float)
+        self.fsal = fsal
+        self.stages = len(self.b)
+
+
+DOPRI5 = EmbeddedTableau(
+    A=[[0, 0, 0, 0, 0, 0, 0],
+       [1/5, 0, 0, 0, 0, 0, 0],
+       [3/40, 9/40, 0, 0, 0, 0, 0],
+       [44/45, -56/15, 32/9, 0, 0, 0, 0],
+       [19372/6561, -25360/2187, 64448/6561, -212/729, 0, 0, 0],
+       [9017/3168, -355/33, 46732/5247, 49/176, -5103/18656, 0, 0],
+       [35/384, 0, 500/1113, 125/192, -2187/6784, 11/84, 0]],
+    b=[35/384, 0, 500/1113, 125/192, -2187/6784, 11/84, 0],
+    b_hat=[5179/57600, 0, 7571/16695, 393/640, -92097/339200, 187/2100, 1/40],
+    c=[0, 1/5, 3/10, 4/5, 8/9, 1, 1],
+    order=5,
+    error_order=4,
+    P=[[1, -8048581381/2820520608, 8663915743/2820520608, -12715105075/11282082432],
+       [0, 0, 0, 0],
+       [0, 131558114200/32700410799, -68118460800/10900136933, 87487479700/32700410799],
+       [0, -1754552775/470086768, 14199869525/1410260304, -10690763975/1880347072],
+       [0, 127303824393/49829197408, -318862633887/49829197408, 701980252875/199316789632],
+       [0, -282668133/205662961, 2019193451/616988883, -1453857185/822651844],
+       [0, 40617522/29380423, -110615467/29380423, 69997945/29380423]],
+    fsal=True,
+)
+
+
+CASH_KARP = EmbeddedTableau(
+    A=[[0, 0, 0, 0, 0, 0],
+       [1/5, 0, 0, 0, 0, 0],
+       [3/40, 9/40, 0, 0, 0, 0],
+       [3/10, -9/10, 6/5, 0, 0, 0],
+       [-11/54, 5/2, -70/27, 35/27, 0, 0],
+       [1631/55296, 175/512, 575/13824, 44275/110592, 253/4096, 0]],
+    b=[37/378, 0, 250/621, 125/594, 0, 512/1771],
+    b_hat=[2825/27648, 0, 18575/48384, 13525/55296, 277/14336, 1/4],
+    c=[0, 1/5, 3/10, 3/5, 1, 7/8],
+    order=5,
+    error_order=4,
+)
+
+
+SAFETY = 0.9
+MIN_FACTOR = 0.2
+MAX_FACTOR = 10.
+
+
+class DenseOutput:
+    """
+    Непрерывное решение, построенное по принятым шагам адаптивного метода.
+    На шаге [x_j, x_j + h_j] решение задается многочленом
+    y(x_j + theta*h_j) = y_j + h_j * sum_k Q[j, k] * theta^(k+1).
+    """
+
+    def __init__(self, xs, hs, ys, Q):
+        self.xs = np.asarray(xs)
+        self.hs = np.asarray(hs)
+        self.ys = np.asarray(ys)
+        self.Q = np.asarray(Q)
+        self.direction = 1. if self.hs[0] > 0 else -1.
+
+    def _locate(self, x):
+        x = np.atleast_1d(np.asarray(x, dtype=float))
+        idx = np.searchsorted(self.direction * self.xs, self.direction * x, side='right') - 1
+        idx = np.clip(idx, 0, len(self.hs) - 1)
+        theta = (x - self.xs[idx]) / self.hs[idx]
+        return idx, theta
+
+    def __call__(self, x):
+        idx, theta = self._locate(x)
+        deg = self.Q.shape[1]
+        powers = theta[:, None] ** np.arange(1, deg + 1)
+        h = self.hs[idx].reshape((-1,) + (1,) * (self.ys.ndim - 1))
+        return self.ys[idx] + h * np.einsum('pk,pk...->p...', powers, self.Q[idx])
+
+    def derivative(self, x):
+        idx, theta = self._locate(x)
+        deg = self.Q.shape[1]
+        powers = np.arange(1, deg + 1) * theta[:, None] ** np.arange(deg)
+        return np.einsum('pk,pk...->p...', powers, self.Q[idx])
+
+
+def _rms_norm(e):
+    return np.sqrt(np.mean(np.square(e)))
+
+
+def _initial_step(f, x0, y0, f0, direction, order, rtol, atol, args):
+    # Hairer, Norsett, Wanner - Solving ODE I, II.4
+    scale = atol + rtol * np.abs(y0)
+    d0 = _rms_norm(y0 / scale)
+    d1 = _rms_norm(f0 / scale)
+    h0 = 1E-6 if d0 < 1E-5 or d1 < 1E-5 else 0.01 * d0 / d1
+
+    y1 = y0 + direction * h0 * f0
+    f1 = f(x0 + direction * h0, y1, *args)
+    d2 = _rms_norm((f1 - f0) / scale) / h0
+
+    if max(d1, d2) <= 1E-15:
+        h1 = max(1E-6, h0 * 1E-3)
+    else:
+        h1 = (0.01 / max(d1, d2)) ** (1 / (order + 1))
+
+    return min(100 * h0, h1)
+
+
+def rk_step(f: Callable[..., float], tableau: EmbeddedTableau, x: float, y, f0, h: float, args: Tuple = ()):
+    """
+    Один шаг вложенной пары.
+    :return: y_new, f_new = f(x + h, y_new), вектор оценки погрешности и массив стадий K
+    """
+    K = np.empty((tableau.stages,) + np.shape(f0))
+    K[0] = f0
+    for i in range(1, tableau.stages):
+        dy = np.tensordot(tableau.A[i, :i], K[:i], axes=1)
+        K[i] = f(x + tableau.c[i] * h, y + h * dy, *args)
+
+    y_new = y + h * np.tensordot(tableau.b, K, axes=1)
+    if tableau.fsal:
+        f_new = K[-1]
+    else:
+        f_new = f(x + h, y_new, *args)
+
+    error = h * np.tensordot(tableau.E, K, axes=1)
+
+    return y_new, f_new, error, K
+
+
+def _interpolant(tableau: EmbeddedTableau, y, y_new, f0, f_new, h, K):
+    """Коэффициенты Q многочлена плотной выдачи на шаге (см. DenseOutput)."""
+    if tableau.P is not None:
+        return np.tensordot(tableau.P.T, K, axes=1)
+
+    return hermite(y, y_new, f0, f_new, h)
+
+
+def hermite(y, y_new, f0, f_new, h):
+    """Коэффициенты Q (см. DenseOutput) кубического многочлена Эрмита по значениям и производным на концах шага."""
+    d = (y_new - y) / h
+    return np.stack([f0, 3 * d - 2 * f0 - f_new, f0 + f_new - 2 * d])
+
+
+def adaptive(f: Callable[..., float], interval: Tuple[float, float], y0, tableau: EmbeddedTableau = DOPRI5,
+             n: int = None, rtol: float = 1E-6, atol: float = 1E-9, h0: float = None, max_steps: int = 10 ** 7,
+             args: Tuple = (), dense: bool = False, progress: Callable[[float], None] = None,
+             stats: SolveStats = None):
+    """
+    Решает обыкновенное дифференциальное уравнение (ОДУ) вложенной парой методов Рунге-Кутты
+    с автоматическим выбором шага.
+
+    Параметры
+    ----------
+    f : callable
+        Функция правой части ОДУ вида y' = f(x, y).
+
+    interval :
+        Интервал интегрирования в виде (x0, x1), где x0 - начальная точка, x1 - конечная точка.
+
+    y0 : float или np.ndarray
+        Начальное значение y(x0) для выделения частного решения.
+
+    tableau : EmbeddedTableau, optional
+        Вложенная пара (DOPRI5, CASH_KARP).
+
+    n : int, optional
+        Число точек равномерной сетки, на которой выдается решение (через плотную выдачу).
+        Если не задано, возвращаются точки принятых шагов.
+
+    rtol, atol : float, optional
+        Относительная и абсолютная допустимые погрешности на шаге.
+
+    h0 : float, optional
+        Начальный шаг. По умолчанию выбирается автоматически.
+
+    max_steps : int, optional
+        Максимальное число шагов (принятых и отклоненных).
+
+    args : tuple, optional
+        Дополнительные параметры, передаваемые в f(x, y, *args).
+
+    dense : bool, optional
+        Вернуть дополнительно объект DenseOutput - непрерывное решение на всем интервале.
+
+    progress : callable, optional
+        Функция progress(доля) для отображения хода решения. Чтобы прервать
+        вычисление, она может бросить kernel.progress.SolverCancelled.
+
+    stats : kernel.stats.SolveStats, optional
+        Счетчики вычислений f и принятых/отклоненных шагов.
+
+    Возвращает
+    -------
+        Кортеж столбцов (x, y, y') - точек численного решения ОДУ
+        (и DenseOutput, если dense=True).
+    """
+    if stats is not None:
+        f = stats.count_f(f)
+
+    x0, x1 = interval
+    direction = 1. if x1 >= x0 else -1.
+    y = np.asarray(y0, dtype=float) * 1.
+    f0 = np.asarray(f(x0, y, *args), dtype=float) * np.ones_like(y)
+    y = y * np.ones_like(f0)
+
+    if h0 is None:
+        h_abs = _initial_step(f, x0, y, f0, direction, tableau.order, rtol, atol, args)
+    else:
+        h_abs = abs(h0)
+
+    exponent = -1 / (tableau.error_order + 1)
+
+    xs, hs, ys, fs, Qs = [x0], [], [y], [f0], []
+    x = x0
+    steps = 0
+
+    while direction * (x1 - x) > 0:
+        if steps >= max_steps:
+            raise RuntimeError("Превышено максимальное число шагов")
+
+        h_min = 10 * np.abs(np.nextafter(x, direction * np.inf) - x)
+        if h_abs < h_min:
+            raise RuntimeError("Шаг интегрирования стал слишком мал")
+
+        h = direction * min(h_abs, abs(x1 - x))
+        y_new, f_new, error, K = rk_step(f, tableau, x, y, f0, h, args)
+        steps += 1
+
+        scale = atol + rtol * np.maximum(np.abs(y), np.abs(y_new))
+        err = _rms_norm(error / scale)
+
+        if err <= 1:
+            factor = MAX_FACTOR if err == 0 else min(MAX_FACTOR, SAFETY * err ** exponent)
+            if n is not None or dense:
+                Qs.append(_interpolant(tableau, y, y_new, f0, f_new, h, K))
+                hs.append(h)
+
+            x = x + h
+            y, f0 = y_new, f_new
+            xs.append(x)
+            ys.append(y)
+            fs.append(f0)
+            h_abs = abs(h) * factor
+            if stats is not None:
+                stats.accepted += 1
+            if progress is not None:
+                progress((x - x0) / (x1 - x0))
+        else:
+            h_abs = abs(h) * max(MIN_FACTOR, SAFETY * err ** exponent)
+            if stats is not None:
+                stats.rejected += 1
+
+    return collect(xs, ys, fs, hs, Qs, n, dense)
+
+
+def collect(xs, ys, fs, hs, Qs, n: int = None, dense: bool = False, scalar: bool = False):
+    """
+    Собирает результат адаптивного метода из списков принятых шагов.
+    Если задано n, решение выдается на равномерной сетке из n точек через плотную выдачу.
+    scalar - шаги сделаны для вектора длины 1, а решение (и плотная выдача) нужно для числа.
+    """
+    X = np.array(xs)
+    Y = np.array(ys)
+    Yprime = np.array(fs)
+    if scalar:
+        Y, Yprime = Y[:, 0], Yprime[:, 0]
+        Qs = [Q[..., 0] for Q in Qs]
+
+    solution = None
+    if n is not None or dense:
+        if hs:
+            solution = DenseOutput(X[:-1], hs, Y[:-1], Qs)
+        else:
+            # нулевой интервал (x0 == x1): шагов нет, решение - начальная точка с наклоном y'(x0)
+            Q = np.stack([Yprime[0], np.zeros_like(Yprime[0])])
+            solution = DenseOutput(X, [1.], Y, [Q])
+
+    if n is not None:
+        X = np.linspace(xs[0], xs[-1], n)
+        Y = solution(X)
+        Yprime = solution.derivative(X)
+
+    if dense:
+        return X, Y, Yprime, solution
+    return X, Y, Yprime
+
+
+def dopri5(f: Callable[..., float], interval: Tuple[float, float], y0, n: int = None,
+           rtol: float = 1E-6, atol: float = 1E-9, args: Tuple = (), dense: bool = False,
+           progress: Callable[[float], None] = None, stats: SolveStats = None):
+    """
+    Метод Дормана-Принса 5(4) с автоматическим выбором шага и плотной выдачей 4-го порядка.
+    Параметры см. в adaptive.
+    """
+    return adaptive(f, interval, y0, DOPRI5, n=n, rtol=rtol, atol=atol, args=args, dense=dense,
+                    progress=progress, stats=stats)
+
+
+def cash_karp(f: Callable[..., float], interval: Tuple[float, float], y0, n: int = None,
+              rtol: float = 1E-6, atol: float = 1E-9, args: Tuple = (), dense: bool = False,
+              progress: Callable[[float], None] = None, stats: SolveStats = None):
+    """
+    Метод Кэша-Карпа 5(4) с автоматическим выбором шага и плотной выдачей Эрмита.
+    Параметры см. в adaptive.
+    """
+    return adaptive(f, interval, y0, CASH_KARP, n=n, rtol=rtol, atol=atol, args=args, dense=dense,
+                    progress=progress, stats=stats)
@@ -0,0 +1,184 @@
+import numpy as np
+from typing import Callable, Tuple
+
+from kernel.stats import SolveStats
+from kernel.adaptive import (DOPRI5, SAFETY, MIN_FACTOR, MAX_FACTOR, _rms_norm, _initial_step, _interpolant,
+                             collect, hermite, rk_step)
+from kernel.rosenbrock import ROS3, RosenbrockTableau, ros_step, symbolic
+
+
+# Граница устойчивости DOPRI5 на отрицательной полуоси: |h * lambda| <= 3.3
+STIFF_RATIO = 3.25
+# Жесткий метод возвращается к явному, когда явный был бы устойчив с запасом
+NONSTIFF_RATIO = .5 * STIFF_RATIO
+# Переключение - только после стольких принятых шагов подряд с одним и тем же признаком
+SWITCH_STEPS = 15
+# Столько шагов без признака жесткости подряд сбрасывают счетчик жестких шагов (Hairer, Wanner - DOPRI5)
+RESET_STEPS = 6
+
+
+def dopri5_stiffness(K, h: float) -> float:
+    """
+    Оценка |h * lambda| по стадиям шага DOPRI5 без дополнительных вычислений f:
+    две последние стадии вычислены в одной точке x + h (Hairer, Wanner - Solving ODE II, IV.2).
+    """
+    dy = _rms_norm((DOPRI5.A[6] - DOPRI5.A[5]) @ K)  # (y_7 - y_6) / h
+    if dy == 0:
+        return 0.
+    return _rms_norm(K[6] - K[5]) / dy
+
+
+def spectral_radius(J) -> float:
+    """Наибольший модуль собственного значения матрицы Якоби."""
+    return float(np.max(np.abs(np.linalg.eigvals(J))))
+
+
+def auto(f: Callable[..., float], jac: Callable, interval: Tuple[float, float], y0, n: int = None,
+         rtol: float = 1E-6, atol: float = 1E-9, dfdx: Callable = None, stiff_tableau: RosenbrockTableau = ROS3,
+         h0: float = None, max_steps: int = 10 ** 7, dense: bool = False, progress: Callable[[float], None] = None,
+         stats: SolveStats = None):
+    """
+    Решает ОДУ с автоматическим выбором шага и автоматическим переключением между явным
+    методом DOPRI5 и схемой Розенброка по ходу интегрирования.
+
+    Явный метод считается вставшим на границу устойчивости, если оценка |h * lambda| по его
+    стадиям (dopri5_stiffness) превышает STIFF_RATIO SWITCH_STEPS принятых шагов подряд: тогда
+    задача на этом участке жесткая, и дальше шаги делает схема Розенброка. Схема Розенброка
+    возвращает интегрирование явному методу, когда h * rho(J) (rho - спектральный радиус
+    матрицы Якоби, которая ей все равно нужна) SWITCH_STEPS шагов подряд меньше NONSTIFF_RATIO.
+
+    Параметры
+    ----------
+    f, jac, interval, y0, n, rtol, atol, dfdx, h0, max_steps, dense, progress :
+        Как у rosenbrock.
+
+    stiff_tableau : RosenbrockTableau, optional
+        Схема Розенброка для жестких участков (ROS2, ROS3, RODAS3).
+
+    stats : kernel.stats.SolveStats, optional
+        Счетчики вычислений, шагов, а также шагов жестким методом и переключений.
+
+    Возвращает
+    -------
+        Кортеж столбцов (x, y, y') - точек численного решения ОДУ
+        (и DenseOutput, если dense=True).
+    """
+    if stats is not None:
+        f = stats.count_f(f)
+        jac = stats.count_jac(jac)
+
+    x0, x1 = interval
+    direction = 1. if x1 >= x0 else -1.
+    scalar = np.ndim(y0) == 0
+
+    def F(x, y):
+        return np.atleast_1d(f(x, y[0] if scalar else y)).astype(float) * np.ones_like(y)
+
+    def Jac(x, y):
+        return np.atleast_2d(jac(x, y[0] if scalar else y)) * np.ones((len(y), len(y)))
+
+    def Fx(x, y, f0):
+        if dfdx is not None:
+            return np.atleast_1d(dfdx(x, y[0] if scalar else y)) * np.ones_like(y)
+        delta = np.sqrt(np.finfo(float).eps) * max(1., abs(x))
+        return (F(x + delta, y) - f0) / delta  # f0 = F(x, y) уже известна
+
+    y = np.atleast_1d(np.asarray(y0, dtype=float)).copy()
+    f0 = F(x0, y)
+    if h0 is None:
+        h_abs = _initial_step(F, x0, y, f0, direction, DOPRI5.order, rtol, atol, ())
+    else:
+        h_abs = abs(h0)
+
+    xs, hs, ys, fs, Qs = [x0], [], [y], [f0], []
+    x = x0
+    steps = 0
+    J = fx = x_jac = None  # Якобиан и df/dx схемы Розенброка, вычисленные в точке x_jac
+    stiff = False
+    stiff_count = 0  # принятых шагов подряд с признаком смены метода
+    calm_count = 0  # принятых шагов подряд без признака жесткости (для явного метода)
+
+    while direction * (x1 - x) > 0:
+        if steps >= max_steps:
+            raise RuntimeError("Превышено максимальное число шагов")
+
+        h_min = 10 * np.abs(np.nextafter(x, direction * np.inf) - x)
+        if h_abs < h_min:
+            raise RuntimeError("Шаг интегрирования стал слишком мал")
+
+        h = direction * min(h_abs, abs(x1 - x))
+        if stiff:
+            if x_jac != x:  # после отклоненного шага (x, y) те же - J и fx не пересчитываются
+                J, fx, x_jac = Jac(x, y), Fx(x, y, f0), x
+            y_new, error, _ = ros_step(F, stiff_tableau, x, y, f0, h, J, fx)
+            exponent = -1 / (stiff_tableau.error_order + 1)
+            if stats is not None:
+                stats.factorizations += 1
+                stats.linear_solves += stiff_tableau.stages
+        else:
+            y_new, f_new, error, K = rk_step(F, DOPRI5, x, y, f0, h)
+            exponent = -1 / (DOPRI5.error_order + 1)
+        steps += 1
+
+        scale = atol + rtol * np.maximum(np.abs(y), np.abs(y_new))
+        err = _rms_norm(error / scale)
+
+        if err > 1 or not np.all(np.isfinite(y_new)):
+            factor = MIN_FACTOR if not np.isfinite(err) else max(MIN_FACTOR, SAFETY * err ** exponent)
+            h_abs = abs(h) * factor
+            if stats is not None:
+                stats.rejected += 1
+            continue
+
+        factor = MAX_FACTOR if err == 0 else min(MAX_FACTOR, SAFETY * err ** exponent)
+        if stiff:
+            f_new = F(x + h, y_new)
+        if n is not None or dense:
+            if stiff:
+                # кубический многочлен Эрмита, дополненный нулями до степени плотной выдачи DOPRI5
+                Q = hermite(y, y_new, f0, f_new, h)
+                Qs.append(np.concatenate((Q, np.zeros((DOPRI5.P.shape[1] - len(Q),) + Q.shape[1:]))))
+            else:
+                Qs.append(_interpolant(DOPRI5, y, y_new, f0, f_new, h, K))
+            hs.append(h)
+
+        x = x + h
+        y, f0 = y_new, f_new
+        xs.append(x)
+        ys.append(y)
+        fs.append(f0)
+        h_abs = abs(h) * factor
+        if stats is not None:
+            stats.accepted += 1
+            stats.stiff_steps += stiff
+        if progress is not None:
+            progress((x - x0) / (x1 - x0))
+
+        if stiff:
+            stiff_count = stiff_count + 1 if abs(h) * spectral_radius(J) < NONSTIFF_RATIO else 0
+        elif dopri5_stiffness(K, h) > STIFF_RATIO:
+            stiff_count += 1
+            calm_count = 0
+        else:
+            calm_count += 1
+            if calm_count >= RESET_STEPS:
+                stiff_count = 0
+
+        if stiff_count >= SWITCH_STEPS:
+            stiff = not stiff
+            stiff_count = calm_count = 0
+            if stats is not None:
+                stats.switches += 1
+
+    return collect(xs, ys, fs, hs, Qs, n, dense, scalar)
+
+
+def auto_solve(f_str, interval: Tuple[float, float], y0, n: int = None, rtol: float = 1E-6, atol: float = 1E-9,
+               dense: bool = False, progress: Callable[[float], None] = None, stats: SolveStats = None):
+    """
+    auto для уравнения (или системы), заданного строкой: матрица Якоби и df/dx вычисляются
+    символьно. Остальные параметры см. в auto.
+    """
+    f, jac, dfdx = symbolic(f_str)
+    return auto(f, jac, interval, y0, n=n, rtol=rtol, atol=atol, dfdx=dfdx, dense=dense, progress=progress,
+                stats=stats)
@@ -0,0 +1,194 @@
+import functools
+import os
+import time
+import numpy as np
+import sympy as sp
+from sympy.printing.numpy import NumPyPrinter
+from typing import Callable, Sequence, Tuple
+
+from kernel.progress import stride
+
+try:
+    import numba
+except ImportError:  # numba - необязательная зависимость, без нее используется обычный lambdify
+    numba = None
+
+
+# ODESOLVER_JIT=0 отключает компиляцию даже при установленном numba
+USE_JIT = numba is not None and os.environ.get("ODESOLVER_JIT", "1") != "0"
+
+# Для коротких сеток время компиляции цикла больше выигрыша от него
+FUSED_MIN_STEPS = 20000
+
+# с, суммарное время компиляции скомпилированных циклов (для kernel.stats)
+compile_time = 0.
+
+
+def jit(func: Callable) -> Callable:
+    """Компилирует численную функцию numba, если он доступен, иначе возвращает ее без изменений."""
+    if not USE_JIT:
+        return func
+    return numba.njit(func)
+
+
+def lambdify(args: Sequence[sp.Symbol], expr, jit: bool = None) -> Callable:
+    """
+    Превращает выражение sympy в функцию. Если доступен numba, результат lambdify
+    компилируется в машинный код (вызов на скалярах - без накладных расходов ufunc numpy).
+    Выражения, которые numba скомпилировать не может, остаются обычными функциями numpy.
+    :param args: символы-аргументы функции
+    :param expr: выражение sympy
+    :param jit: компилировать ли функцию (по умолчанию - если доступен numba)
+    """
+    func = sp.lambdify(args, expr, 'numpy')
+
+    if jit is None:
+        jit = USE_JIT
+    if not jit or numba is None:
+        return func
+
+    try:
+        jitted = numba.njit(func)
+        jitted.compile((numba.float64,) * len(args))
+    except Exception:
+        return func
+
+    return jitted
+
+
+def lambdify_into(args: Sequence[sp.Symbol], exprs: Sequence, jit: bool = None):
+    """
+    Компилирует набор выражений в одну функцию kernel(out, *args), которая записывает
+    значение exprs[k] в out[k]. Общие подвыражения вычисляются один раз (sp.cse),
+    а постоянные выражения не пересчитываются: их значения уже записаны в initial.
+    :return: kernel, initial - начальное содержимое буфера out (копируйте его перед использованием)
+    """
+    exprs = [sp.sympify(e) for e in exprs]
+    initial = np.zeros(len(exprs))
+    variable = []
+    for k, expr in enumerate(exprs):
+        if expr.free_symbols:
+            variable.append(k)
+        else:
+            initial[k] = float(expr)
+
+    replacements, reduced = sp.cse([exprs[k] for k in variable], symbols=sp.numbered_symbols('_cse'))
+
+    printer = NumPyPrinter()
+    lines = ["def kernel(out, " + ", ".join(str(a) for a in args) + "):"]
+    for sym, expr in replacements:
+        lines.append(f"    {sym} = {printer.doprint(expr)}")
+    for k, expr in zip(variable, reduced):
+        lines.append(f"    out[{k}] = {printer.doprint(expr)}")
+    lines.append("    return out")
+
+    namespace = {"numpy": np, "functools": functools}
+    exec("\n".join(lines), namespace)
+    kernel = namespace["kernel"]
+
+    if jit is None:
+        jit = USE_JIT
+    if not jit or numba is None:
+        return kernel, initial
+
+    try:
+        jitted = numba.njit(kernel)
+        jitted.compile((numba.float64[:],) + (numba.float64,) * len(args))
+    except Exception:
+        return kernel, initial
+
+    return jitted, initial
+
+
+def is_compiled(f: Callable) -> bool:
+    return numba is not None and isinstance(f, numba.core.registry.CPUDispatcher)
+
+
+def python_function(f: Callable) -> Callable:
+    """Исходная функция numpy для скомпилированной f - для вычислений на массивах."""
+    return getattr(f, "py_func", f) if is_compiled(f) else f
+
+
+def can_fuse(f: Callable, y0, n: int, args: Tuple = ()) -> bool:
+    """Можно ли проинтегрировать уравнение целиком скомпилированным циклом."""
+    return USE_JIT and is_compiled(f) and np.ndim(y0) == 0 and not args and n >= FUSED_MIN_STEPS
+
+
+# Сколько скомпилированных циклов хранится одновременно. Цикл ссылается на свою f, поэтому
+# кэш циклов ограничен отдельно: иначе f, вытесненные из kernel.cache, оставались бы в памяти
+FUSED_LOOPS = 32
+
+
+@functools.lru_cache(maxsize=FUSED_LOOPS)
+def _fused_loop(f):
+    @numba.njit
+    def loop(X, hA, hb, hc, Y, Yprime):
+        s = len(hb)
+        K = np.empty(s)
+        for i in range(len(X) - 1):
+            x = X[i]
+            y = Y[i]
+            if hc[0] == 0:
+                K[0] = Yprime[i]
+            else:
+                K[0] = f(x + hc[0], y)
+            for j in range(1, s):
+                stage = y
+                for l in range(j):
+                    if hA[j, l] != 0:
+                        stage += hA[j, l] * K[l]
+                K[j] = f(x + hc[j], stage)
+
+            y_new = y
+            for j in range(s):
+                if hb[j] != 0:
+                    y_new += hb[j] * K[j]
+            Y[i + 1] = y_new
+            Yprime[i + 1] = f(X[i + 1], y_new)
+
+    return loop
+
+
+def fused_rk(f: Callable, A, b, c, interval: Tuple[float, float], y0: float, n: int,
+             progress: Callable[[float], None] = None, stats=None):
+    """
+    Явный метод Рунге-Кутты с таблицей Бутчера (A, b, c), в котором весь цикл по шагам
+    скомпилирован вместе с f. Сетка и возвращаемые значения совпадают с solvers.explicit_rk.
+    Если задан progress, цикл выполняется частями, между которыми вызывается progress(доля).
+    Счетчики stats (kernel.stats.SolveStats) заполняются по числу стадий, без обертки над f.
+    """
+    h = (interval[1] - interval[0]) / (n - 1)
+
+    X = np.linspace(interval[0], interval[1], n)
+    Y = np.zeros(n)
+    Yprime = np.zeros(n)
+    Y[0] = y0
+    Yprime[0] = f(X[0], y0)
+
+    every = n if progress is None else stride(n)
+    for start in range(0, n - 1, every):
+        if progress is not None:
+            progress(start / n)
+        stop = min(start + every, n - 1)
+        fused_rk_block(f, A, b, c, X[start:stop + 1], h, Y[start:stop + 1], Yprime[start:stop + 1])
+
+    if stats is not None:
+        stats.f_evals += 1 + (n - 1) * (len(b) + (c[0] != 0))
+        stats.accepted += n - 1
+    return X, Y, Yprime
+
+
+def fused_rk_block(f: Callable, A, b, c, X, h: float, Y, Yprime) -> None:
+    """
+    Скомпилированный цикл fused_rk на готовых массивах: по Y[0] и Yprime[0] заполняет Y[1:]
+    и Yprime[1:] в точках X с шагом h.
+    """
+    global compile_time
+    loop = _fused_loop(f)
+    arguments = (X, h * np.asarray(A, dtype=float), h * np.asarray(b, dtype=float), h * np.asarray(c, dtype=float),
+                 Y, Yprime)
+    if not loop.signatures:
+        start = time.perf_counter()
+        loop.compile(tuple(numba.typeof(a) for a in arguments))
+        compile_time += time.perf_counter() - start
+    loop(*arguments)
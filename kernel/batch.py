@@ -0,0 +1,168 @@
+import csv
+import json
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, Iterator, List, Tuple
+
+import numpy as np
+import sympy as sp
+
+from kernel import store
+from kernel.equation import Equation
+from kernel.high_ord_solver import high_order_stream
+from kernel.solvers import stream
+
+
+# Методы с постоянным шагом решаются потоково (solvers.stream) и пишутся в файл по частям
+STREAM_METHODS = ("euler", "erk1", "erk2", "erk3", "erk4", "rk5", "rk8")
+
+# Столбцы CSV-файла с заданиями (лишние столбцы игнорируются, недостающие - значения по умолчанию)
+CSV_FIELDS = ("kind", "equation", "order", "x0", "x1", "y0", "n", "method", "alpha", "rtol", "atol", "every",
+              "output")
+
+
+def _number(value) -> float:
+    """Число из JSON/CSV: 3, "3", "2*pi", "exp(1)"."""
+    if isinstance(value, str):
+        return float(sp.sympify(value))
+    return float(value)
+
+
+def _alpha(value):
+    """Параметр alpha схем Розенброка: .5, "1", "(1+1j)/2", "(1 + j)/2" (как во вкладках приложения)."""
+    if isinstance(value, str):
+        try:
+            value = complex(value.replace(" ", ""))
+        except ValueError:
+            # мнимая единица: отдельное j или j после числа (1j, 2.5j), но не j внутри имен
+            expr = re.sub(r"(\d)j\b", r"\1*I", value)
+            expr = re.sub(r"(?<![\w.])j\b", "I", expr)
+            value = complex(sp.sympify(expr))
+    value = complex(value)
+    return value.real if value.imag == 0 else value
+
+
+def _vector(value):
+    """Начальное условие: число, список или строка "(0, 1, 0)"."""
+    if isinstance(value, str):
+        value = sp.sympify(value)
+        if isinstance(value, tuple):
+            return [float(v) for v in value]
+        return float(value)
+    if isinstance(value, (list, tuple)):
+        return [_number(v) for v in value]
+    return float(value)
+
+
+def normalize(job: Dict) -> Dict:
+    """
+    Приводит задание к единому виду. Поля (как во вкладках приложения):
+        kind      - "first" (y' = f(x, y), по умолчанию) или "high" (F(x, y, y', ...) = 0)
+        equation  - f (строка или список строк для системы) или F
+        order     - порядок уравнения (для kind = "high")
+        interval  - [x0, x1] (или поля x0, x1)
+        y0        - начальное условие (для kind = "high" - [y(x0), y'(x0), ...])
+        n         - число точек, method, alpha, rtol, atol - как в Equation.solve
+        every     - сохранять каждую every-ю точку (для euler, erk1...erk4, rk5, rk8)
+        output    - имя файла результата (расширение задает формат, см. store.FORMATS)
+    """
+    job = {key: value for key, value in job.items() if value not in (None, "")}
+    if "equation" not in job:
+        raise ValueError("В задании нет уравнения")
+
+    kind = job.get("kind", "first")
+    if kind not in ("first", "high"):
+        raise ValueError(f"Неизвестный тип задания: {kind}")
+
+    if "interval" in job:
+        interval = job["interval"]
+        if isinstance(interval, str):
+            interval = sp.sympify(interval)
+        x0, x1 = interval
+    else:
+        x0, x1 = job["x0"], job["x1"]
+
+    equation = job["equation"]
+    if isinstance(equation, str) and equation.lstrip().startswith("["):
+        equation = json.loads(equation)  # система в CSV: ["y2", "-y1"]
+
+    normalized = dict(kind=kind, equation=equation, interval=(_number(x0), _number(x1)),
+                      y0=_vector(job["y0"]), n=int(_number(job.get("n", 10000))),
+                      method=job.get("method", "erk4" if kind == "first" else "rosenbrock"),
+                      every=int(_number(job.get("every", 1))), output=job.get("output"))
+    if normalized["method"] == "ros1":
+        normalized["method"] = "rosenbrock"
+
+    if kind == "high":
+        normalized["order"] = int(_number(job["order"]))
+    for key in ("rtol", "atol"):
+        if key in job:
+            normalized[key] = _number(job[key])
+    if "alpha" in job:
+        normalized["alpha"] = _alpha(job["alpha"])
+    return normalized
+
+
+def read_jobs(path: str) -> List[Dict]:
+    """Читает задания из JSON (список объектов или один объект) или CSV (столбцы CSV_FIELDS)."""
+    with open(path, newline="") as file:
+        if os.path.splitext(path)[1].lower() == ".csv":
+            jobs = list(csv.DictReader(file))
+        else:
+            jobs = json.load(file)
+    if isinstance(jobs, dict):
+        jobs = [jobs]
+    return [normalize(job) for job in jobs]
+
+
+def run_job(job: Dict, path: str) -> int:
+    """
+    Решает задание (см. normalize) и записывает решение в path.
+    :return: число записанных точек
+    """
+    n, every = job["n"], job["every"]
+    length = -(-n // every)
+
+    if job["kind"] == "high":
+        chunks = high_order_stream(job["order"], job["equation"], job["interval"], job["y0"], n,
+                                   job.get("alpha", (1 + 1j) / 2), every=every)
+        return store.save(path, chunks, length)
+
+    equation = Equation(job["equation"])
+    y0 = np.array(job["y0"]) if isinstance(job["y0"], list) else job["y0"]
+    if job["method"] in STREAM_METHODS:
+        return store.save(path, stream(job["method"], equation.f, job["interval"], y0, n, every=every), length)
+
+    options = {key: job[key] for key in ("rtol", "atol", "alpha") if key in job}
+    X, Y, Yprime = equation.solve(job["method"], job["interval"], y0, n, get_solution=True, **options)[:3]
+    return store.save_solution(path, (X[::every], Y[::every], Yprime[::every]))
+
+
+def _timed_run(job: Dict, path: str) -> Tuple[int, float]:
+    start = time.perf_counter()
+    size = run_job(job, path)
+    return size, time.perf_counter() - start
+
+
+def run_batch(jobs: List[Dict], directory: str = ".", fmt: str = "npy",
+              workers: int = None) -> Iterator[Tuple[int, str, object]]:
+    """
+    Решает задания параллельно на нескольких процессах; каждый процесс сам пишет свой файл.
+    :param directory: папка для файлов без явного output
+    :param fmt: формат файлов без явного output (npy, h5, parquet)
+    :return: генератор (номер задания, путь, (число точек, время) или исключение) в порядке завершения
+    """
+    os.makedirs(directory, exist_ok=True)
+    paths = [os.path.join(directory, job["output"] or f"job_{i}.{fmt}") for i, job in enumerate(jobs)]
+
+    with ProcessPoolExecutor(max_workers=workers or os.cpu_count()) as pool:
+        futures = {pool.submit(_timed_run, job, path): i for i, (job, path) in enumerate(zip(jobs, paths))}
+        for future in as_completed(futures):
+            i = futures[future]
+            try:
+                result = future.result()
+            except Exception as error:  # одно неудачное задание не останавливает остальные
+                result = error
+            yield i, paths[i], result
@@ -0,0 +1,276 @@
+import numpy as np
+from typing import Callable, Tuple
+
+from kernel.stats import SolveStats
+from kernel.adaptive import MIN_FACTOR, MAX_FACTOR, _rms_norm, _initial_step, collect, hermite
+from kernel.rosenbrock import symbolic
+
+
+# Формулы дифференцирования назад (BDF) переменного порядка 1...MAX_ORDER в форме Нордсика
+# через обратные разности (Shampine, Reichelt - The MATLAB ODE Suite, 1997)
+MAX_ORDER = 5
+NEWTON_MAXITER = 4
+
+# Поправки kappa формул численного дифференцирования (NDF); для BDF kappa = 0
+NDF_KAPPA = np.array([0, -0.1850, -1 / 9, -0.0823, -0.0415, 0])
+GAMMA = np.hstack((0, np.cumsum(1 / np.arange(1, MAX_ORDER + 1))))
+
+
+def _change_matrix(order: int, factor: float) -> np.ndarray:
+    """Матрица пересчета обратных разностей при изменении шага в factor раз."""
+    I = np.arange(1, order + 1)[:, None]
+    J = np.arange(1, order + 1)
+    M = np.zeros((order + 1, order + 1))
+    M[1:, 1:] = (I - 1 - factor * J) / I
+    M[0] = 1
+    return np.cumprod(M, axis=0)
+
+
+def change_step(D: np.ndarray, order: int, factor: float) -> None:
+    """Пересчитывает обратные разности D[:order + 1] на шаг, умноженный на factor."""
+    RU = _change_matrix(order, factor) @ _change_matrix(order, 1)
+    D[:order + 1] = RU.T @ D[:order + 1]
+
+
+def newton(F: Callable, x_new: float, y_predict, c: float, psi, Minv, scale, tol: float, stats: SolveStats = None):
+    """
+    Упрощенный метод Ньютона для уравнения формулы относительно поправки d = y - y_predict:
+    c * f(x_new, y_predict + d) = psi + d. Обращенная матрица Minv = (I - c * J)^(-1) не пересчитывается.
+    :return: сошелся ли метод, число итераций, y, поправка d = y - y_predict
+    """
+    d = np.zeros_like(y_predict)
+    y = y_predict.copy()
+    dy_norm_old = None
+    converged = False
+    for k in range(NEWTON_MAXITER):
+        f = F(x_new, y)
+        if not np.all(np.isfinite(f)):
+            break
+        dy = Minv @ (c * f - psi - d)
+        if stats is not None:
+            stats.linear_solves += 1
+        dy_norm = _rms_norm(dy / scale)
+
+        rate = None if dy_norm_old is None else dy_norm / dy_norm_old
+        if rate is not None and (rate >= 1 or rate ** (NEWTON_MAXITER - k) / (1 - rate) * dy_norm > tol):
+            break  # сходимость слишком медленная - не успеем за NEWTON_MAXITER итераций
+
+        y += dy
+        d += dy
+        if dy_norm == 0 or rate is not None and rate / (1 - rate) * dy_norm < tol:
+            converged = True
+            break
+        dy_norm_old = dy_norm
+
+    return converged, k + 1, y, d
+
+
+def bdf(f: Callable[..., float], jac: Callable, interval: Tuple[float, float], y0, n: int = None,
+        rtol: float = 1E-6, atol: float = 1E-9, max_order: int = MAX_ORDER, ndf: bool = False, h0: float = None,
+        max_steps: int = 10 ** 7, dense: bool = False, progress: Callable[[float], None] = None,
+        stats: SolveStats = None):
+    """
+    Решает обыкновенное дифференциальное уравнение (ОДУ) неявными многошаговыми формулами
+    дифференцирования назад (BDF) переменного порядка 1...5 с автоматическим выбором шага и порядка.
+    Предназначен для жестких задач: на шаге одно-два вычисления f, а матрица Якоби и
+    обращенная матрица Ньютона переиспользуются, пока метод Ньютона сходится.
+
+    Параметры
+    ----------
+    f : callable
+        Функция правой части ОДУ вида y' = f(x, y) (y - число или вектор длины m).
+
+    jac : callable
+        Матрица Якоби df/dy(x, y): число или массив (m, m).
+
+    interval :
+        Интервал интегрирования в виде (x0, x1), где x0 - начальная точка, x1 - конечная точка.
+
+    y0 : float или np.ndarray
+        Начальное значение y(x0) для выделения частного решения.
+
+    n : int, optional
+        Число точек равномерной сетки, на которой выдается решение (через интерполяцию Эрмита).
+        Если не задано, возвращаются точки принятых шагов.
+
+    rtol, atol : float, optional
+        Относительная и абсолютная допустимые погрешности на шаге.
+
+    max_order : int, optional
+        Наибольший порядок формулы (1...5). Формулы порядка выше 2 не A-устойчивы: для задач
+        с собственными значениями Якобиана около мнимой оси max_order стоит уменьшить.
+
+    ndf : bool, optional
+        Использовать формулы численного дифференцирования NDF (поправки Клопфенштейна-Шампайна):
+        при той же устойчивости шаг до 26% больше.
+
+    h0 : float, optional
+        Начальный шаг. По умолчанию выбирается автоматически.
+
+    max_steps : int, optional
+        Максимальное число шагов (принятых и отклоненных).
+
+    dense : bool, optional
+        Вернуть дополнительно объект DenseOutput - непрерывное решение на всем интервале.
+
+    progress : callable, optional
+        Функция progress(доля) для отображения хода решения. Чтобы прервать
+        вычисление, она может бросить kernel.progress.SolverCancelled.
+
+    stats : kernel.stats.SolveStats, optional
+        Счетчики вычислений f и Якобиана, обращений матриц, линейных систем и шагов.
+
+    Возвращает
+    -------
+        Кортеж столбцов (x, y, y') - точек численного решения ОДУ
+        (и DenseOutput, если dense=True).
+    """
+    if not 1 <= max_order <= MAX_ORDER:
+        raise ValueError(f"Порядок BDF - от 1 до {MAX_ORDER}, а не {max_order}")
+    if stats is not None:
+        f = stats.count_f(f)
+        jac = stats.count_jac(jac)
+
+    x0, x1 = interval
+    direction = 1. if x1 >= x0 else -1.
+    scalar = np.ndim(y0) == 0
+
+    def F(x, y):
+        return np.atleast_1d(f(x, y[0] if scalar else y)).astype(float) * np.ones_like(y)
+
+    def Jac(x, y):
+        return np.atleast_2d(jac(x, y[0] if scalar else y)) * np.ones((len(y), len(y)))
+
+    kappa = NDF_KAPPA if ndf else np.zeros(MAX_ORDER + 1)
+    alpha = (1 - kappa) * GAMMA
+    error_const = kappa * GAMMA + 1 / np.arange(1, MAX_ORDER + 2)
+    newton_tol = max(10 * np.finfo(float).eps / rtol, min(.03, rtol ** .5))
+
+    y = np.atleast_1d(np.asarray(y0, dtype=float)).copy()
+    m = len(y)
+    f0 = F(x0, y)
+    if h0 is None:
+        h_abs = min(_initial_step(F, x0, y, f0, direction, 1, rtol, atol, ()), abs(x1 - x0))
+    else:
+        h_abs = abs(h0)
+
+    # D[k] - обратные разности порядка k решения, умноженные на шаг (D[1] = h * y')
+    D = np.zeros((MAX_ORDER + 3, m))
+    D[0] = y
+    D[1] = f0 * h_abs * direction
+
+    xs, hs, ys, fs, Qs = [x0], [], [y], [f0], []
+    x = x0
+    order = 1
+    equal_steps = 0  # число шагов подряд без изменения шага и порядка
+    steps = 0
+    J = Jac(x0, y)
+    jac_current = True
+    Minv = None
+
+    while direction * (x1 - x) > 0:
+        h_min = 10 * np.abs(np.nextafter(x, direction * np.inf) - x)
+        while True:
+            if steps >= max_steps:
+                raise RuntimeError("Превышено максимальное число шагов")
+            if h_abs < h_min:
+                raise RuntimeError("Шаг интегрирования стал слишком мал")
+            steps += 1
+
+            h = h_abs * direction
+            x_new = x + h
+            if direction * (x_new - x1) > 0:
+                x_new = x1
+                change_step(D, order, abs(x_new - x) / h_abs)
+                equal_steps = 0
+                Minv = None
+            h = x_new - x
+            h_abs = abs(h)
+
+            y_predict = np.sum(D[:order + 1], axis=0)
+            scale = atol + rtol * np.abs(y_predict)
+            psi = GAMMA[1:order + 1] @ D[1:order + 1] / alpha[order]
+            c = h / alpha[order]
+
+            while True:
+                if Minv is None:
+                    Minv = np.linalg.inv(np.eye(m) - c * J)
+                    if stats is not None:
+                        stats.factorizations += 1
+                converged, iterations, y_new, d = newton(F, x_new, y_predict, c, psi, Minv, scale, newton_tol,
+                                                         stats)
+                if converged or jac_current:
+                    break
+                # метод Ньютона не сошелся со старой матрицей Якоби - пересчитываем ее
+                J = Jac(x_new, y_predict)
+                jac_current = True
+                Minv = None
+
+            if not converged:
+                factor = .5
+            else:
+                safety = .9 * (2 * NEWTON_MAXITER + 1) / (2 * NEWTON_MAXITER + iterations)
+                scale = atol + rtol * np.abs(y_new)
+                error_norm = _rms_norm(error_const[order] * d / scale)
+                if error_norm <= 1:
+                    break
+                factor = max(MIN_FACTOR, safety * error_norm ** (-1 / (order + 1)))
+
+            h_abs *= factor
+            change_step(D, order, factor)
+            equal_steps = 0
+            Minv = None
+            if stats is not None:
+                stats.rejected += 1
+
+        # шаг принят; y' в новой точке следует из уравнения формулы: c * f = psi + d
+        f_new = (psi + d) / c
+        if n is not None or dense:
+            Qs.append(hermite(y, y_new, f0, f_new, h))
+            hs.append(h)
+        x, y, f0 = x_new, y_new, f_new
+        xs.append(x)
+        ys.append(y)
+        fs.append(f0)
+        jac_current = False
+        equal_steps += 1
+        if stats is not None:
+            stats.accepted += 1
+        if progress is not None:
+            progress((x - x0) / (x1 - x0))
+
+        D[order + 2] = d - D[order + 1]
+        D[order + 1] = d
+        for i in reversed(range(order + 1)):
+            D[i] += D[i + 1]
+
+        if equal_steps < order + 1:
+            continue
+
+        # выбор порядка и шага по оценкам погрешности формул порядков order - 1, order, order + 1
+        error_m = _rms_norm(error_const[order - 1] * D[order] / scale) if order > 1 else np.inf
+        error_p = _rms_norm(error_const[order + 1] * D[order + 2] / scale) if order < max_order else np.inf
+        with np.errstate(divide='ignore'):
+            factors = np.array([error_m, error_norm, error_p]) ** (-1 / np.arange(order, order + 3))
+        delta = int(np.argmax(factors)) - 1
+        order += delta
+
+        factor = min(MAX_FACTOR, safety * np.max(factors))
+        h_abs *= factor
+        change_step(D, order, factor)
+        equal_steps = 0
+        Minv = None
+
+    return collect(xs, ys, fs, hs, Qs, n, dense, scalar)
+
+
+def bdf_solve(f_str, interval: Tuple[float, float], y0, n: int = None, rtol: float = 1E-6, atol: float = 1E-9,
+              max_order: int = MAX_ORDER, ndf: bool = False, dense: bool = False,
+              progress: Callable[[float], None] = None, stats: SolveStats = None):
+    """
+    BDF для уравнения (или системы), заданного строкой: матрица Якоби вычисляется символьно.
+    Остальные параметры см. в bdf.
+    """
+    f, jac, _ = symbolic(f_str)
+    return bdf(f, jac, interval, y0, n=n, rtol=rtol, atol=atol, max_order=max_order, ndf=ndf, dense=dense,
+               progress=progress, stats=stats)
@@ -0,0 +1,170 @@
+import hashlib
+import os
+import pickle
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Callable, Hashable, Sequence
+
+import sympy as sp
+
+from kernel import backend
+
+
+class LRUCache:
+    """
+    Кэш с вытеснением давно не использованных записей (LRU).
+    Записи, помеченные persistent, дополнительно сохраняются на диск в directory
+    (если она задана) и переживают перезапуск программы.
+    """
+
+    def __init__(self, maxsize: int = 256, directory: str = None):
+        self.maxsize = maxsize
+        self.directory = directory
+        self._data = OrderedDict()
+        # солверы могут работать в фоновых потоках одновременно с GUI
+        self._lock = threading.RLock()
+        # значения, которые сейчас строятся: другие потоки с тем же ключом ждут результат,
+        # а построение значений по разным ключам (компиляция numba) идет параллельно
+        self._building = {}
+
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.build_time = 0.  # с, суммарное время построения значений (разбор, компиляция)
+
+    def _path(self, key: Hashable) -> str:
+        name = hashlib.sha1(repr(key).encode()).hexdigest()
+        return os.path.join(self.directory, name + ".pkl")
+
+    def _load(self, key: Hashable):
+        try:
+            with open(self._path(key), "rb") as file:
+                stored_key, value = pickle.load(file)
+        except (OSError, pickle.UnpicklingError, EOFError, ValueError):
+            return None
+        return value if stored_key == key else None
+
+    def _dump(self, key: Hashable, value) -> None:
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            with open(self._path(key), "wb") as file:
+                pickle.dump((key, value), file)
+        except (OSError, pickle.PicklingError):
+            pass
+
+    def get(self, key: Hashable, build: Callable[[], object], persistent: bool = False):
+        """
+        Возвращает значение по ключу, при отсутствии - строит его вызовом build().
+        build() выполняется без блокировки кэша; одно значение строится один раз,
+        даже если его запросили несколько потоков.
+        """
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return self._data[key]
+
+            future = self._building.get(key)
+            if future is None:
+                future = self._building[key] = Future()
+                owner = True
+            else:
+                owner = False
+
+        if not owner:
+            return future.result()
+
+        try:
+            value = self._build(key, build, persistent)
+        except BaseException as error:
+            with self._lock:
+                del self._building[key]
+            future.set_exception(error)
+            raise
+
+        with self._lock:
+            self._data[key] = value
+            if len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+            del self._building[key]
+        future.set_result(value)
+        return value
+
+    def _build(self, key: Hashable, build: Callable[[], object], persistent: bool):
+        """Значение с диска (для persistent) или построенное вызовом build()."""
+        on_disk = persistent and self.directory is not None
+        value = self._load(key) if on_disk else None
+        if value is not None:
+            with self._lock:
+                self.disk_hits += 1
+            return value
+
+        start = time.perf_counter()
+        value = build()
+        elapsed = time.perf_counter() - start
+        with self._lock:
+            self.misses += 1
+            self.build_time += elapsed
+        if on_disk:
+            self._dump(key, value)
+        return value
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self.hits = self.disk_hits = self.misses = 0
+            self.build_time = 0.
+
+    def info(self) -> dict:
+        return {"hits": self.hits, "disk_hits": self.disk_hits, "misses": self.misses,
+                "size": len(self._data), "maxsize": self.maxsize, "build_time": self.build_time}
+
+
+# Общий кэш разобранных выражений, производных и скомпилированных функций.
+# ODESOLVER_CACHE_DIR включает хранение символьных результатов на диске.
+expressions = LRUCache(directory=os.environ.get("ODESOLVER_CACHE_DIR"))
+
+
+def sympify(expr_str: str):
+    """
+    sp.sympify с кэшированием по строке. Из ключа убираются только пробелы по краям:
+    внутренние пробелы значимы ("x y" - ошибка, а не "xy").
+    """
+    key = ("sympify", expr_str.strip())
+    return expressions.get(key, lambda: sp.sympify(expr_str), persistent=True)
+
+
+def diff(expr, var: sp.Symbol):
+    key = ("diff", sp.srepr(expr), str(var))
+    return expressions.get(key, lambda: sp.diff(expr, var, 1), persistent=True)
+
+
+def jacobian(exprs: Sequence, variables: Sequence[sp.Symbol]) -> sp.Matrix:
+    """Матрица Якоби d exprs[i] / d variables[j]."""
+    key = ("jacobian", tuple(sp.srepr(e) for e in exprs), tuple(str(v) for v in variables))
+    return expressions.get(key, lambda: sp.Matrix(exprs).jacobian(list(variables)), persistent=True)
+
+
+def lambdify(args: Sequence[sp.Symbol], expr) -> Callable:
+    """
+    backend.lambdify с кэшированием по канонической форме выражения:
+    одинаковые (с точностью до записи) уравнения компилируются один раз.
+    """
+    key = ("lambdify", tuple(str(a) for a in args), sp.srepr(expr), backend.USE_JIT)
+    return expressions.get(key, lambda: backend.lambdify(args, expr))
+
+
+def lambdify_into(args: Sequence[sp.Symbol], exprs: Sequence):
+    """backend.lambdify_into с кэшированием по канонической форме выражений."""
+    key = ("lambdify_into", tuple(str(a) for a in args), tuple(sp.srepr(e) for e in exprs), backend.USE_JIT)
+    return expressions.get(key, lambda: backend.lambdify_into(args, exprs))
+
+
+def enable_disk_cache(directory: str) -> None:
+    expressions.directory = directory
+
+
+def cache_info() -> dict:
+    return expressions.info()
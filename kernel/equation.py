@@ -1,41 +1,167 @@
-import matplotlib.pyplot as plt
+import itertools
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from multiprocessing import shared_memory
+from typing import Dict, Iterable, Iterator, List, Sequence, Union
+
+from kernel import cache, stats as instrumentation
 from kernel.solvers import *
+from kernel.adaptive import dopri5, cash_karp
+from kernel.rosenbrock import METHODS as ROSENBROCK_METHODS, rosenbrock, symbolic
+from kernel.bdf import bdf
+from kernel.auto import auto
+from kernel.jacobian import JacobianProvider, provider as jacobian_provider
 from kernel.slope_field import slope_field
 
 
 
 class Equation:
-    def __init__(self, equation: Callable):
-        self.f = equation
+    def __init__(self, equation: Union[Callable, str, Sequence[str]], jacobian: Union[str, Callable] = None,
+                 sparsity=None):
+        """
+        :param equation: правая часть y' = f(x, y): функция, строка
+                         или список строк для системы от y1, ..., ym (см. solvers.system).
+                         Уравнение, заданное строкой, можно передавать в другие процессы (sweep).
+        :param jacobian: матрица Якоби df/dy для неявных методов (ros1, схемы Розенброка, bdf, auto):
+                         "symbolic" (по умолчанию для строк), "fd" - разности вперед (по умолчанию
+                         для функций), "complex" - комплексное дифференцирование или функция jac(x, y)
+        :param sparsity: булева матрица (m, m) возможных ненулевых элементов df/dy системы -
+                         численная матрица Якоби вычисляется с раскраской столбцов (см. kernel.jacobian)
+        """
+        self.f_str = None
+        start = time.perf_counter()
+        if callable(equation):
+            self.f = equation
+        else:
+            self.f_str = equation
+            self.f = self._build(equation)
+        self.jacobian = jacobian
+        self.sparsity = sparsity
+        self.jac = self._build_jacobian()
+        # время разбора уравнения относится к первому решению (см. stats)
+        self._pending_compile = time.perf_counter() - start
         self.solution = None
+        self.stats = None  # kernel.stats.SolveStats последнего решения
         # x  | y  | y'
         # x0 | y0 | y'(x0)
 
-        # self.stiffness = False
-
-    def solve(self, method: str, interval: Tuple[float, float], y0: float, n: int = 10000, get_solution=False):
-        if method == "euler":
-            self.solution = euler(self.f, interval, y0, n)
-        elif method == "erk1":
-            self.solution = erk1(self.f, interval, y0, n)
-        elif method == "erk2":
-            self.solution = erk2(self.f, interval, y0, n)
-        elif method == "erk3":
-            self.solution = erk3(self.f, interval, y0, n)
-        elif method == "erk4":
-            self.solution = erk4(self.f, interval, y0, n)
-        elif method == "rosenbrock":
-            self.solution = ros1(self.f, interval, y0, n)
+        # оказалась ли задача жесткой хотя бы на части интервала (известно после решения методом auto)
+        self.stiffness = None
+
+    @staticmethod
+    def _build(f_str):
+        if isinstance(f_str, str):
+            x, y = sp.symbols('x y')
+            return cache.lambdify((x, y), cache.sympify(f_str))
+        return system(f_str)[0]
+
+    def _build_jacobian(self):
+        """Численная (или заданная) функция df/dy; None - матрица Якоби строится символьно по строке."""
+        if self.jacobian in (None, "symbolic"):
+            if self.f_str is not None:
+                return None
+            if self.jacobian == "symbolic":
+                raise ValueError("Символьная матрица Якоби есть только у уравнения, заданного строкой")
+            return jacobian_provider(self.f, "fd", self.sparsity)
+        return jacobian_provider(self.f, self.jacobian, self.sparsity)
+
+    def __getstate__(self):
+        # скомпилированные функции не сериализуются - уравнение восстанавливается по строке;
+        # результаты прошлых решений другим процессам не нужны
+        state = self.__dict__.copy()
+        if self.f_str is not None:
+            state["f"] = None
+            state["jac"] = None
+        state["solution"] = None
+        state["stats"] = None
+        state["_pending_compile"] = 0.
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        if self.f is None:
+            self.f = self._build(self.f_str)
+            self.jac = self._build_jacobian()
+
+    def solve(self, method: str, interval: Tuple[float, float], y0: float, n: int = 10000, get_solution=False,
+              rtol: float = 1E-6, atol: float = 1E-9, alpha: complex = .5, progress: Callable[[float], None] = None,
+              track_memory: bool = False, profiler: str = None):
+        """
+        Находит частное решение уравнения. Статистика решения сохраняется в self.stats.
+        :param method: euler, erk1, erk2, erk3, erk4, rk5, rk8, rosenbrock,
+                       методы Адамса ab2...ab5 и abm2...abm5 (прогноз-коррекция)
+                       или адаптивные методы dopri5, cash-karp, ros2, ros3, rodas3, bdf, ndf;
+                       auto - dopri5 с переключением на схему Розенброка на жестких участках
+        :param n: число точек сетки (для адаптивных методов - число точек выдачи)
+        :param rtol: относительная погрешность (для адаптивных методов)
+        :param atol: абсолютная погрешность (для адаптивных методов)
+        :param alpha: параметр схемы rosenbrock (ros1)
+        :param progress: функция progress(доля), см. kernel.progress
+        :param track_memory: отслеживать пик выделенной памяти (tracemalloc, замедляет решение)
+        :param profiler: "cprofile" или "pyinstrument" - отчет профилировщика попадет в self.stats.profile
+        """
+        stats = instrumentation.SolveStats(method)
+        stats.compile_time = self._pending_compile
+        self._pending_compile = 0.
+        self.stiffness = None  # известна только после решения методом auto
+        self.solution = instrumentation.instrumented(self._solve, method, interval, y0, n, rtol, atol, alpha, progress,
+                                                     stats=stats, track_memory=track_memory, profiler=profiler)
+        self.stats = stats
 
         if get_solution:
             return self.solution
 
+    def _solve(self, method, interval, y0, n, rtol, atol, alpha, progress, stats):
+        if method in TABLEAUS:
+            return explicit_rk(self.f, interval, y0, TABLEAUS[method], n, progress=progress, stats=stats)
+        elif method in ADAMS_METHODS:
+            order, corrector = ADAMS_METHODS[method]
+            solver = adams_bashforth_moulton if corrector else adams_bashforth
+            return solver(self.f, interval, y0, n, order, progress=progress, stats=stats)
+        elif method == "rosenbrock":
+            f, jac, _ = self._implicit(stats)
+            return ros1(f, interval, y0, alpha, n, progress=progress, stats=stats, jac=jac)
+        elif method == "dopri5":
+            return dopri5(self.f, interval, y0, n, rtol, atol, progress=progress, stats=stats)
+        elif method == "cash-karp":
+            return cash_karp(self.f, interval, y0, n, rtol, atol, progress=progress, stats=stats)
+        elif method in ROSENBROCK_METHODS:
+            f, jac, dfdx = self._implicit(stats)
+            return rosenbrock(f, jac, interval, y0, ROSENBROCK_METHODS[method], n, rtol, atol, dfdx=dfdx,
+                              progress=progress, stats=stats)
+        elif method == "auto":
+            f, jac, dfdx = self._implicit(stats)
+            solution = auto(f, jac, interval, y0, n, rtol, atol, dfdx=dfdx, progress=progress, stats=stats)
+            self.stiffness = stats.stiff_steps > 0
+            return solution
+        elif method in ("bdf", "ndf"):
+            f, jac, _ = self._implicit(stats)
+            return bdf(f, jac, interval, y0, n, rtol, atol, ndf=method == "ndf", progress=progress, stats=stats)
+        else:
+            raise ValueError(f"Неизвестный метод: {method}")
+
+    def _implicit(self, stats):
+        """
+        f, df/dy и df/dx для неявных методов. Для уравнения, заданного строкой, производные
+        символьные; иначе df/dy - численная (см. kernel.jacobian), а df/dx - None
+        (солверы оценивают ее разностью). Вычисления f внутри численной матрицы Якоби
+        учитываются в stats.f_evals.
+        """
+        if self.jac is None:
+            return symbolic(self.f_str)
+        if isinstance(self.jac, JacobianProvider):
+            self.jac.reset(stats)
+        return self.f, self.jac, None
+
     def plot(self, axes="xy") -> None:
         """
         Строит график частного решения данного уравнения. Для начала используйте метод solve!
         :param axes: оси, в которых будет построен график решения. Возможные варианты:
                     xy, yy', xy'
         """
+        import matplotlib.pyplot as plt  # не нужен для расчетов без графики (python -m kernel)
+
         if axes == "xy":
             plt.plot(self.solution[0], self.solution[1])
         elif axes == "yy'":
@@ -54,6 +180,8 @@ class Equation:
         :param nx: число векторов по x
         :param ny: число векторов по y
         """
+        import matplotlib.pyplot as plt
+
         X, Y, U, V = slope_field(self.f, rect, nx, ny)
 
         xstep = (rect[1] - rect[0]) / nx
@@ -75,3 +203,115 @@ class Equation:
     #     for i in range(n-1):
     #         derivative_value = self.f(X[i], Y[i])
 
+
+def sweep_grid(methods: Iterable[str], intervals: Iterable[Tuple[float, float]], y0s: Iterable,
+               n: int = 10000, **options) -> List[Dict]:
+    """
+    Декартово произведение методов, интервалов и начальных условий - список заданий для sweep.
+    :param options: дополнительные параметры Equation.solve (rtol, atol, alpha)
+    """
+    return [dict(method=method, interval=interval, y0=y0, n=n, **options)
+            for method, interval, y0 in itertools.product(methods, intervals, y0s)]
+
+
+_worker_equation = None
+
+
+def _init_worker(equation: Equation):
+    global _worker_equation
+    _worker_equation = equation
+
+
+def _layout(job: Dict):
+    n = job.get("n", 10000)
+    if n is None:
+        raise ValueError("Для sweep нужно задать число точек n (в том числе для адаптивных методов)")
+    m = int(np.size(job["y0"]))
+    shape = (n,) if np.ndim(job["y0"]) == 0 else (n, m)
+    return n, shape, n * (1 + 2 * m)
+
+
+def _run_job(job: Dict, block_name: str):
+    n, shape, size = _layout(job)
+    block = shared_memory.SharedMemory(name=block_name)
+    try:
+        data = np.ndarray((size,), dtype=np.float64, buffer=block.buf)
+        X, Y, Yprime = _worker_equation.solve(get_solution=True, **job)
+        data[:n] = X
+        data[n:n + Y.size] = np.reshape(Y, -1)
+        data[n + Y.size:] = np.reshape(Yprime, -1)
+        del data
+    finally:
+        block.close()
+
+
+def _read_job(job: Dict, block: shared_memory.SharedMemory) -> Tuple:
+    """Копия решения (x, y, y') из блока задания - блок освобождается сразу после чтения."""
+    n, shape, size = _layout(job)
+    data = np.ndarray((size,), dtype=np.float64, buffer=block.buf)
+    X = data[:n].copy()
+    Y = data[n:n + (size - n) // 2].reshape(shape).copy()
+    Yprime = data[n + (size - n) // 2:].reshape(shape).copy()
+    del data
+    return X, Y, Yprime
+
+
+def _release(block: shared_memory.SharedMemory) -> None:
+    block.close()
+    block.unlink()
+
+
+def sweep(equation: Equation, jobs: Sequence[Dict], workers: int = None) -> Iterator[Tuple[int, Tuple]]:
+    """
+    Решает уравнение для набора заданий параллельно на нескольких процессах.
+    Решения записываются процессами в блоки разделяемой памяти, а не пересылаются через pickle.
+    У каждого задания свой блок; одновременно выполняется не больше 2 * workers заданий, и блок
+    освобождается, как только решение из него прочитано, - память не растет с числом заданий.
+
+    :param equation: уравнение, заданное строкой (функции не передаются в другие процессы)
+    :param jobs: задания - словари с параметрами Equation.solve
+                 (method, interval, y0, n, rtol, atol, alpha), см. sweep_grid;
+                 n обязательно и для адаптивных методов - под решение заранее выделяется память
+    :param workers: число процессов (по умолчанию - число ядер)
+    :return: генератор пар (номер задания, (x, y, y')) в порядке завершения заданий.
+             Если генератор закрыть раньше, оставшиеся задания отменяются, а блоки освобождаются
+    """
+    if equation.f_str is None:
+        raise ValueError("Для sweep уравнение нужно задать строкой")
+    for job in jobs:
+        _layout(job)  # ошибки в заданиях - до запуска процессов
+
+    workers = workers or os.cpu_count()
+    queue = iter(enumerate(jobs))
+    running = {}  # future -> (номер задания, блок)
+    pool = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(equation,))
+
+    def submit() -> None:
+        for i, job in itertools.islice(queue, 1):
+            block = shared_memory.SharedMemory(create=True, size=max(8 * _layout(job)[2], 1))
+            try:
+                running[pool.submit(_run_job, job, block.name)] = (i, block)
+            except BaseException:
+                _release(block)
+                raise
+
+    try:
+        for _ in range(2 * workers):
+            submit()
+
+        while running:
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                i, block = running.pop(future)
+                try:
+                    future.result()
+                    solution = _read_job(jobs[i], block)
+                finally:
+                    _release(block)
+                submit()
+                yield i, solution
+    finally:
+        # процессы могут еще писать в блоки - блоки освобождаются после их остановки
+        pool.shutdown(wait=True, cancel_futures=True)
+        for _, block in running.values():
+            _release(block)
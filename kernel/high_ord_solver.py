@@ -1,10 +1,45 @@
-import matplotlib.pyplot as plt
 import sympy as sp
 import numpy as np
-from typing import Tuple
+from typing import Callable, Tuple
 
+from kernel import backend, cache
+from kernel.solvers import ChunkBuffer, _step
+from kernel.stats import SolveStats
+from kernel.progress import stride
 
-def high_order_solve(order: int, F: str, interval: Tuple, y_0: Tuple, n=100000, alpha=(1+1j)/2):
+
+@backend.jit
+def _chain_solve(r, Jm, ah, q, den, w):
+    """
+    Решает A w = r для A = M - ah * J, где первые m строк J - сдвиг (y_i)' = y_(i+1),
+    а последняя строка Jm = dF/d(y, y_1, ..., y_m) заполнена:
+
+        | 1  -ah            |
+        |     1  -ah        |
+        |         ...  -ah  |
+        | -ah*Jm            |
+
+    Из первых m строк w_i = p_i + q_i * w_m, где p_i = r_i + ah * p_(i+1), q_i = ah^(m-i);
+    подстановка в последнюю строку дает w_m. Стоимость O(dim) вместо O(dim^3).
+    den = -ah * (Jm @ q) зависит только от J и шага и пересчитывается вместе с J.
+    """
+    m = len(r) - 1
+    w[m] = 0
+    for i in range(m-1, -1, -1):
+        w[i] = r[i] + ah * w[i+1]
+
+    s = 0j
+    for j in range(m):
+        s += Jm[j] * w[j]
+    wm = (r[m] + ah * s) / den
+
+    for i in range(m+1):
+        w[i] += q[i] * wm
+    return w
+
+
+def high_order_solve(order: int, F: str, interval: Tuple, y_0: Tuple, n=100000, alpha=(1+1j)/2,
+                     jac_update: int = 1, progress: Callable[[float], None] = None, stats: SolveStats = None):
     """
     F(x, y, y', y'', ...) = 0
     :param order: порядок уравнения
@@ -13,8 +48,26 @@ def high_order_solve(order: int, F: str, interval: Tuple, y_0: Tuple, n=100000,
     :param y_0: начальное условие на функцию y и ее производные до order порядка включительно (в порядке возрастания)
     :param n: число разбиений сетки
     :param alpha: параметр схемы Розенброка
+    :param jac_update: матрица Якоби пересчитывается раз в jac_update шагов
+                       (для медленно меняющегося Якобиана)
+    :param progress: функция progress(доля) для отображения хода решения;
+                     чтобы прервать вычисление, она может бросить SolverCancelled
+    :param stats: счетчики вычислений правой части, Якобиана, линейных систем и шагов (kernel.stats.SolveStats)
     :return: столбцы X и Y, где Y содержит вычисленные точки функции Y и ее первой производной
     """
+    return next(high_order_stream(order, F, interval, y_0, n, alpha, jac_update, progress, chunk=n, stats=stats))
+
+
+def high_order_stream(order: int, F: str, interval: Tuple, y_0: Tuple, n=100000, alpha=(1+1j)/2,
+                      jac_update: int = 1, progress: Callable[[float], None] = None,
+                      chunk: int = 65536, every: int = 1, stats: SolveStats = None):
+    """
+    Потоковый вариант high_order_solve: решение выдается частями по мере вычисления,
+    в памяти хранится только текущая часть.
+    :param chunk: число сохраняемых точек в одной части (последняя часть может быть короче)
+    :param every: сохраняется каждая every-я точка сетки (прореживание), начиная с x0
+    :return: генератор частей (X, y, y') решения; остальные параметры - как у high_order_solve
+    """
 
     common = [f"y_{i}" for i in range(1, order+1)]
 
@@ -28,16 +81,7 @@ def high_order_solve(order: int, F: str, interval: Tuple, y_0: Tuple, n=100000,
     # y_(n-1)     y_n
 
 
-    def jacoby_matrix():
-        jmatrix = sp.matrices.zeros(dim, dim)
-
-        for i in range(dim):
-            for j in range(dim):
-                jmatrix[i, j] = sp.diff(r_sym[i], l_sym[j], 1)
-
-        return jmatrix
-
-    h = (interval[1] - interval[0]) / n
+    h = _step(interval, n)
 
     dim = len(right_side_str)  # - Число уравнений в системе
     m = dim-1 # - Число дифференциальных уравнений в системе
@@ -46,52 +90,63 @@ def high_order_solve(order: int, F: str, interval: Tuple, y_0: Tuple, n=100000,
     r_sym = []
     for i in range(dim):
         l_sym.append(sp.symbols(left_side_str[i]))
-        r_sym.append(sp.sympify(right_side_str[i]))
-
+        r_sym.append(cache.sympify(right_side_str[i]))
 
-    X = np.linspace(interval[0], interval[1], n)
-    Y = np.zeros((dim, n))
-    # Y[0] = y, Y[1] = y', Y[2] = y'', ...
 
+    x0, x1 = interval
+    # y = (y, y', y'', ...) - текущая точка решения
     # Using initial conditions
-    for i in range(dim):
-        Y[i][0] = y_0[i]
+    y = np.array(y_0[:dim], dtype=float)
+    buffer = ChunkBuffer(chunk)
 
 
-    J = jacoby_matrix()
-    A = sp.matrices.Matrix(np.diag([1 if k<=m-1 else 0 for k in range(dim)])) - alpha * h * J
+    J = cache.jacobian(r_sym, l_sym)
+    # A = M - alpha * h * J, M = diag(1, ..., 1, 0)
+    # Первые m строк J постоянны (сдвиг), поэтому система решается за O(dim), см. _chain_solve
 
+    r_kernel, r_initial = cache.lambdify_into([x] + l_sym, r_sym)
+    Jm_kernel, Jm_initial = cache.lambdify_into([x] + l_sym, list(J[m, :]))
 
-    A_func = [[] for i in range(dim)]
-    r_func = []
+    r_num = r_initial.copy()
+    Jm_num = Jm_initial.copy()
 
-    for i in range(dim):
-        r_func.append(sp.lambdify([x] + l_sym, r_sym[i], 'numpy'))
-        for j in range(dim):
-            A_func[i].append(sp.lambdify([x] + l_sym, A[i, j], 'numpy'))
+    ah = alpha * h
+    q = ah ** np.arange(m, -1, -1).astype(complex)
+    w_1 = np.zeros(dim, dtype=complex)
+    den = 0
+
+    # A_num * w_1 = r_num
 
-    # A_func * w_1 = right_side_func
+    # точки сетки np.linspace(x0, x1, n) вычисляются на ходу - память не зависит от n
+    x_prev = x0
+    if buffer.push(x0, y[0], y[1]):
+        yield buffer.pop()
 
+    step = stride(n)
     for i in range(1, n):
-        r_num = np.zeros(dim, dtype=np.complex64)
-        A_num = np.zeros_like(A_func, dtype=np.complex64)
+        if progress is not None and i % step == 0:
+            progress(i / n)
 
-        # evaluating functions
-        # for k in range(dim):
-        #     r_num[k] = r_func[k](X[i-1]+0.5*h, *[Y[l][i-1] for l in range(dim)])
-        #     for j in range(dim):
-        #         A_num[k][j] = A_func[k][j](X[i-1], *[Y[l][i-1] for l in range(dim)])
+        if (i-1) % jac_update == 0:
+            Jm_kernel(Jm_num, x_prev, *y)
+            den = -ah * (Jm_num @ q)
+            if stats is not None:
+                stats.jac_evals += 1
+                stats.factorizations += 1
 
-        for j in range(dim):
-            r_num[j] = r_func[j](X[i-1]+0.5*h, *[Y[l][i-1] for l in range(dim)])
-            for k in range(dim):
-                A_num[j][k] = A_func[j][k](X[i-1], *[Y[l][i-1] for l in range(dim)])
+        r_kernel(r_num, x_prev + 0.5*h, *y)
 
         # find w_1
-        w_1 = np.linalg.solve(A_num, r_num)
-
-
-        for j in range(dim):
-            Y[j][i] = Y[j][i-1] + h * np.real(w_1[j])
-
-    return X, Y[0], Y[1]
+        _chain_solve(r_num, Jm_num, ah, q, den, w_1)
+
+        y += h * w_1.real
+        if stats is not None:
+            stats.f_evals += 1
+            stats.linear_solves += 1
+            stats.accepted += 1
+        x_prev = x1 if i == n - 1 else x0 + i * h
+        if i % every == 0 and buffer.push(x_prev, y[0], y[1]):
+            yield buffer.pop()
+
+    if buffer.size:
+        yield buffer.pop()
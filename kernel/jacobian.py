@@ -0,0 +1,153 @@
+import numpy as np
+from abc import ABC, abstractmethod
+from typing import Callable, Union
+
+from kernel import backend
+from kernel.stats import SolveStats
+
+
+# Способы вычисления матрицы Якоби df/dy для неявных методов, если нет символьной
+KINDS = ("fd", "complex")
+
+# Шаг комплексного дифференцирования: погрешность O(h^2) без вычитания близких чисел
+COMPLEX_STEP = 1E-20
+
+
+def color_columns(sparsity) -> np.ndarray:
+    """
+    Жадная раскраска столбцов разреженной матрицы Якоби: столбцы одного цвета не имеют общих
+    ненулевых строк, поэтому их можно возмутить одновременно и получить за одно вычисление f.
+    :param sparsity: булева матрица (m, m) - где df_i/dy_j может быть ненулевой
+    :return: номер цвета каждого столбца
+    """
+    S = np.asarray(sparsity, dtype=bool)
+    conflicts = (S.T.astype(int) @ S.astype(int)) > 0
+    colors = np.full(S.shape[1], -1)
+    for j in range(S.shape[1]):
+        used = set(colors[:j][conflicts[j, :j]])
+        color = 0
+        while color in used:
+            color += 1
+        colors[j] = color
+    return colors
+
+
+class JacobianProvider(ABC):
+    """
+    Численная матрица Якоби df/dy(x, y) правой части f(x, y), заданной только функцией.
+    Значение в последней точке (x, y) запоминается: повторный запрос в той же точке
+    (например, после отклоненного шага) не вычисляет f заново.
+    """
+
+    def __init__(self, f: Callable, sparsity=None):
+        self._f = f
+        self.sparsity = None if sparsity is None else np.asarray(sparsity, dtype=bool)
+        self.colors = None if sparsity is None else color_columns(sparsity)
+        self.reset()
+
+    def reset(self, stats: SolveStats = None) -> None:
+        """
+        Готовит провайдер к новому решению: сбрасывает запомненное значение и счетчик evaluations.
+        :param stats: статистика решения - вычисления f для матрицы Якоби попадут в stats.f_evals
+        """
+        self.f = self._f if stats is None else stats.count_f(self._f)
+        self.evaluations = 0  # вычисления матрицы (без попаданий в кеш)
+        self._point = None
+        self._value = None
+
+    def __call__(self, x: float, y):
+        point = (x, np.asarray(y, dtype=float).tobytes())
+        if point != self._point:
+            self._value = self.evaluate(x, y)
+            self._point = point
+            self.evaluations += 1
+        return self._value
+
+    def _groups(self, m: int):
+        """Группы одновременно возмущаемых столбцов (без разреженности - по одному)."""
+        if self.colors is None:
+            return [np.array([j]) for j in range(m)]
+        return [np.flatnonzero(self.colors == color) for color in range(self.colors.max() + 1)]
+
+    def _assemble(self, J, columns, df, delta) -> None:
+        """Записывает в столбцы columns частные производные df / delta (по разреженности)."""
+        block = df[:, None] / delta[columns]
+        if self.sparsity is not None:
+            block = np.where(self.sparsity[:, columns], block, 0.)
+        J[:, columns] = block
+
+    @abstractmethod
+    def evaluate(self, x: float, y):
+        """Матрица Якоби в точке (x, y) без учета запомненного значения."""
+
+
+class FiniteDifferenceJacobian(JacobianProvider):
+    """
+    Матрица Якоби по разностям вперед: m + 1 вычислений f на матрицу, а при заданной
+    разреженности - число цветов раскраски столбцов + 1 (для ленточной матрицы - ширина ленты + 1).
+    """
+
+    def evaluate(self, x: float, y):
+        if np.ndim(y) == 0:
+            delta = np.sqrt(np.finfo(float).eps) * max(1., abs(y))
+            return (self.f(x, y + delta) - self.f(x, y)) / delta
+
+        y = np.asarray(y, dtype=float)
+        f0 = np.asarray(self.f(x, y), dtype=float)
+        delta = np.sqrt(np.finfo(float).eps) * np.maximum(1., np.abs(y))
+        J = np.zeros((len(f0), len(y)))
+        for columns in self._groups(len(y)):
+            shifted = y.copy()
+            shifted[columns] += delta[columns]
+            self._assemble(J, columns, np.asarray(self.f(x, shifted), dtype=float) - f0, delta)
+        return J
+
+
+class ComplexStepJacobian(JacobianProvider):
+    """
+    Матрица Якоби комплексным дифференцированием: df/dy_j = Im f(x, y + i*h*e_j) / h.
+    Точна до машинной точности при любом малом h, но f должна принимать комплексные y
+    (функции numpy - да, скомпилированные numba для float64 - нет: берется исходная функция).
+    """
+
+    def __init__(self, f: Callable, sparsity=None):
+        super().__init__(backend.python_function(f), sparsity)
+
+    def _complex_f(self, x, y):
+        try:
+            return np.asarray(self.f(x, y))
+        except TypeError as error:
+            raise ValueError("Для комплексного дифференцирования f должна принимать комплексные y") from error
+
+    def evaluate(self, x: float, y):
+        if np.ndim(y) == 0:
+            return np.imag(self._complex_f(x, y + 1j * COMPLEX_STEP)) / COMPLEX_STEP
+
+        y = np.asarray(y, dtype=float)
+        delta = np.full(len(y), COMPLEX_STEP)
+        J = None
+        for columns in self._groups(len(y)):
+            shifted = y.astype(complex)
+            shifted[columns] += 1j * COMPLEX_STEP
+            df = np.imag(self._complex_f(x, shifted))
+            if J is None:
+                J = np.zeros((len(df), len(y)))
+            self._assemble(J, columns, df, delta)
+        return J
+
+
+def provider(f: Callable, kind: Union[str, Callable] = "fd", sparsity=None) -> Callable:
+    """
+    Функция df/dy(x, y) для неявных методов (ros1, схемы Розенброка, bdf, auto).
+    :param kind: "fd" (разности вперед), "complex" (комплексное дифференцирование)
+                 или готовая функция jac(x, y) - она возвращается как есть
+    :param sparsity: булева матрица (m, m) возможных ненулевых элементов df/dy - столбцы без
+                     общих строк вычисляются за одно вычисление f
+    """
+    if callable(kind):
+        return kind
+    if kind == "fd":
+        return FiniteDifferenceJacobian(f, sparsity)
+    if kind == "complex":
+        return ComplexStepJacobian(f, sparsity)
+    raise ValueError(f"Неизвестный способ вычисления матрицы Якоби: {kind}")
@@ -0,0 +1,7 @@
+class SolverCancelled(Exception):
+    """Вычисление прервано: бросается функцией progress, переданной в солвер."""
+
+
+def stride(n: int, parts: int = 100) -> int:
+    """Число шагов между вызовами progress в солверах с фиксированной сеткой."""
+    return max(1, n // parts)
@@ -0,0 +1,323 @@
+import numpy as np
+import sympy as sp
+from typing import Callable, Tuple
+
+from kernel import cache
+from kernel.stats import SolveStats
+from kernel.adaptive import SAFETY, MIN_FACTOR, MAX_FACTOR, _rms_norm, collect, hermite
+
+
+class RosenbrockTableau:
+    """
+    Коэффициенты s-стадийной схемы Розенброка в форме без умножений на матрицу Якоби
+    (Hairer, Wanner - Solving ODE II, IV.7):
+
+        (I/(h*gamma) - J) u_i = f(x + alpha_i*h, y + sum_j A_ij u_j) + sum_j (C_ij/h) u_j + h*gamma_i*df/dx
+        y_new = y + sum_i M_i u_i,   error = sum_i E_i u_i
+
+    order - порядок схемы, error_order - порядок вложенной схемы, по которой оценивается погрешность.
+    """
+
+    def __init__(self, gamma: float, A, C, M, E, alpha, gamma_i, order: int, error_order: int):
+        self.gamma = gamma
+        self.A = np.array(A, dtype=float)
+        self.C = np.array(C, dtype=float)
+        self.M = np.array(M, dtype=float)
+        self.E = np.array(E, dtype=float)
+        self.alpha = np.array(alpha, dtype=float)
+        self.gamma_i = np.array(gamma_i, dtype=float)
+        self.order = order
+        self.error_order = error_order
+        self.stages = len(self.M)
+
+        # стадия i может взять значение f со стадии i-1, если аргументы совпадают
+        self.reuse_f = [i > 0 and self.alpha[i] == self.alpha[i-1] and np.array_equal(self.A[i], self.A[i-1])
+                        for i in range(self.stages)]
+
+
+_g2 = 1 + 1 / np.sqrt(2)
+
+# Verwer et al., 1999. L-устойчивая, 2(1)
+ROS2 = RosenbrockTableau(
+    gamma=_g2,
+    A=[[0, 0],
+       [1 / _g2, 0]],
+    C=[[0, 0],
+       [-2 / _g2, 0]],
+    M=[3 / (2 * _g2), 1 / (2 * _g2)],
+    E=[1 / (2 * _g2), 1 / (2 * _g2)],
+    alpha=[0, 1],
+    gamma_i=[_g2, -_g2],
+    order=2,
+    error_order=1,
+)
+
+# Sandu et al., 1997. L-устойчивая, 3(2)
+ROS3 = RosenbrockTableau(
+    gamma=0.43586652150845899941601945119356,
+    A=[[0, 0, 0],
+       [1, 0, 0],
+       [1, 0, 0]],
+    C=[[0, 0, 0],
+       [-0.10156171083877702091975600115545E+01, 0, 0],
+       [0.40759956452537699824805835358067E+01, 0.92076794298330791242156818474003E+01, 0]],
+    M=[0.1E+01, 0.61697947043828245592553615689730E+01, -0.42772256543218573326238373806514],
+    E=[0.5, -0.29079558716805469821718236208017E+01, 0.22354069897811569627360909276199],
+    alpha=[0, 0.43586652150845899941601945119356, 0.43586652150845899941601945119356],
+    gamma_i=[0.43586652150845899941601945119356, 0.24291996454816804366592249683314,
+             0.21851380027664058511513169485832E+01],
+    order=3,
+    error_order=2,
+)
+
+# Sandu et al., 1997. Жестко точная (stiffly accurate) RODAS-схема 3(2)
+RODAS3 = RosenbrockTableau(
+    gamma=0.5,
+    A=[[0, 0, 0, 0],
+       [0, 0, 0, 0],
+       [2, 0, 0, 0],
+       [2, 0, 1, 0]],
+    C=[[0, 0, 0, 0],
+       [4, 0, 0, 0],
+       [1, -1, 0, 0],
+       [1, -1, -8/3, 0]],
+    M=[2, 0, 1, 1],
+    E=[0, 0, 0, 1],
+    alpha=[0, 0, 1, 1],
+    gamma_i=[0.5, 1.5, 0, 0],
+    order=3,
+    error_order=2,
+)
+
+METHODS = {"ros2": ROS2, "ros3": ROS3, "rodas3": RODAS3}
+
+
+def symbolic(f_str) -> Tuple[Callable, Callable, Callable]:
+    """
+    Строит по строке (или списку строк для системы от y1, ..., ym) функции f(x, y),
+    матрицу Якоби df/dy(x, y) и производную df/dx(x, y).
+    """
+    x = sp.symbols('x')
+    if isinstance(f_str, str):
+        y = sp.symbols('y')
+        f_sym = cache.sympify(f_str)
+        return (cache.lambdify((x, y), f_sym),
+                cache.lambdify((x, y), cache.diff(f_sym, y)),
+                cache.lambdify((x, y), cache.diff(f_sym, x)))
+
+    m = len(f_str)
+    y_sym = sp.symbols(f'y1:{m + 1}')
+    f_sym = [cache.sympify(s) for s in f_str]
+
+    f_kernel, f_initial = cache.lambdify_into((x,) + y_sym, f_sym)
+    J_kernel, J_initial = cache.lambdify_into((x,) + y_sym, list(cache.jacobian(f_sym, y_sym)))
+    fx_kernel, fx_initial = cache.lambdify_into((x,) + y_sym, [cache.diff(e, x) for e in f_sym])
+
+    def f_func(x, y):
+        return f_kernel(f_initial.copy(), x, *y)
+
+    def jac_func(x, y):
+        return J_kernel(J_initial.copy(), x, *y).reshape(m, m)
+
+    def dfdx_func(x, y):
+        return fx_kernel(fx_initial.copy(), x, *y)
+
+    return f_func, jac_func, dfdx_func
+
+
+def ros_step(f: Callable, tableau: RosenbrockTableau, x: float, y, f0, h: float, J, fx, Minv=None):
+    """
+    Один шаг схемы Розенброка для y из R^m.
+    :param f0: f(x, y)
+    :param J: матрица Якоби df/dy (m, m) (точная для схем Розенброка, приближенная для W-режима)
+    :param fx: df/dx (m,)
+    :param Minv: обращенная матрица (I/(h*gamma) - J)^(-1), если уже вычислена для этих J и h
+    :return: y_new, вектор оценки погрешности, Minv
+    """
+    m = len(y)
+    if Minv is None:
+        Minv = np.linalg.inv(np.eye(m) / (h * tableau.gamma) - J)
+
+    U = np.empty((tableau.stages, m))
+    fi = f0
+    for i in range(tableau.stages):
+        if i > 0 and not tableau.reuse_f[i]:
+            fi = np.atleast_1d(f(x + tableau.alpha[i] * h, y + tableau.A[i, :i] @ U[:i]))
+
+        rhs = fi + (tableau.C[i, :i] / h) @ U[:i] + h * tableau.gamma_i[i] * fx
+        U[i] = Minv @ rhs
+
+    y_new = y + tableau.M @ U
+    error = tableau.E @ U
+
+    return y_new, error, Minv
+
+
+def rosenbrock(f: Callable[..., float], jac: Callable, interval: Tuple[float, float], y0,
+               tableau: RosenbrockTableau = ROS3, n: int = None, rtol: float = 1E-6, atol: float = 1E-9,
+               dfdx: Callable = None, jac_update: int = 1, h0: float = None, max_steps: int = 10 ** 7,
+               dense: bool = False, progress: Callable[[float], None] = None, stats: SolveStats = None):
+    """
+    Решает обыкновенное дифференциальное уравнение (ОДУ) многостадийной схемой Розенброка
+    с автоматическим выбором шага. Предназначен для жестких задач.
+
+    Параметры
+    ----------
+    f : callable
+        Функция правой части ОДУ вида y' = f(x, y) (y - число или вектор длины m).
+
+    jac : callable
+        Матрица Якоби df/dy(x, y): число или массив (m, m).
+
+    interval :
+        Интервал интегрирования в виде (x0, x1), где x0 - начальная точка, x1 - конечная точка.
+
+    y0 : float или np.ndarray
+        Начальное значение y(x0) для выделения частного решения.
+
+    tableau : RosenbrockTableau, optional
+        Схема: ROS2, ROS3, RODAS3.
+
+    n : int, optional
+        Число точек равномерной сетки, на которой выдается решение (через интерполяцию Эрмита).
+        Если не задано, возвращаются точки принятых шагов.
+
+    rtol, atol : float, optional
+        Относительная и абсолютная допустимые погрешности на шаге.
+
+    dfdx : callable, optional
+        Производная df/dx(x, y). По умолчанию оценивается конечной разностью.
+
+    jac_update : int, optional
+        Матрица Якоби пересчитывается раз в jac_update принятых шагов, а также после отклоненного
+        шага, если она вычислена в одной из прошлых точек (W-режим). При jac_update = 1 схема -
+        классическая схема Розенброка. Отклоненный шаг не меняет (x, y), поэтому при повторе шага
+        Якобиан не пересчитывается. При повторном использовании Якобиана порядок схемы
+        не гарантируется, точность обеспечивается контролем шага.
+
+    h0 : float, optional
+        Начальный шаг. По умолчанию 1E-6 длины интервала.
+
+    max_steps : int, optional
+        Максимальное число шагов (принятых и отклоненных).
+
+    dense : bool, optional
+        Вернуть дополнительно объект DenseOutput - непрерывное решение на всем интервале.
+
+    progress : callable, optional
+        Функция progress(доля) для отображения хода решения. Чтобы прервать
+        вычисление, она может бросить kernel.progress.SolverCancelled.
+
+    stats : kernel.stats.SolveStats, optional
+        Счетчики вычислений f и Якобиана, разложений матриц, линейных систем и шагов.
+
+    Возвращает
+    -------
+        Кортеж столбцов (x, y, y') - точек численного решения ОДУ
+        (и DenseOutput, если dense=True).
+    """
+    if stats is not None:
+        f = stats.count_f(f)
+        jac = stats.count_jac(jac)
+
+    x0, x1 = interval
+    direction = 1. if x1 >= x0 else -1.
+    scalar = np.ndim(y0) == 0
+
+    def F(x, y):
+        return np.atleast_1d(f(x, y[0] if scalar else y)).astype(float) * np.ones_like(y)
+
+    def Jac(x, y):
+        return np.atleast_2d(jac(x, y[0] if scalar else y)) * np.ones((len(y), len(y)))
+
+    def Fx(x, y, f0):
+        if dfdx is not None:
+            return np.atleast_1d(dfdx(x, y[0] if scalar else y)) * np.ones_like(y)
+        delta = np.sqrt(np.finfo(float).eps) * max(1., abs(x))
+        return (F(x + delta, y) - f0) / delta  # f0 = F(x, y) уже известна
+
+    y = np.atleast_1d(np.asarray(y0, dtype=float)).copy()
+    f0 = F(x0, y)
+
+    h_abs = abs(h0) if h0 is not None else 1E-6 * abs(x1 - x0)
+    exponent = -1 / (tableau.error_order + 1)
+
+    xs, hs, ys, fs, Qs = [x0], [], [y], [f0], []
+    x = x0
+    steps = 0
+    accepted = 0
+    J = fx = Minv = None
+    x_jac = None  # точка, в которой вычислен J
+    jac_accepted = 0  # число принятых шагов к моменту вычисления J
+    rejected = False  # отклонен ли предыдущий шаг
+    h_prev = None
+
+    while direction * (x1 - x) > 0:
+        if steps >= max_steps:
+            raise RuntimeError("Превышено максимальное число шагов")
+
+        h_min = 10 * np.abs(np.nextafter(x, direction * np.inf) - x)
+        if h_abs < h_min:
+            raise RuntimeError("Шаг интегрирования стал слишком мал")
+
+        h = direction * min(h_abs, abs(x1 - x))
+
+        if J is None or x_jac != x and (rejected or accepted - jac_accepted >= jac_update):
+            J = Jac(x, y)
+            fx = Fx(x, y, f0)
+            x_jac, jac_accepted = x, accepted
+            Minv = None
+        if h != h_prev:
+            Minv = None
+
+        if stats is not None:
+            stats.factorizations += Minv is None
+            stats.linear_solves += tableau.stages
+        y_new, error, Minv = ros_step(F, tableau, x, y, f0, h, J, fx, Minv)
+        h_prev = h
+        steps += 1
+
+        scale = atol + rtol * np.maximum(np.abs(y), np.abs(y_new))
+        err = _rms_norm(error / scale)
+
+        if err <= 1 and np.all(np.isfinite(y_new)):
+            factor = MAX_FACTOR if err == 0 else min(MAX_FACTOR, SAFETY * err ** exponent)
+            f_new = F(x + h, y_new)
+            if n is not None or dense:
+                Qs.append(hermite(y, y_new, f0, f_new, h))
+                hs.append(h)
+
+            x = x + h
+            y, f0 = y_new, f_new
+            xs.append(x)
+            ys.append(y)
+            fs.append(f0)
+            accepted += 1
+            rejected = False
+            if stats is not None:
+                stats.accepted += 1
+            h_abs = abs(h) * factor
+            if progress is not None:
+                progress((x - x0) / (x1 - x0))
+        else:
+            factor = MIN_FACTOR if not np.isfinite(err) else max(MIN_FACTOR, SAFETY * err ** exponent)
+            h_abs = abs(h) * factor
+            if stats is not None:
+                stats.rejected += 1
+            # шаг повторяется из той же точки: J и fx остаются, матрица Minv меняется вместе с h
+            rejected = True
+
+    return collect(xs, ys, fs, hs, Qs, n, dense, scalar)
+
+
+def ros_solve(f_str, interval: Tuple[float, float], y0, method: str = "ros3", n: int = None,
+              rtol: float = 1E-6, atol: float = 1E-9, jac_update: int = 1, dense: bool = False,
+              progress: Callable[[float], None] = None, stats: SolveStats = None):
+    """
+    Схема Розенброка для уравнения (или системы), заданного строкой: Якобиан и df/dx
+    вычисляются символьно. method - одна из схем METHODS (ros2, ros3, rodas3).
+    Остальные параметры см. в rosenbrock.
+    """
+    f, jac, dfdx = symbolic(f_str)
+    return rosenbrock(f, jac, interval, y0, METHODS[method], n=n, rtol=rtol, atol=atol, dfdx=dfdx,
+                      jac_update=jac_update, dense=dense, progress=progress, stats=stats)
@@ -1,8 +1,11 @@
 import numpy as np
 from typing import Callable, Tuple
 
+from kernel import backend
 
-def slope_field(f: Callable[..., float], rect: Tuple[float, float, float, float], nx: int, ny: int):
+
+def slope_field(f: Callable[..., float], rect: Tuple[float, float, float, float], nx: int, ny: int,
+                progress: Callable[[float], None] = None):
     """
     Строит поле направленностей на заданном прямоугольнике
     :param f: правая часть уравнения y'=f(x, y)
@@ -10,26 +13,50 @@ def slope_field(f: Callable[..., float], rect: Tuple[float, float, float, float]
                 в пределах которого будет постороено поле направленности
     :param nx: число векторов по x
     :param ny: число векторов по y
+    :param progress: функция progress(доля) для отображения хода построения;
+                     чтобы прервать вычисление, она может бросить SolverCancelled
     """
 
     X = np.linspace(rect[0], rect[1], nx)
     Y = np.linspace(rect[2], rect[3], ny)
 
-    U = np.zeros((ny, nx))
-    V = np.zeros((ny, nx))
-
     xstep = (rect[1] - rect[0]) / nx
     ystep = (rect[3] - rect[2]) / ny
 
     arrow_len = np.sqrt((xstep) ** 2 + (ystep) ** 2) / 2
 
-    for i in range(ny):
-        for j in range(nx):
-            derivative_value = f(X[j], Y[i])
-            U[i, j] = arrow_len * np.sqrt(1 / (1 + derivative_value ** 2))
-            if derivative_value >= 0:
-                V[i, j] = arrow_len * np.sqrt(derivative_value ** 2 / (1 + derivative_value ** 2))
-            else:
-                V[i, j] = - arrow_len * np.sqrt(derivative_value ** 2 / (1 + derivative_value ** 2))
+    if progress is not None:
+        progress(0)
+
+    derivative_value = evaluate_on_mesh(f, X, Y)
+    U, V = direction_vectors(derivative_value, arrow_len)
 
     return X, Y, U, V
+
+
+def direction_vectors(derivative_value, arrow_len: float):
+    """Компоненты (U, V) стрелок длины arrow_len с наклоном derivative_value."""
+    norm = arrow_len / np.sqrt(1 + derivative_value ** 2)
+    return norm, norm * derivative_value
+
+
+def evaluate_on_mesh(f: Callable[..., float], X, Y):
+    """
+    Значения f во всех узлах сетки X x Y (массив (len(Y), len(X))).
+    f вызывается один раз на всей сетке; выражения, которые не поддерживают
+    массивы (или возвращают константу), вычисляются поточечно через np.vectorize.
+    """
+    XX, YY = np.meshgrid(X, Y)
+    func = backend.python_function(f)
+
+    try:
+        values = np.asarray(func(XX, YY), dtype=float)
+    except (TypeError, ValueError):
+        values = None
+
+    if values is None or values.shape != XX.shape:
+        if values is not None and values.ndim == 0:
+            return np.full(XX.shape, float(values))
+        values = np.vectorize(func, otypes=[float])(XX, YY)
+
+    return values
@@ -1,50 +1,170 @@
 import numpy as np
 import sympy as sp
-from typing import Callable, Tuple
+from typing import Callable, Sequence, Tuple
 
+from kernel import backend, cache
+from kernel.progress import stride
+from kernel.stats import SolveStats
 
-def euler(f: Callable[..., float], interval: Tuple[float, float], y0: float, n: int = 10000):
-    """
-    Решает обыкновенное дифференциальное уравнение (ОДУ) методом Эйлера.
-
-    Параметры
-    ----------
-    f : callable
-        Функция правой части ОДУ вида y' = f(x, y).
-        Должна принимать два аргумента: x (float) и y (float),
-        и возвращать значение производной (float).
 
-    interval :
-        Интервал интегрирования в виде (x0, x1), где x0 - начальная точка, x1 - конечная точка.
+class ButcherTableau:
+    """
+    Таблица Бутчера явного метода Рунге-Кутты.
 
-    y0 : float
-        Начальное значение y(x0) для выделения частного решения.
+    c | A
+    ==|===
+      | b
 
-    n : int, optional
-        Количество разбиений сетки.
+    A - строго нижнетреугольная матрица s x s, b и c - векторы длины s (s - число стадий).
+    Если c[0] = 0, первая стадия шага совпадает с y' в начале шага и не вычисляется повторно.
+    """
 
-    Возвращает
-    -------
-        Кортеж столбцов (x, y, y') - точек численного решения ОДУ.
+    def __init__(self, A, b, c, order: int = None, name: str = ""):
+        self.A = np.array(A, dtype=float)
+        self.b = np.array(b, dtype=float)
+        self.c = np.array(c, dtype=float)
+        self.stages = len(self.b)
+        if self.A.shape != (self.stages, self.stages) or self.c.shape != (self.stages,):
+            raise ValueError("Размеры A, b и c таблицы Бутчера не согласованы")
+        if np.any(np.triu(self.A) != 0):
+            raise ValueError("Матрица A явного метода должна быть строго нижнетреугольной")
+        self.order = order
+        self.name = name
+
+
+EULER = ButcherTableau([[0]], [1], [0], order=1, name="euler")
+ERK1 = ButcherTableau([[0]], [1], [.5], order=1, name="erk1")
+ERK2 = ButcherTableau([[0, 0], [2/3, 0]], [.25, .75], [0, 2/3], order=2, name="erk2")
+ERK3 = ButcherTableau([[0, 0, 0], [.5, 0, 0], [-1, 2, 0]], [1/6, 2/3, 1/6], [0, .5, 1], order=3, name="erk3")
+ERK4 = ButcherTableau([[0, 0, 0, 0], [.5, 0, 0, 0], [0, .5, 0, 0], [0, 0, 1, 0]], [1/6, 1/3, 1/3, 1/6],
+                      [0, .5, .5, 1], order=4, name="erk4")
+
+# Решение 5-го порядка пары Дорманда-Принса (без стадии FSAL, нужной только для оценки погрешности)
+RK5 = ButcherTableau(
+    A=[[0, 0, 0, 0, 0, 0],
+       [1/5, 0, 0, 0, 0, 0],
+       [3/40, 9/40, 0, 0, 0, 0],
+       [44/45, -56/15, 32/9, 0, 0, 0],
+       [19372/6561, -25360/2187, 64448/6561, -212/729, 0, 0],
+       [9017/3168, -355/33, 46732/5247, 49/176, -5103/18656, 0]],
+    b=[35/384, 0, 500/1113, 125/192, -2187/6784, 11/84],
+    c=[0, 1/5, 3/10, 4/5, 8/9, 1],
+    order=5,
+    name="rk5",
+)
+
+# Метод Купера-Вернера 8-го порядка (11 стадий)
+_R21 = np.sqrt(21)
+RK8 = ButcherTableau(
+    A=[[0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0],
+       [1/2, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0],
+       [1/4, 1/4, 0, 0, 0, 0, 0, 0, 0, 0, 0],
+       [1/7, (-7 - 3*_R21)/98, (21 + 5*_R21)/49, 0, 0, 0, 0, 0, 0, 0, 0],
+       [(11 + _R21)/84, 0, (18 + 4*_R21)/63, (21 - _R21)/252, 0, 0, 0, 0, 0, 0, 0],
+       [(5 + _R21)/48, 0, (9 + _R21)/36, (-231 + 14*_R21)/360, (63 - 7*_R21)/80, 0, 0, 0, 0, 0, 0],
+       [(10 - _R21)/42, 0, (-432 + 92*_R21)/315, (633 - 145*_R21)/90, (-504 + 115*_R21)/70, (63 - 13*_R21)/35,
+        0, 0, 0, 0, 0],
+       [1/14, 0, 0, 0, (14 - 3*_R21)/126, (13 - 3*_R21)/63, 1/9, 0, 0, 0, 0],
+       [1/32, 0, 0, 0, (91 - 21*_R21)/576, 11/72, (-385 - 75*_R21)/1152, (63 + 13*_R21)/128, 0, 0, 0],
+       [1/14, 0, 0, 0, 1/9, (-733 - 147*_R21)/2205, (515 + 111*_R21)/504, (-51 - 11*_R21)/56,
+        (132 + 28*_R21)/245, 0, 0],
+       [0, 0, 0, 0, (-42 + 7*_R21)/18, (-18 + 28*_R21)/45, (-273 - 53*_R21)/72, (301 + 53*_R21)/72,
+        (28 - 28*_R21)/45, (49 - 7*_R21)/18, 0]],
+    b=[1/20, 0, 0, 0, 0, 0, 0, 49/180, 16/45, 49/180, 1/20],
+    c=[0, 1/2, 1/2, (7 + _R21)/14, (7 + _R21)/14, 1/2, (7 - _R21)/14, (7 - _R21)/14, 1/2, (7 + _R21)/14, 1],
+    order=8,
+    name="rk8",
+)
+
+TABLEAUS = {tableau.name: tableau for tableau in (EULER, ERK1, ERK2, ERK3, ERK4, RK5, RK8)}
+
+
+def _allocate(f: Callable[..., float], x0: float, y0, n: int, args: Tuple):
     """
-    h = (interval[1] - interval[0]) / n
+    Выделяет массивы Y и Y' под решение и заполняет начальную строку.
+    Форма строки определяется y0 и значением f(x0, y0, *args), поэтому
+    пакет задается как массивом начальных условий, так и массивом параметров.
+    """
+    yprime0 = f(x0, y0, *args)
+    shape = np.broadcast_shapes(np.shape(y0), np.shape(yprime0))
 
-    X = np.linspace(interval[0], interval[1], n)
-    Y = np.zeros(n)
-    Yprime = np.zeros(n)
+    Y = np.zeros((n,) + shape)
+    Yprime = np.zeros_like(Y)
     Y[0] = y0
-    Yprime[0] = f(X[0], y0)
+    Yprime[0] = yprime0
 
-    for i in range(n-1):
-        Y[i+1] = Y[i] + h * f(X[i], Y[i])
-        Yprime[i + 1] = f(X[i], Y[i])
+    return Y, Yprime
 
-    return X, Y, Yprime
+
+def _step(interval: Tuple[float, float], n: int) -> float:
+    """Шаг сетки из n точек от x0 до x1 включительно."""
+    if n < 2:
+        raise ValueError(f"Число точек сетки должно быть не меньше 2 (начало и конец интервала), а не {n}")
+    return (interval[1] - interval[0]) / (n - 1)
+
+
+def _grid(interval: Tuple[float, float], n: int):
+    """Сетка из n точек от x0 до x1 включительно и ее шаг."""
+    return np.linspace(interval[0], interval[1], n), _step(interval, n)
 
 
-def erk1(f: Callable[..., float], interval: Tuple[float, float], y0: float, n: int = 10000):
+def _stepper(f: Callable[..., float], tableau: ButcherTableau, h: float, shape: Tuple, args: Tuple):
     """
-    Решает обыкновенное дифференциальное уравнение (ОДУ) методом Рунге-Кутты 1-го порядка.
+    Шаг явного метода Рунге-Кутты с постоянным шагом h:
+    step(x, x_next, y, y', out) -> y(x_next), y'(x_next).
+    Для массивов стадии хранятся в заранее выделенном буфере, а новое значение y
+    записывается в out (не должен совпадать с y). Для одного уравнения шаг считается
+    на числах Python - это быстрее операций с массивами нулевой размерности.
+    """
+    hA, hb, hc = h * tableau.A, h * tableau.b, h * tableau.c
+    s = tableau.stages
+    reuse = tableau.c[0] == 0  # первая стадия - y' в начале шага
+
+    if shape == ():
+        rows = [[(l, a) for l, a in enumerate(hA[j, :j].tolist()) if a != 0] for j in range(s)]
+        weights = [(j, w) for j, w in enumerate(hb.tolist()) if w != 0]
+        shifts = hc.tolist()
+
+        def step(x, x_next, y, yprime, out=None):
+            K = [yprime if reuse else f(x + shifts[0], y, *args)]
+            for j in range(1, s):
+                stage = y
+                for l, a in rows[j]:
+                    stage += a * K[l]
+                K.append(f(x + shifts[j], stage, *args))
+            y_new = y
+            for j, w in weights:
+                y_new += w * K[j]
+            return y_new, f(x_next, y_new, *args)
+
+        return step
+
+    K = np.empty((s,) + shape)
+    stage = np.empty(shape)
+    K_flat, stage_flat = K.reshape(s, -1), stage.reshape(-1)
+    # представления строк A и уже вычисленных стадий готовятся заранее, а не на каждом шаге
+    rows = [(hA[j, :j], K_flat[:j], K[j]) for j in range(s)]
+    shifts = hc.tolist()
+
+    def step(x, x_next, y, yprime, out):
+        K[0] = yprime if reuse else f(x + shifts[0], y, *args)
+        for j in range(1, s):
+            a, previous, k = rows[j]
+            np.dot(a, previous, out=stage_flat)
+            np.add(stage, y, out=stage)
+            k[...] = f(x + shifts[j], stage, *args)
+        np.dot(hb, K_flat, out=out.reshape(-1))
+        out += y
+        return out, f(x_next, out, *args)
+
+    return step
+
+
+def explicit_rk(f: Callable[..., float], interval: Tuple[float, float], y0, tableau, n: int = 10000,
+                args: Tuple = (), progress: Callable[[float], None] = None, stats: SolveStats = None):
+    """
+    Решает обыкновенное дифференциальное уравнение (ОДУ) явным методом Рунге-Кутты
+    с постоянным шагом по произвольной таблице Бутчера.
 
     Параметры
     ----------
@@ -52,218 +172,426 @@ def erk1(f: Callable[..., float], interval: Tuple[float, float], y0: float, n: i
         Функция правой части ОДУ вида y' = f(x, y).
         Должна принимать два аргумента: x (float) и y (float),
         и возвращать значение производной (float).
+        Для системы y' = f(x, y), y из R^m, f принимает и возвращает
+        вектор длины m (см. system); решение хранится массивом (n, m).
 
     interval :
         Интервал интегрирования в виде (x0, x1), где x0 - начальная точка, x1 - конечная точка.
 
-    y0 : float
+    y0 : float или np.ndarray
         Начальное значение y(x0) для выделения частного решения.
+        Если передан массив начальных значений, все траектории
+        интегрируются одновременно (пакетный режим).
+
+    tableau : ButcherTableau или (A, b, c)
+        Таблица метода: готовая (EULER, ERK1...ERK4, RK5, RK8) или своя.
 
     n : int, optional
-        Количество разбиений сетки.
+        Количество точек сетки (шаг h = (x1 - x0) / (n - 1)).
+
+    args : tuple, optional
+        Дополнительные параметры, передаваемые в f(x, y, *args).
+        Массивы параметров согласуются с y0 по правилам broadcasting.
+
+    progress : callable, optional
+        Функция progress(доля) для отображения хода решения. Чтобы прервать
+        вычисление, она может бросить kernel.progress.SolverCancelled.
+
+    stats : kernel.stats.SolveStats, optional
+        Счетчики вычислений f и шагов.
 
     Возвращает
     -------
         Кортеж столбцов (x, y, y') - точек численного решения ОДУ.
+        В пакетном режиме y и y' имеют форму (n, k), где k - число траекторий.
     """
-
-    h = (interval[1] - interval[0]) / n
-
-    X = np.linspace(interval[0], interval[1], n)
-    Y = np.zeros(n)
-    Yprime = np.zeros(n)
-    Y[0] = y0
-    Yprime[0] = f(X[0], y0)
-
-    b = 1
-    c = .5
-
-    for i in range(n-1):
-        Y[i+1] = Y[i] + h * b * f(X[i] + h*c, Y[i])
-        Yprime[i + 1] = f(X[i], Y[i])
+    if not isinstance(tableau, ButcherTableau):
+        tableau = ButcherTableau(*tableau)
+    _step(interval, n)  # проверка n - в том числе для скомпилированного цикла
+    if backend.can_fuse(f, y0, n, args):
+        return backend.fused_rk(f, tableau.A, tableau.b, tableau.c, interval, y0, n, progress, stats)
+    if stats is not None:
+        f = stats.count_f(f)
+        stats.accepted += n - 1
+
+    X, h = _grid(interval, n)
+    Y, Yprime = _allocate(f, X[0], y0, n, args)
+    step = _stepper(f, tableau, h, Y.shape[1:], args)
+
+    x = X.tolist()
+    scalar = Y.ndim == 1  # иначе step сам записывает y в строку Y[i + 1]
+    y, yprime = (Y[0].item(), Yprime[0].item()) if scalar else (Y[0], Yprime[0])
+    every = stride(n)
+    for i in range(n - 1):
+        if progress is not None and i % every == 0:
+            progress(i / n)
+        y, yprime = step(x[i], x[i + 1], y, yprime, Y[i + 1])
+        if scalar:
+            Y[i + 1] = y
+        Yprime[i + 1] = yprime
 
     return X, Y, Yprime
 
 
-def erk2(f: Callable[..., float], interval: Tuple[float, float], y0, n: int = 10000):
+def euler(f: Callable[..., float], interval: Tuple[float, float], y0, n: int = 10000, args: Tuple = (),
+          progress: Callable[[float], None] = None, stats: SolveStats = None):
     """
-    Решает обыкновенное дифференциальное уравнение (ОДУ) методом Рунге-Кутты 2-го порядка.
+    Решает ОДУ методом Эйлера. Параметры и результат - как у explicit_rk.
+    """
+    return explicit_rk(f, interval, y0, EULER, n, args, progress, stats)
 
-    Параметры
-    ----------
-    f : callable
-        Функция правой части ОДУ вида y' = f(x, y).
-        Должна принимать два аргумента: x (float) и y (float),
-        и возвращать значение производной (float).
 
-    interval :
-        Интервал интегрирования в виде (x0, x1), где x0 - начальная точка, x1 - конечная точка.
+def erk1(f: Callable[..., float], interval: Tuple[float, float], y0, n: int = 10000, args: Tuple = (),
+         progress: Callable[[float], None] = None, stats: SolveStats = None):
+    """
+    Решает ОДУ методом Рунге-Кутты 1-го порядка. Параметры и результат - как у explicit_rk.
+    """
+    return explicit_rk(f, interval, y0, ERK1, n, args, progress, stats)
 
-    y0 : float
-        Начальное значение y(x0) для выделения частного решения.
 
-    n : int, optional
-        Количество разбиений сетки.
+def erk2(f: Callable[..., float], interval: Tuple[float, float], y0, n: int = 10000, args: Tuple = (),
+         progress: Callable[[float], None] = None, stats: SolveStats = None):
+    """
+    Решает ОДУ методом Рунге-Кутты 2-го порядка. Параметры и результат - как у explicit_rk.
+    """
+    return explicit_rk(f, interval, y0, ERK2, n, args, progress, stats)
 
-    Возвращает
-    -------
-        Кортеж столбцов (x, y, y') - точек численного решения ОДУ.
+
+def erk3(f: Callable[..., float], interval: Tuple[float, float], y0, n: int = 10000, args: Tuple = (),
+         progress: Callable[[float], None] = None, stats: SolveStats = None):
     """
+    Решает ОДУ методом Рунге-Кутты 3-го порядка. Параметры и результат - как у explicit_rk.
+    """
+    return explicit_rk(f, interval, y0, ERK3, n, args, progress, stats)
 
-    h = (interval[1] - interval[0]) / n
 
-    X = np.linspace(interval[0], interval[1], n)
-    Y = np.zeros(n)
-    Yprime = np.zeros(n)
-    Y[0] = y0
-    Yprime[0] = f(X[0], y0)
+def erk4(f: Callable[..., float], interval: Tuple[float, float], y0, n: int = 10000, args: Tuple = (),
+         progress: Callable[[float], None] = None, stats: SolveStats = None):
+    """
+    Решает ОДУ классическим методом Рунге-Кутты 4-го порядка. Параметры и результат - как у explicit_rk.
+    """
+    return explicit_rk(f, interval, y0, ERK4, n, args, progress, stats)
 
-    B = np.array([.25, .75])
-    c2 = 2/3
-    a2 = 2/3
 
-    # 0  | 0  0
-    # c2 | a2 0
-    # ===|======
-    #    | b1 b2
+def rk5(f: Callable[..., float], interval: Tuple[float, float], y0, n: int = 10000, args: Tuple = (),
+        progress: Callable[[float], None] = None, stats: SolveStats = None):
+    """
+    Решает ОДУ методом Рунге-Кутты 5-го порядка (6 стадий). Параметры и результат - как у explicit_rk.
+    """
+    return explicit_rk(f, interval, y0, RK5, n, args, progress, stats)
 
-    for i in range(n-1):
-        w1 = f(X[i], Y[i])
-        w2 = f(X[i] + h * c2, Y[i] + h * a2 * w1)
 
-        W = np.array([w1, w2])
-        Y[i+1] = Y[i] + h * (B @ W)
-        Yprime[i + 1] = w1
+def rk8(f: Callable[..., float], interval: Tuple[float, float], y0, n: int = 10000, args: Tuple = (),
+        progress: Callable[[float], None] = None, stats: SolveStats = None):
+    """
+    Решает ОДУ методом Рунге-Кутты 8-го порядка (11 стадий). Параметры и результат - как у explicit_rk.
+    """
+    return explicit_rk(f, interval, y0, RK8, n, args, progress, stats)
+
+
+# Коэффициенты методов Адамса порядка k: ADAMS_BASHFORTH[k][j] - вес f_(i-j) в явном k-шаговом методе,
+# ADAMS_MOULTON[k][j] - вес f_(i+1-j) в неявном (k-1)-шаговом методе (корректор схемы PECE)
+ADAMS_BASHFORTH = {
+    2: [3/2, -1/2],
+    3: [23/12, -16/12, 5/12],
+    4: [55/24, -59/24, 37/24, -9/24],
+    5: [1901/720, -2774/720, 2616/720, -1274/720, 251/720],
+}
+ADAMS_MOULTON = {
+    2: [1/2, 1/2],
+    3: [5/12, 8/12, -1/12],
+    4: [9/24, 19/24, -5/24, 1/24],
+    5: [251/720, 646/720, -264/720, 106/720, -19/720],
+}
+
+# Имя метода -> (порядок, есть ли корректор)
+ADAMS_METHODS = {f"ab{k}": (k, False) for k in ADAMS_BASHFORTH}
+ADAMS_METHODS.update({f"abm{k}": (k, True) for k in ADAMS_MOULTON})
+
+
+def _ring_weights(coeffs: Sequence[float], h: float, k: int):
+    """
+    Веса h * coeffs для кольцевого буфера из k производных при каждом положении r самой новой из них:
+    weights[r][slot] - вес производной в ячейке slot (coeffs[j] относится к ячейке (r - j) mod k).
+    """
+    weights = np.zeros((k, k))
+    for r in range(k):
+        for j, coeff in enumerate(coeffs):
+            weights[r, (r - j) % k] = h * coeff
+    return weights
+
+
+def _adams(f: Callable[..., float], interval: Tuple[float, float], y0, n: int, order: int, corrector: bool,
+           args: Tuple, progress: Callable[[float], None], stats: SolveStats):
+    if order not in ADAMS_BASHFORTH:
+        raise ValueError(f"Порядок методов Адамса - от 2 до 5, а не {order}")
+
+    X, h = _grid(interval, n)
+    # первые order точек (разгон) считаются методом erk4 с тем же шагом
+    start = min(order, n)
+    _, Y_start, Yprime_start = erk4(f, (X[0], X[start - 1]), y0, start, args, stats=stats)
+    if stats is not None:
+        f = stats.count_f(f)
+        stats.accepted += n - start
+
+    Y = np.empty((n,) + Y_start.shape[1:])
+    Yprime = np.empty_like(Y)
+    Y[:start] = Y_start
+    Yprime[:start] = Yprime_start
+    Y_flat, Yprime_flat = Y.reshape(n, -1), Yprime.reshape(n, -1)
+
+    # кольцевой буфер последних order производных: f_i хранится в ячейке i mod order
+    ring = Yprime_flat[:start].copy()
+    predictor = _ring_weights(ADAMS_BASHFORTH[order], h, order)
+    corrector_weights = _ring_weights(ADAMS_MOULTON[order][1:], h, order)
+    h_new = h * ADAMS_MOULTON[order][0]  # вес f_(i+1) в корректоре
+
+    every = stride(n)
+    for i in range(start - 1, n - 1):
+        if progress is not None and i % every == 0:
+            progress(i / n)
+        r = i % order
+
+        np.dot(predictor[r], ring, out=Y_flat[i + 1])
+        Y_flat[i + 1] += Y_flat[i]
+        yprime = f(X[i + 1], Y[i + 1], *args)
+
+        if corrector:
+            np.dot(corrector_weights[r], ring, out=Y_flat[i + 1])
+            Y_flat[i + 1] += Y_flat[i]
+            Y[i + 1] += h_new * yprime
+            yprime = f(X[i + 1], Y[i + 1], *args)
+
+        Yprime[i + 1] = yprime
+        ring[(i + 1) % order] = Yprime_flat[i + 1]
 
     return X, Y, Yprime
 
 
-def erk3(f: Callable[..., float], interval: Tuple[float, float], y0, n: int=10000):
+def adams_bashforth(f: Callable[..., float], interval: Tuple[float, float], y0, n: int = 10000, order: int = 4,
+                    args: Tuple = (), progress: Callable[[float], None] = None, stats: SolveStats = None):
     """
-    Решает обыкновенное дифференциальное уравнение (ОДУ) методом Рунге-Кутты 3-го порядка.
+    Решает ОДУ явным методом Адамса-Башфорта с постоянным шагом: одно вычисление f на шаг.
+    Подходит для гладких нежестких задач с дорогой правой частью.
 
     Параметры
     ----------
-    f : callable
-        Функция правой части ОДУ вида y' = f(x, y).
-        Должна принимать два аргумента: x (float) и y (float),
-        и возвращать значение производной (float).
-
-    interval :
-        Интервал интегрирования в виде (x0, x1), где x0 - начальная точка, x1 - конечная точка.
+    f, interval, y0, n, args, progress, stats :
+        Как у explicit_rk.
 
-    y0 : float
-        Начальное значение y(x0) для выделения частного решения.
-
-    n : int, optional
-        Количество разбиений сетки.
+    order : int, optional
+        Порядок метода (число используемых прошлых производных), от 2 до 5.
+        Первые order точек считаются методом erk4.
 
     Возвращает
     -------
         Кортеж столбцов (x, y, y') - точек численного решения ОДУ.
     """
-
-    h = (interval[1] - interval[0]) / n
-
-    X = np.linspace(interval[0], interval[1], n)
-    Y = np.zeros(n)
-    Yprime = np.zeros(n)
-    Y[0] = y0
-    Yprime[0] = f(X[0], y0)
+    return _adams(f, interval, y0, n, order, False, args, progress, stats)
 
 
-    B = np.array([1/6, 2/3, 1/6])
-    c2 = .5
-    c3 = 1.
-
-    a2 = .5
-    a31 = -1.
-    a32 = 2.
+def adams_bashforth_moulton(f: Callable[..., float], interval: Tuple[float, float], y0, n: int = 10000,
+                            order: int = 4, args: Tuple = (), progress: Callable[[float], None] = None,
+                            stats: SolveStats = None):
+    """
+    Решает ОДУ схемой "прогноз-коррекция" PECE: прогноз методом Адамса-Башфорта, коррекция
+    неявным методом Адамса-Моултона того же порядка. Два вычисления f на шаг; погрешность
+    и область устойчивости заметно лучше, чем у adams_bashforth того же порядка.
 
-    # 0  | 0   0   0
-    # c2 | a2  0   0
-    # c3 | a31 a32 0
-    # ===|===========
-    #    | b1  b2  b3
+    Параметры
+    ----------
+    f, interval, y0, n, args, progress, stats :
+        Как у explicit_rk.
 
+    order : int, optional
+        Порядок метода, от 2 до 5. Первые order точек считаются методом erk4.
 
-    for i in range(n-1):
-        w1 = f(X[i], Y[i])
-        w2 = f(X[i] + h * c2, Y[i] + h * a2 * w1)
-        w3 = f(X[i] + h * c3, Y[i] + h * a31 * w1 + h * a32 * w2)
+    Возвращает
+    -------
+        Кортеж столбцов (x, y, y') - точек численного решения ОДУ.
+    """
+    return _adams(f, interval, y0, n, order, True, args, progress, stats)
 
-        W = np.array([w1, w2, w3])
 
-        Y[i + 1] = Y[i] + h * (B @ W)
-        Yprime[i + 1] = w1
+# Число шагов, которое скомпилированный цикл делает за один вызов в потоковом режиме
+STREAM_BLOCK = 2 ** 16
 
-    return X, Y, Yprime
 
+class ChunkBuffer:
+    """
+    Накопитель точек решения для потоковых солверов: собирает строки (x, y, y')
+    в массивы по chunk точек и отдает заполненные части.
+    """
 
-def erk4(f: Callable[..., float], interval: Tuple[float, float], y0, n: int=10000):
+    def __init__(self, chunk: int, shape: Tuple = (), dtype=float):
+        self.chunk = chunk
+        self.shape = shape
+        self.dtype = dtype
+        self._new()
+
+    def _new(self):
+        self.X = np.empty(self.chunk)
+        self.Y = np.empty((self.chunk,) + self.shape, dtype=self.dtype)
+        self.Yprime = np.empty_like(self.Y)
+        self.size = 0
+
+    def push(self, x, y, yprime) -> bool:
+        """Добавляет одну точку; возвращает True, если часть заполнена (заберите ее через pop)."""
+        self.X[self.size] = x
+        self.Y[self.size] = y
+        self.Yprime[self.size] = yprime
+        self.size += 1
+        return self.size == self.chunk
+
+    def extend(self, X, Y, Yprime):
+        """Добавляет массив точек; генератор заполненных частей."""
+        start = 0
+        while start < len(X):
+            take = min(self.chunk - self.size, len(X) - start)
+            stop = start + take
+            self.X[self.size:self.size + take] = X[start:stop]
+            self.Y[self.size:self.size + take] = Y[start:stop]
+            self.Yprime[self.size:self.size + take] = Yprime[start:stop]
+            self.size += take
+            start = stop
+            if self.size == self.chunk:
+                yield self.pop()
+
+    def pop(self):
+        """Забирает накопленную часть (x, y, y') и начинает новую."""
+        part = self.X[:self.size], self.Y[:self.size], self.Yprime[:self.size]
+        self._new()
+        return part
+
+
+def stream(method: str, f: Callable[..., float], interval: Tuple[float, float], y0, n: int = 10000,
+           chunk: int = 65536, every: int = 1, args: Tuple = (), progress: Callable[[float], None] = None,
+           stats: SolveStats = None):
     """
-    Решает обыкновенное дифференциальное уравнение (ОДУ) методом Рунге-Кутты 4-го порядка.
+    Потоковый вариант explicit_rk: решение выдается частями по мере вычисления.
+    В памяти хранится только текущая часть, поэтому n может быть сколь угодно
+    большим, а части можно сразу записывать на диск или выводить на график.
+    Сетка и значения совпадают с explicit_rk (euler, erk1, ...).
 
     Параметры
     ----------
-    f : callable
-        Функция правой части ОДУ вида y' = f(x, y).
-        Должна принимать два аргумента: x (float) и y (float),
-        и возвращать значение производной (float).
+    method : str или ButcherTableau
+        Имя метода из TABLEAUS ("euler", "erk1"..."erk4", "rk5", "rk8") или своя таблица.
 
-    interval :
-        Интервал интегрирования в виде (x0, x1), где x0 - начальная точка, x1 - конечная точка.
+    f, interval, y0, n, args, progress, stats :
+        Как у explicit_rk.
 
-    y0 : float
-        Начальное значение y(x0) для выделения частного решения.
+    chunk : int, optional
+        Число сохраняемых точек в одной части (последняя часть может быть короче).
 
-    n : int, optional
-        Количество разбиений сетки.
+    every : int, optional
+        Сохраняется каждая every-я точка сетки (прореживание), начиная с x0.
 
     Возвращает
     -------
-        Кортеж столбцов (x, y, y') - точек численного решения ОДУ.
+        Генератор кортежей столбцов (x, y, y') - последовательных частей решения.
     """
+    if isinstance(method, ButcherTableau):
+        tableau = method
+    elif method in TABLEAUS:
+        tableau = TABLEAUS[method]
+    else:
+        raise ValueError(f"Неизвестный метод: {method}")
+
+    x0, x1 = interval
+    h = _step(interval, n)
+
+    def grid(g):
+        return np.where(g == n - 1, x1, x0 + g * h)  # точки np.linspace(x0, x1, n)
+
+    fused = backend.can_fuse(f, y0, n, args)
+    if stats is not None:
+        if fused:  # как в backend.fused_rk: счетчики по числу стадий, без обертки над f
+            stats.f_evals += 1 + (n - 1) * (tableau.stages + (tableau.c[0] != 0))
+        else:
+            f = stats.count_f(f)
+        stats.accepted += n - 1
+
+    yprime = f(x0, y0, *args)
+    shape = np.broadcast_shapes(np.shape(y0), np.shape(yprime))
+    y = np.broadcast_to(np.asarray(y0, dtype=float), shape).copy()
+    yprime = np.broadcast_to(yprime, shape).copy()
+    buffer = ChunkBuffer(chunk, shape)
+
+    if fused:
+        Xb = np.empty(STREAM_BLOCK + 1)
+        Yb = np.empty(STREAM_BLOCK + 1)
+        Ypb = np.empty(STREAM_BLOCK + 1)
+        for start in range(0, n, STREAM_BLOCK):
+            if progress is not None:
+                progress(start / n)
+            stop = min(start + STREAM_BLOCK, n - 1)  # последняя точка блока - первая точка следующего
+            size = stop - start + 1
+            Xb[:size] = grid(np.arange(start, stop + 1))
+            Yb[0] = y
+            Ypb[0] = yprime
+            backend.fused_rk_block(f, tableau.A, tableau.b, tableau.c, Xb[:size], h, Yb[:size], Ypb[:size])
+            y, yprime = Yb[size - 1], Ypb[size - 1]
+
+            last = stop if stop == n - 1 else stop - 1
+            first = -start % every
+            yield from buffer.extend(Xb[first:last - start + 1:every], Yb[first:last - start + 1:every],
+                                     Ypb[first:last - start + 1:every])
+    else:
+        step = _stepper(f, tableau, h, shape, args)
+        if shape == ():
+            y, yprime = y.item(), yprime.item()
+        spare = np.empty(shape)  # y текущего шага и out чередуются, чтобы не выделять память на шаге
+        progress_step = stride(n)
+        for g in range(n):
+            x = x1 if g == n - 1 else x0 + g * h
+            if g % every == 0 and buffer.push(x, y, yprime):
+                yield buffer.pop()
+            if g == n - 1:
+                break
+            if progress is not None and g % progress_step == 0:
+                progress(g / n)
+
+            out = spare
+            spare = y
+            y, yprime = step(x, x1 if g + 1 == n - 1 else x0 + (g + 1) * h, y, yprime, out)
+
+    if buffer.size:
+        yield buffer.pop()
+
+
+def system(f_strs: Sequence[str]):
+    """
+    Строит правую часть системы ОДУ y' = f(x, y), y = (y1, ..., ym).
 
-    h = (interval[1] - interval[0]) / n
-
-    X = np.linspace(interval[0], interval[1], n)
-    Y = np.zeros(n)
-    Yprime = np.zeros(n)
-    Y[0] = y0
-    Yprime[0] = f(X[0], y0)
-
-    B = np.array([1/6, 1/3, 1/3, 1/6])
-    c2 = .5
-    c3 = .5
-    c4 = 1.
-
-    a2 = .5
-    a3 = .5
-    a4 = 1
+    Параметры
+    ----------
+    f_strs : sequence of str
+        Строки f_strs[i] - правые части уравнений y(i+1)' = f_i(x, y1, ..., ym).
 
-    # 0  | 0  0  0  0
-    # c2 | a2 0  0  0
-    # c3 | 0  a3 0  0
-    # c4 | 0  0  a4 0
-    # ===|===========
-    #    | b1 b2 b3 b4
+    Возвращает
+    -------
+        Функции f(x, y) -> np.ndarray (m,) и dfdy(x, y) -> np.ndarray (m, m) (матрица Якоби).
+    """
+    m = len(f_strs)
+    x = sp.symbols('x')
+    y_sym = sp.symbols(f'y1:{m + 1}')
+    f_sym = [cache.sympify(f_str) for f_str in f_strs]
 
-    for i in range(n-1):
+    f_kernel, f_initial = cache.lambdify_into((x,) + y_sym, f_sym)
+    J_kernel, J_initial = cache.lambdify_into((x,) + y_sym, list(cache.jacobian(f_sym, y_sym)))
 
-        w1 = f(X[i], Y[i])
-        w2 = f(X[i] + h * c2, Y[i] + h * a2 * w1)
-        w3 = f(X[i] + h * c3, Y[i] + h * a3 * w2)
-        w4 = f(X[i] + h * c4, Y[i] + h * a4 * w3)
+    def f_func(x, y):
+        return f_kernel(f_initial.copy(), x, *y)
 
-        W = np.array([w1, w2, w3, w4])
-        Y[i + 1] = Y[i] + h * (B @ W)
-        Yprime[ i+ 1] = w1
+    def dfdy_func(x, y):
+        return J_kernel(J_initial.copy(), x, *y).reshape(m, m)
 
-    return X, Y, Yprime
+    return f_func, dfdy_func
 
 
-def ros1(f_str: str, interval: Tuple[float, float], y0, alpha, n: int=100):
+def ros1(f_str, interval: Tuple[float, float], y0, alpha, n: int=100, progress: Callable[[float], None] = None,
+         stats: SolveStats = None, jac: Callable = None):
     """
     Решает обыкновенное дифференциальное уравнение (ОДУ) методом Розенброка.
 
@@ -275,53 +603,79 @@ def ros1(f_str: str, interval: Tuple[float, float], y0, alpha, n: int=100):
 
     Параметры
     ----------
-    f : str
-        Строка, содержащая функцию правой части ОДУ вида y' = f(x, y).
+    f : str, sequence of str или callable
+        Строка, содержащая функцию правой части ОДУ вида y' = f(x, y),
+        список строк - правых частей системы от x, y1, ..., ym (см. system),
+        или функция f(x, y) - тогда нужна матрица Якоби jac.
 
     interval :
         Интервал интегрирования в виде (x0, x1), где x0 - начальная точка, x1 - конечная точка.
 
-    y0 : float
-        Начальное значение y(x0) для выделения частного решения.
+    y0 : float или np.ndarray
+        Начальное значение y(x0) для выделения частного решения (для системы - вектор длины m).
 
     n : int, optional
         Количество разбиений сетки.
 
+    progress : callable, optional
+        Функция progress(доля) для отображения хода решения. Чтобы прервать
+        вычисление, она может бросить kernel.progress.SolverCancelled.
+
+    stats : kernel.stats.SolveStats, optional
+        Счетчики вычислений f, Якобиана, линейных систем и шагов.
+
+    jac : callable, optional
+        Матрица Якоби df/dy(x, y) для f, заданной функцией (см. kernel.jacobian).
+
     Возвращает
     -------
         Кортеж столбцов (x, y, y') - точек численного решения ОДУ.
+        Для системы y и y' имеют форму (n, m).
     """
 
-    x, y = sp.symbols('x y')
-    f_sym = sp.sympify(f_str)
-    f_func = sp.lambdify((x, y), f_sym, 'numpy')
-
-    def derivative():
-        dfdy_s = sp.diff(f_sym, y, 1)
-        dfdy_f = sp.lambdify((x, y), dfdy_s, 'numpy')
-        return dfdy_f
-
-    dfdy_func = derivative()
-
-    h = (interval[1] - interval[0]) / n
-    X = np.linspace(interval[0], interval[1], n)
-    Y = np.zeros(n)
-    Yprime = np.zeros(n)
-    Y[0] = y0
-    Yprime[0] = f_func(X[0], y0)
+    if callable(f_str):
+        if jac is None:
+            raise ValueError("Для f, заданной функцией, нужна матрица Якоби jac")
+        f_func, dfdy_func = f_str, jac
+    elif isinstance(f_str, str):
+        x, y = sp.symbols('x y')
+        f_sym = cache.sympify(f_str)
+        f_func = cache.lambdify((x, y), f_sym)
+
+        def derivative():
+            dfdy_s = cache.diff(f_sym, y)
+            dfdy_f = cache.lambdify((x, y), dfdy_s)
+            return dfdy_f
+
+        dfdy_func = derivative()
+    else:
+        f_func, dfdy_func = system(f_str)
+
+    if stats is not None:
+        f_func = stats.count_f(f_func)
+        dfdy_func = stats.count_jac(dfdy_func)
+        stats.accepted += n - 1
+        stats.factorizations += n - 1
+        stats.linear_solves += n - 1
+
+    X, h = _grid(interval, n)
+    Y, Yprime = _allocate(f_func, X[0], y0, n, ())
+    E = np.eye(Y.shape[1]) if Y.ndim > 1 else 1
 
-    alpha = 1
     b1 = 1
     c1 = .5
 
+    every = stride(n)
     for i in range(n-1):
+        if progress is not None and i % every == 0:
+            progress(i / n)
         #Ax = _
-        A = (1 - alpha * h * dfdy_func(X[i], Y[i]))
+        A = (E - alpha * h * dfdy_func(X[i], Y[i]))
         _ = f_func(X[i] + h * c1, Y[i])
 
-        w1 = _ / A
+        w1 = np.linalg.solve(A, _) if Y.ndim > 1 else _ / A
 
         Y[i + 1] = Y[i] + h * b1 * w1.real
-        Yprime[i + 1] = f_func(X[i], Y[i])
+        Yprime[i + 1] = f_func(X[i + 1], Y[i + 1])
 
     return X, Y, Yprime
@@ -0,0 +1,133 @@
+import cProfile
+import io
+import pstats
+import time
+import tracemalloc
+from typing import Callable
+
+from kernel import backend, cache
+
+try:
+    import pyinstrument
+except ImportError:  # pyinstrument - необязательная зависимость, нужна только для profiler="pyinstrument"
+    pyinstrument = None
+
+
+PROFILERS = ("cprofile", "pyinstrument")
+
+
+class SolveStats:
+    """
+    Статистика одного решения: солверы, которым передан объект stats, увеличивают его счетчики.
+    Время и память заполняет Equation.solve.
+    """
+
+    def __init__(self, method: str = ""):
+        self.method = method
+        self.f_evals = 0  # вычисления правой части
+        self.jac_evals = 0  # вычисления матрицы Якоби
+        self.factorizations = 0  # обращения/разложения матриц неявных схем
+        self.linear_solves = 0  # решенные линейные системы
+        self.accepted = 0  # принятые шаги
+        self.rejected = 0  # отклоненные шаги
+        self.stiff_steps = 0  # принятые шаги жестким методом (method="auto")
+        self.switches = 0  # переключения между явным и жестким методом (method="auto")
+        self.compile_time = 0.  # с, разбор и компиляция выражений (sympy, numba)
+        self.integrate_time = 0.  # с, само интегрирование
+        self.peak_memory = None  # байт, пик выделенной памяти (если отслеживался)
+        self.profile = None  # текстовый отчет профилировщика (если был включен)
+
+    def count_f(self, f: Callable) -> Callable:
+        """Обертка над f, считающая ее вызовы в f_evals."""
+        def counted(*args):
+            self.f_evals += 1
+            return f(*args)
+        return counted
+
+    def count_jac(self, jac: Callable) -> Callable:
+        """Обертка над функцией Якобиана, считающая ее вызовы в jac_evals."""
+        def counted(*args):
+            self.jac_evals += 1
+            return jac(*args)
+        return counted
+
+    def as_dict(self) -> dict:
+        return dict(self.__dict__)
+
+    def __str__(self):
+        lines = [f"Метод: {self.method}",
+                 f"Вычислений f: {self.f_evals}",
+                 f"Вычислений Якобиана: {self.jac_evals}",
+                 f"Разложений матриц / линейных систем: {self.factorizations} / {self.linear_solves}",
+                 f"Шагов принято / отклонено: {self.accepted} / {self.rejected}",
+                 f"Компиляция: {self.compile_time:.3f} с, интегрирование: {self.integrate_time:.3f} с"]
+        if self.switches or self.stiff_steps:
+            lines.append(f"Шагов жестким методом / переключений: {self.stiff_steps} / {self.switches}")
+        if self.peak_memory is not None:
+            lines.append(f"Пик памяти: {self.peak_memory / 2 ** 20:.2f} МБ")
+        return "\n".join(lines)
+
+
+def profile(run: Callable[[], object], profiler: str = "cprofile", limit: int = 30):
+    """
+    Выполняет run() под профилировщиком.
+    :param profiler: "cprofile" (стандартная библиотека) или "pyinstrument"
+    :param limit: число строк отчета cProfile
+    :return: результат run() и текстовый отчет
+    """
+    if profiler == "cprofile":
+        prof = cProfile.Profile()
+        result = prof.runcall(run)
+        report = io.StringIO()
+        pstats.Stats(prof, stream=report).sort_stats("cumulative").print_stats(limit)
+        return result, report.getvalue()
+
+    if profiler == "pyinstrument":
+        if pyinstrument is None:
+            raise ImportError("Для profiler='pyinstrument' нужен пакет pyinstrument")
+        prof = pyinstrument.Profiler()
+        prof.start()
+        try:
+            result = run()
+        finally:
+            prof.stop()
+        return result, prof.output_text()
+
+    raise ValueError(f"Неизвестный профилировщик: {profiler}")
+
+
+def instrumented(func: Callable, *args, stats: SolveStats, track_memory: bool = False, profiler: str = None,
+                 **kwargs):
+    """
+    Вызывает func(*args, stats=stats, **kwargs) и дописывает в stats время компиляции
+    (разбор и компиляция выражений в kernel.cache, компиляция циклов backend) и интегрирования.
+    :param track_memory: отслеживать пик выделенной памяти (tracemalloc, замедляет решение)
+    :param profiler: "cprofile" или "pyinstrument" - отчет попадет в stats.profile
+    """
+    compiled_before = cache.expressions.build_time + backend.compile_time
+    tracing = track_memory and not tracemalloc.is_tracing()
+    if tracing:
+        tracemalloc.start()
+    elif track_memory:
+        tracemalloc.reset_peak()
+
+    def run():
+        return func(*args, stats=stats, **kwargs)
+
+    start = time.perf_counter()
+    try:
+        if profiler is None:
+            result = run()
+        else:
+            result, stats.profile = profile(run, profiler)
+    finally:
+        elapsed = time.perf_counter() - start
+        if track_memory:
+            stats.peak_memory = tracemalloc.get_traced_memory()[1]
+        if tracing:
+            tracemalloc.stop()
+
+    compiled = cache.expressions.build_time + backend.compile_time - compiled_before
+    stats.compile_time += compiled
+    stats.integrate_time += elapsed - compiled
+    return result
@@ -0,0 +1,208 @@
+import json
+import os
+import numpy as np
+from typing import Iterable, Tuple
+
+try:
+    import h5py
+except ImportError:  # h5py - необязательная зависимость, нужна только для файлов .h5
+    h5py = None
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pyarrow - необязательная зависимость, нужна только для файлов .parquet
+    pa = pq = None
+
+
+# Расширения файлов и форматы, в которые сохраняется решение
+FORMATS = {".npy": "npy", ".h5": "hdf5", ".hdf5": "hdf5", ".parquet": "parquet"}
+
+
+def _format(path: str) -> str:
+    ext = os.path.splitext(path)[1].lower()
+    if ext not in FORMATS:
+        raise ValueError(f"Неизвестный формат файла: {ext}")
+    return FORMATS[ext]
+
+
+def _dtype(shape: Tuple) -> np.dtype:
+    return np.dtype([("x", float), ("y", float, shape), ("yprime", float, shape)])
+
+
+class NpyWriter:
+    """
+    Запись решения в .npy, отображенный в память (np.lib.format.open_memmap).
+    Файл - структурированный массив с полями x, y, yprime; длина задается заранее.
+    Если записано меньше точек, при закрытии файл укорачивается до записанных.
+    """
+
+    def __init__(self, path: str, length: int, shape: Tuple = ()):
+        self.path = path
+        self.data = np.lib.format.open_memmap(path, mode="w+", dtype=_dtype(shape), shape=(length,))
+        self.size = 0
+
+    def append(self, X, Y, Yprime) -> None:
+        stop = self.size + len(X)
+        if stop > len(self.data):
+            raise ValueError(f"В файл записано больше {len(self.data)} точек")
+        self.data["x"][self.size:stop] = X
+        self.data["y"][self.size:stop] = Y
+        self.data["yprime"][self.size:stop] = Yprime
+        self.size = stop
+
+    def close(self) -> None:
+        self.data.flush()
+        length, offset, dtype = len(self.data), self.data.offset, self.data.dtype
+        del self.data
+        if self.size < length:
+            self._truncate(offset, dtype)
+
+    def _truncate(self, offset: int, dtype: np.dtype) -> None:
+        """Переписывает заголовок .npy на self.size точек (той же длины - данные не сдвигаются) и обрезает файл."""
+        header = repr({"descr": np.lib.format.dtype_to_descr(dtype), "fortran_order": False,
+                       "shape": (self.size,)})
+        with open(self.path, "r+b") as file:
+            major, _ = np.lib.format.read_magic(file)
+            start = file.tell() + (2 if major == 1 else 4)  # после поля длины заголовка
+            file.seek(start)
+            file.write((header + " " * (offset - start - len(header) - 1) + "\n").encode("latin1"))
+            file.truncate(offset + self.size * dtype.itemsize)
+
+
+class HDF5Writer:
+    """Запись решения в HDF5: наборы данных x, y, yprime, которые растут по частям."""
+
+    def __init__(self, path: str, shape: Tuple = (), chunk: int = 65536):
+        if h5py is None:
+            raise ImportError("Для записи .h5 нужен пакет h5py")
+        self.file = h5py.File(path, "w")
+        for name, row in (("x", ()), ("y", shape), ("yprime", shape)):
+            self.file.create_dataset(name, shape=(0,) + row, maxshape=(None,) + row,
+                                     chunks=(chunk,) + row, dtype=float)
+
+    def append(self, X, Y, Yprime) -> None:
+        for name, values in (("x", X), ("y", Y), ("yprime", Yprime)):
+            dataset = self.file[name]
+            start = len(dataset)
+            dataset.resize(start + len(values), axis=0)
+            dataset[start:] = values
+
+    def close(self) -> None:
+        self.file.close()
+
+
+class ParquetWriter:
+    """
+    Запись решения в Parquet: каждая часть - отдельная группа строк.
+    Для систем и пакетов столбцы y и yprime разворачиваются в y_0, y_1, ... и yprime_0, ...,
+    а форма y в одной точке сохраняется в метаданных схемы (ключ shape) - load восстанавливает ее.
+    """
+
+    def __init__(self, path: str, shape: Tuple = ()):
+        if pq is None:
+            raise ImportError("Для записи .parquet нужен пакет pyarrow")
+        self.shape = shape
+        self.writer = None
+        self.path = path
+
+    def _columns(self, X, Y, Yprime) -> dict:
+        if not self.shape:
+            return {"x": X, "y": Y, "yprime": Yprime}
+        columns = {"x": X}
+        Y = np.reshape(Y, (len(X), -1))
+        Yprime = np.reshape(Yprime, (len(X), -1))
+        columns.update({f"y_{k}": Y[:, k] for k in range(Y.shape[1])})
+        columns.update({f"yprime_{k}": Yprime[:, k] for k in range(Yprime.shape[1])})
+        return columns
+
+    def append(self, X, Y, Yprime) -> None:
+        table = pa.table(self._columns(np.asarray(X), np.asarray(Y), np.asarray(Yprime)),
+                         metadata={"shape": json.dumps(list(self.shape))})
+        if self.writer is None:
+            self.writer = pq.ParquetWriter(self.path, table.schema)
+        self.writer.write_table(table)
+
+    def close(self) -> None:
+        if self.writer is not None:
+            self.writer.close()
+
+
+def open_writer(path: str, length: int = None, shape: Tuple = ()):
+    """
+    Открывает файл для записи решения по частям (формат - по расширению, см. FORMATS).
+    :param length: полное число точек (обязательно для .npy)
+    :param shape: форма y в одной точке (() - одно уравнение, (m,) - система или пакет)
+    :return: объект с методами append(X, Y, Yprime) и close()
+    """
+    fmt = _format(path)
+    if fmt == "npy":
+        if length is None:
+            raise ValueError("Для записи .npy нужно заранее знать число точек")
+        return NpyWriter(path, length, shape)
+    if fmt == "hdf5":
+        return HDF5Writer(path, shape)
+    return ParquetWriter(path, shape)
+
+
+def save(path: str, chunks: Iterable[Tuple], length: int = None) -> int:
+    """
+    Записывает решение, заданное частями (x, y, y') - например, из solvers.stream, - не собирая его в памяти.
+    :param length: полное число точек (для .npy; для stream - ceil(n / every))
+    :return: число записанных точек
+    """
+    writer = None
+    size = 0
+    try:
+        for X, Y, Yprime in chunks:
+            if writer is None:
+                writer = open_writer(path, length, np.shape(Y)[1:])
+            writer.append(X, Y, Yprime)
+            size += len(X)
+    finally:
+        if writer is not None:
+            writer.close()
+    return size
+
+
+def save_solution(path: str, solution: Tuple) -> int:
+    """Записывает готовое решение (x, y, y')."""
+    X, Y, Yprime = solution[:3]
+    return save(path, [(X, Y, Yprime)], len(X))
+
+
+def load(path: str, mmap: bool = True):
+    """
+    Читает решение (x, y, y').
+    При mmap=True чтение ленивое: для .npy массивы - представления файла, отображенного в память,
+    для .h5 - наборы данных h5py (читается только запрошенный срез, np.asarray читает весь набор;
+    файл закрывается, когда наборы больше не используются).
+    Parquet читается целиком: столбцы собираются в массивы y и y' исходной формы.
+    """
+    fmt = _format(path)
+    if fmt == "npy":
+        data = np.load(path, mmap_mode="r" if mmap else None)
+        return data["x"], data["y"], data["yprime"]
+
+    if fmt == "hdf5":
+        if h5py is None:
+            raise ImportError("Для чтения .h5 нужен пакет h5py")
+        if mmap:
+            file = h5py.File(path, "r")
+            return file["x"], file["y"], file["yprime"]
+        with h5py.File(path, "r") as file:
+            return file["x"][:], file["y"][:], file["yprime"][:]
+
+    if pq is None:
+        raise ImportError("Для чтения .parquet нужен пакет pyarrow")
+    table = pq.read_table(path, memory_map=mmap)
+    X = table.column("x").to_numpy()
+    if "y" in table.column_names:
+        return X, table.column("y").to_numpy(), table.column("yprime").to_numpy()
+
+    metadata = table.schema.metadata or {}
+    shape = tuple(json.loads(metadata[b"shape"])) if b"shape" in metadata else (-1,)
+    columns = [np.column_stack([table.column(name).to_numpy() for name in table.column_names
+                                if name.startswith(prefix)]).reshape((len(X),) + shape)
+               for prefix in ("y_", "yprime_")]
+    return X, columns[0], columns[1]
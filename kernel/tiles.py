@@ -0,0 +1,89 @@
+import numpy as np
+from typing import Callable, Tuple
+
+from kernel.cache import LRUCache
+from kernel.slope_field import direction_vectors, evaluate_on_mesh
+
+
+ARROWS_PER_TILE = 16  # стрелок вдоль каждой стороны тайла
+
+# Вычисленные тайлы всех полей: ключ - (f, уровень по x, уровень по y, номер тайла по x, по y)
+tile_cache = LRUCache(maxsize=4096)
+
+
+class TiledSlopeField:
+    """
+    Поле направлений, которое вычисляется по тайлам для текущей видимой области.
+    Плоскость разбита на тайлы размером 2^lx x 2^ly; уровни lx, ly подбираются так,
+    чтобы в видимой области было от nx x ny до 2nx x 2ny стрелок, а лишние стрелки
+    прореживаются до примерно nx x ny. При сдвиге или масштабировании вычисляются
+    только новые тайлы, остальные берутся из tile_cache.
+    """
+
+    def __init__(self, f: Callable[..., float], nx: int, ny: int):
+        """
+        :param f: правая часть уравнения y'=f(x, y) (одинаковые уравнения должны давать один объект, см. cache)
+        :param nx: число стрелок по x в видимой области
+        :param ny: число стрелок по y в видимой области
+        """
+        self.f = f
+        self.nx = nx
+        self.ny = ny
+
+    @staticmethod
+    def _level(span: float, n: int) -> int:
+        if not np.isfinite(span) or span == 0 or n <= 0:
+            raise ValueError("Видимая область и число стрелок должны быть ненулевыми")
+        return int(np.floor(np.log2(abs(span) / n * ARROWS_PER_TILE)))
+
+    def _tile(self, lx: int, ly: int, ix: int, iy: int):
+        key = (self.f, lx, ly, ix, iy)
+        return tile_cache.get(key, lambda: self._build_tile(lx, ly, ix, iy))
+
+    def _build_tile(self, lx: int, ly: int, ix: int, iy: int):
+        width = 2. ** lx
+        height = 2. ** ly
+        dx = width / ARROWS_PER_TILE
+        dy = height / ARROWS_PER_TILE
+
+        # стрелки стоят в центрах ячеек, поэтому соседние тайлы не дублируют друг друга
+        X = ix * width + (np.arange(ARROWS_PER_TILE) + 0.5) * dx
+        Y = iy * height + (np.arange(ARROWS_PER_TILE) + 0.5) * dy
+        U, V = direction_vectors(evaluate_on_mesh(self.f, X, Y), np.sqrt(dx ** 2 + dy ** 2) / 2)
+
+        XX, YY = np.meshgrid(X, Y)
+        return XX.ravel(), YY.ravel(), U.ravel(), V.ravel()
+
+    def arrows(self, xlim: Tuple[float, float], ylim: Tuple[float, float], coarse: bool = False,
+               progress: Callable[[float], None] = None):
+        """
+        Стрелки в видимой области - примерно nx x ny (при coarse - вдвое меньше по каждой оси).
+        :param coarse: вдвое более редкая сетка (для быстрого первого прохода)
+        :param progress: функция progress(доля), см. kernel.progress
+        :return: плоские массивы X, Y, U, V
+        """
+        x1, x2 = sorted(xlim)
+        y1, y2 = sorted(ylim)
+        lx = self._level(x2 - x1, self.nx) + coarse
+        ly = self._level(y2 - y1, self.ny) + coarse
+
+        ixs = range(int(np.floor(x1 / 2. ** lx)), int(np.floor(x2 / 2. ** lx)) + 1)
+        iys = range(int(np.floor(y1 / 2. ** ly)), int(np.floor(y2 / 2. ** ly)) + 1)
+
+        parts = []
+        for k, iy in enumerate(iys):
+            if progress is not None:
+                progress(k / len(iys))
+            for ix in ixs:
+                parts.append(self._tile(lx, ly, ix, iy))
+
+        X, Y, U, V = (np.concatenate(column) for column in zip(*parts))
+
+        # тайлы выходят за края области, а стрелок уровня в ней до 2nx x 2ny: обрезаем и прореживаем.
+        # Прореживание - по номерам стрелок на сетке уровня, чтобы при сдвиге стрелки не перескакивали
+        dx, dy = 2. ** lx / ARROWS_PER_TILE, 2. ** ly / ARROWS_PER_TILE
+        kx = max(1, round((x2 - x1) / dx / self.nx * (1 + coarse)))
+        ky = max(1, round((y2 - y1) / dy / self.ny * (1 + coarse)))
+        keep = ((X >= x1) & (X <= x2) & (Y >= y1) & (Y <= y2) &
+                (np.floor(X / dx) % kx == 0) & (np.floor(Y / dy) % ky == 0))
+        return X[keep], Y[keep], U[keep], V[keep]
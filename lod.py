@@ -0,0 +1,94 @@
+import numpy as np
+
+
+# Во сколько раз больше точек, чем пикселей по ширине графика, рисуется без прореживания
+RAW_POINTS_PER_PIXEL = 4
+
+
+def decimate(x, y, xlim=None, ylim=None, pixels: int = 1000, monotonic: bool = True):
+    """
+    Прореживает линию (x, y) для отрисовки в области xlim x ylim шириной pixels пикселей.
+    Видимые точки делятся на группы примерно по одной на пиксель, и в каждой группе
+    остаются первая, последняя и крайние по значению точки (огибающая min/max),
+    поэтому картинка не отличается от полной, а вершин - не больше нескольких тысяч.
+    :param monotonic: x возрастает (графики от x); иначе (фазовые кривые) видимые точки
+                      ищутся по обеим координатам, а разрывы между ними отмечаются NaN
+    :return: x, y для Line2D.set_data
+    """
+    n = len(x)
+    if monotonic:
+        lo, hi = 0, n
+        if xlim is not None:
+            lo = max(np.searchsorted(x, min(xlim), side="left") - 1, 0)
+            hi = min(np.searchsorted(x, max(xlim), side="right") + 1, n)
+        idx = np.arange(lo, hi)
+        keys = (y,)
+    else:
+        visible = np.ones(n, dtype=bool)
+        if xlim is not None:
+            visible &= (x >= min(xlim)) & (x <= max(xlim))
+        if ylim is not None:
+            visible &= (y >= min(ylim)) & (y <= max(ylim))
+        # соседи видимых точек нужны, чтобы отрезки доходили до края графика
+        visible[1:] |= visible[:-1].copy()
+        visible[:-1] |= visible[1:].copy()
+        idx = np.flatnonzero(visible)
+        keys = (x, y)
+
+    if len(idx) > RAW_POINTS_PER_PIXEL * pixels:
+        k = -(-len(idx) // pixels)
+        groups = np.pad(idx, (0, -len(idx) % k), mode="edge").reshape(-1, k)
+        picks = [groups[:, :1], groups[:, -1:]]
+        for key in keys:
+            values = key[groups]
+            picks.append(np.take_along_axis(groups, values.argmin(axis=1)[:, None], axis=1))
+            picks.append(np.take_along_axis(groups, values.argmax(axis=1)[:, None], axis=1))
+        selected = np.unique(np.concatenate(picks, axis=1))
+    else:
+        selected = idx
+
+    X = np.asarray(x[selected], dtype=float)
+    Y = np.asarray(y[selected], dtype=float)
+    if not monotonic:
+        # между соседними выбранными точками был невидимый участок - рвем линию
+        gaps = np.concatenate(([0], np.cumsum(np.diff(idx) > 1)))
+        gap_of = gaps[np.searchsorted(idx, selected)]
+        breaks = np.flatnonzero(np.diff(gap_of)) + 1
+        X = np.insert(X, breaks, np.nan)
+        Y = np.insert(Y, breaks, np.nan)
+    return X, Y
+
+
+class DecimatedLine:
+    """
+    Линия на осях ax, которая хранит все точки решения, а рисует только прореженные (см. decimate).
+    При сдвиге и масштабировании осей точки выбираются заново для новой видимой области.
+    Держите ссылку на объект: matplotlib хранит слабые ссылки на обработчики.
+    """
+
+    def __init__(self, ax, x, y, monotonic: bool = True, **kwargs):
+        self.ax = ax
+        self.increasing = monotonic  # x должен возрастать (иначе линия считается фазовой кривой)
+        self.line, = ax.plot([], [], **kwargs)
+        self.set_data(x, y)
+
+        ax.callbacks.connect('xlim_changed', self.update)
+        ax.callbacks.connect('ylim_changed', self.update)
+
+    def set_data(self, x, y):
+        """Заменяет точки линии и подгоняет оси под новые данные."""
+        self.x = np.asarray(x)
+        self.y = np.asarray(y)
+        self.monotonic = self.increasing and (len(self.x) < 2 or self.x[-1] >= self.x[0])
+
+        self.line.set_data(*decimate(self.x, self.y, pixels=self.pixels(), monotonic=self.monotonic))
+        self.ax.relim()
+        self.ax.set_autoscale_on(True)
+        self.ax.autoscale_view()
+
+    def pixels(self) -> int:
+        return max(int(self.ax.bbox.width), 1)
+
+    def update(self, ax=None):
+        self.line.set_data(*decimate(self.x, self.y, self.ax.get_xlim(), self.ax.get_ylim(),
+                                     self.pixels(), self.monotonic))
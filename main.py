@@ -1,12 +1,48 @@
+import time
+STARTUP = time.perf_counter()
+
+import importlib
+import os
 import sys
 from PyQt5.QtWidgets import *
+from PyQt5.QtCore import QTimer
 
-from first_order_tab import FirstOrderTab
-from high_order_tab import HighOrderTab
-from slope_field_tab import SlopeFieldTab
 from config import *
 
 
+# ODESOLVER_STARTUP_REPORT=1 (или ключ --timing) печатает время этапов запуска
+REPORT_STARTUP = os.environ.get("ODESOLVER_STARTUP_REPORT", "0") != "0" or "--timing" in sys.argv
+
+
+def report(stage):
+    if REPORT_STARTUP:
+        print(f"[startup] {stage}: {time.perf_counter() - STARTUP:.3f} s", file=sys.stderr)
+
+
+class LazyTab(QWidget):
+    """
+    Заглушка вкладки: модуль вкладки (а с ним matplotlib) импортируется и вкладка
+    создается только при первом показе. Солверы и sympy вкладки загружают при первом решении.
+    """
+
+    def __init__(self, module, cls):
+        super().__init__()
+        self.module = module
+        self.cls = cls
+        self.tab = None
+
+        self.layout = QVBoxLayout()
+        self.setLayout(self.layout)
+
+    def load(self):
+        if self.tab is not None:
+            return
+        self.tab = getattr(importlib.import_module(self.module), self.cls)()
+        self.layout.setContentsMargins(0, 0, 0, 0)
+        self.layout.addWidget(self.tab)
+        report(f"{self.cls} loaded")
+
+
 class MainWindow(QMainWindow):
     def __init__(self):
         super().__init__()
@@ -15,13 +51,14 @@ class MainWindow(QMainWindow):
         self.main_layout = QGridLayout()
 
         self.tabs = QTabWidget(self)
-        self.first_order_tab = FirstOrderTab()
-        self.high_order_tab = HighOrderTab()
-        self.slope_field_tab = SlopeFieldTab()
+        self.first_order_tab = LazyTab("first_order_tab", "FirstOrderTab")
+        self.high_order_tab = LazyTab("high_order_tab", "HighOrderTab")
+        self.slope_field_tab = LazyTab("slope_field_tab", "SlopeFieldTab")
 
         self.tabs.addTab(self.first_order_tab, "First order ODE")
         self.tabs.addTab(self.high_order_tab, "High order ODE")
         self.tabs.addTab(self.slope_field_tab, "Slope field")
+        self.tabs.currentChanged.connect(self.load_tab)
 
         self.main_layout.addWidget(self.tabs)
 
@@ -35,10 +72,17 @@ class MainWindow(QMainWindow):
         self.setWindowTitle("ODESolver")
         self.setCentralWidget(self.main_widget)
 
+    def load_tab(self, index):
+        self.tabs.widget(index).load()
+
 
 
 if __name__ == "__main__":
+    report("imports")
     app = QApplication(sys.argv)
     window = MainWindow()
     window.show()
+    report("window shown")
+    # первая вкладка строится сразу после того, как окно появилось на экране
+    QTimer.singleShot(0, lambda: window.load_tab(window.tabs.currentIndex()))
     app.exec_()
@@ -1,14 +1,14 @@
 from PyQt5.QtWidgets import *
 from PyQt5.QtGui import QFont
+from PyQt5.QtCore import QTimer
 from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
 from matplotlib.backends.backend_qt5agg import NavigationToolbar2QT as NavigationToolbar
 from matplotlib.figure import Figure
 from matplotlib.colors import hsv_to_rgb
 import numpy as np
-import sympy as sp
 
 from error_panels import *
-from kernel.slope_field import slope_field
+from workers import SolverRunner
 from config import *
 
 
@@ -29,10 +29,22 @@ class SlopeFieldTab(QWidget):
         self.build_btn.setStyleSheet("QPushButton {background-color: " + SOLVE_BTN_COLOR +
                                      "; color: black; border: none}")
 
+        self.runner = SolverRunner()
+        self.runner.busy.connect(self.build_btn.setDisabled)
+        self.field = None
+        self.quiver = None
+
+        # пересчет поля после сдвига/масштабирования откладывается, пока пользователь двигает график
+        self.view_timer = QTimer(self)
+        self.view_timer.setSingleShot(True)
+        self.view_timer.setInterval(VIEW_UPDATE_DELAY)
+        self.view_timer.timeout.connect(self.update_view)
+
         self.sf_plot = SlopeFieldPlot()
 
         self.layout.addWidget(self.input, 0, 0)
         self.layout.addWidget(self.build_btn, 1, 0)
+        self.layout.addWidget(self.runner, 2, 0)
         self.layout.addWidget(self.sf_plot, 0, 1)
 
         self.layout.setColumnStretch(1, PLOT_WIDTH_RATIO)
@@ -54,27 +66,69 @@ class SlopeFieldTab(QWidget):
         if nx is None or ny is None:
             return
 
-        x, y, u, v = slope_field(f, (x1, x2, y1, y2), nx, ny)
-        xstep = (x2-x1)/nx
-        ystep = (y2-y1)/ny
+        from kernel.tiles import TiledSlopeField
+
+        xstep, ystep = (x2-x1)/nx, (y2-y1)/ny
+        self.field = TiledSlopeField(f, nx, ny)
+        self.quiver = None
 
         self.sf_plot.figure.clear()
         ax = self.sf_plot.figure.add_subplot(111)
-        angles = np.arctan(v/u)
-        colors = self.angle_to_color(angles)
-
-        ax.quiver(x, y, u, v, color=colors.reshape(-1, 3), angles='xy')
         ax.set_xlim(x1 - xstep/2, x2 + xstep)
         ax.set_ylim(y1 - ystep, y2 + ystep)
         ax.grid(True)
         ax.set_xlabel("x")
         ax.set_ylabel("y")
-        self.sf_plot.canvas.draw()
+        ax.callbacks.connect('xlim_changed', self.view_changed)
+        ax.callbacks.connect('ylim_changed', self.view_changed)
+
+        self.runner.start(self.show_field, self.field.arrows, ax.get_xlim(), ax.get_ylim())
+
+    def view_changed(self, ax):
+        self.view_timer.start()
+
+    def update_view(self):
+        """
+        Перерисовывает поле для новой видимой области: сначала грубая сетка, затем полная.
+        Обе вычисляются в фоновом потоке; уже вычисленные тайлы берутся из кэша.
+        """
+        if self.quiver is None:  # первое построение еще не завершено
+            return
+        if self.runner.worker is not None:  # прошлая область еще считается - отменяем и ждем ее завершения
+            self.runner.cancel()
+            self.view_timer.start()
+            return
+        ax = self.sf_plot.figure.axes[0]
+        xlim, ylim = ax.get_xlim(), ax.get_ylim()
+
+        self.runner.start(lambda field: self.refine_view(field, xlim, ylim), self.field.arrows, xlim, ylim,
+                          coarse=True)
+
+    def refine_view(self, coarse_field, xlim, ylim):
+        self.show_field(coarse_field)
+        ax = self.sf_plot.figure.axes[0]
+        if ax.get_xlim() != xlim or ax.get_ylim() != ylim:
+            return  # область уже сменилась, ее перерисует следующий update_view
+        self.runner.start(self.show_field, self.field.arrows, xlim, ylim)
+
+    def show_field(self, field):
+        x, y, u, v = field
+        ax = self.sf_plot.figure.axes[0]
+
+        if self.quiver is not None:
+            self.quiver.remove()
+        angles = np.arctan(v/u)
+        colors = self.angle_to_color(angles)
+
+        self.quiver = ax.quiver(x, y, u, v, color=colors.reshape(-1, 3), angles='xy')
+        self.sf_plot.canvas.draw_idle()
 
     def parse_input(self):
         """
         :return: f, x1, x2, y1, y2, nx, ny
         """
+        import sympy as sp
+        from kernel import cache
 
         # dy/dx = f
         f_str = self.input.right_side.text()
@@ -82,8 +136,8 @@ class SlopeFieldTab(QWidget):
         f_str = f_str.replace('pi', str(np.pi))
         try:
             x, y = sp.symbols('x y')
-            f_sym = sp.sympify(f_str)
-            f_func = sp.lambdify((x, y), f_sym, 'numpy')
+            f_sym = cache.sympify(f_str)
+            f_func = cache.lambdify((x, y), f_sym)
         except sp.SympifyError:
             invalid_f_input()
             return None, 0, 0, 0, 0, 0, 0
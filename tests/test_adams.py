@@ -0,0 +1,55 @@
+import numpy as np
+import pytest
+
+from kernel.solvers import ADAMS_METHODS, adams_bashforth, adams_bashforth_moulton, erk4
+from kernel.stats import SolveStats
+
+
+def exact(X):
+    # y' = cos(x) - y, y(0) = 0
+    return (np.cos(X) + np.sin(X) - np.exp(-X)) / 2
+
+
+def error(method, n):
+    order, corrector = ADAMS_METHODS[method]
+    solver = adams_bashforth_moulton if corrector else adams_bashforth
+    X, Y, _ = solver(lambda x, y: np.cos(x) - y, (0., 4.), 0., n, order)
+    return np.max(np.abs(Y - exact(X)))
+
+
+@pytest.mark.parametrize("method", list(ADAMS_METHODS))
+def test_convergence_order(method):
+    order = ADAMS_METHODS[method][0]
+    observed = np.log2(error(method, 101) / error(method, 201))
+    assert abs(observed - order) < .3
+
+
+def test_corrector_is_more_accurate():
+    for order in (2, 3, 4, 5):
+        assert error(f"abm{order}", 101) < error(f"ab{order}", 101)
+
+
+def test_function_evaluations():
+    n = 100
+    for corrector, per_step in ((False, 1), (True, 2)):
+        stats = SolveStats()
+        solver = adams_bashforth_moulton if corrector else adams_bashforth
+        solver(lambda x, y: np.cos(x) - y, (0., 1.), 0., n, 4, stats=stats)
+        # разгон erk4 на первых 4 точках, дальше - per_step вычислений на шаг
+        assert stats.f_evals == 1 + 4 * 3 + per_step * (n - 4)
+        assert stats.accepted == n - 1
+
+
+def test_system_and_short_grid():
+    f = lambda x, y: np.array([y[1], -4 * y[0]])
+    X, Y, _ = adams_bashforth_moulton(f, (0., 5.), np.array([0., 1.]), 5000, 5)
+    np.testing.assert_allclose(Y[:, 0], np.sin(2 * X) / 2, atol=1E-9)
+
+    # сетка короче разгона - решение целиком считается erk4
+    X, Y, _ = adams_bashforth(lambda x, y: -y, (0., 1.), 1., 3, 5)
+    np.testing.assert_allclose(Y, erk4(lambda x, y: -y, (0., 1.), 1., 3)[1])
+
+
+def test_unsupported_order():
+    with pytest.raises(ValueError):
+        adams_bashforth(lambda x, y: -y, (0., 1.), 1., 10, 6)
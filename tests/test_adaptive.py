@@ -0,0 +1,62 @@
+import numpy as np
+import pytest
+
+from kernel.adaptive import DOPRI5, CASH_KARP, rk_step, dopri5, cash_karp
+
+
+def f(x, y):
+    return np.cos(x) - y
+
+
+def exact(x):
+    # y' = cos(x) - y, y(0) = 0
+    return (np.cos(x) + np.sin(x) - np.exp(-x)) / 2
+
+
+def fixed_step_error(tableau, n):
+    h = 2. / n
+    y = np.array([0.])
+    f0 = f(0., y)
+    for i in range(n):
+        y, f0, _, _ = rk_step(f, tableau, i * h, y, f0, h)
+    return abs(y[0] - exact(2.))
+
+
+@pytest.mark.parametrize("tableau", [DOPRI5, CASH_KARP])
+def test_embedded_pair_order(tableau):
+    order = np.log2(fixed_step_error(tableau, 20) / fixed_step_error(tableau, 40))
+    assert abs(order - tableau.order) < .3
+
+
+@pytest.mark.parametrize("solver", [dopri5, cash_karp])
+def test_error_follows_tolerance(solver):
+    errors = []
+    for rtol in (1E-4, 1E-6, 1E-8):
+        X, Y, _ = solver(f, (0., 10.), 0., rtol=rtol, atol=rtol * 1E-3)
+        assert X[-1] == 10.
+        errors.append(np.max(np.abs(Y - exact(X))))
+    assert errors[0] > errors[1] > errors[2]
+    assert errors[2] < 1E-6
+
+
+def test_dense_output():
+    X, Y, Yprime, solution = dopri5(f, (0., 10.), 0., n=1000, rtol=1E-8, atol=1E-11, dense=True)
+
+    assert X.shape == (1000,)
+    np.testing.assert_allclose(Y, exact(X), atol=1E-7)
+    np.testing.assert_allclose(Yprime, f(X, exact(X)), atol=1E-6)
+    np.testing.assert_allclose(solution(np.array([2.5, 7.25])), exact(np.array([2.5, 7.25])), atol=1E-7)
+
+
+def test_backward_integration():
+    X, Y, _ = dopri5(f, (10., 0.), exact(10.), rtol=1E-8, atol=1E-11)
+    assert X[-1] == 0.
+    assert abs(Y[-1] - exact(0.)) < 1E-3  # решение неустойчиво назад (e^x), но интервал небольшой
+
+
+@pytest.mark.parametrize("solver", [dopri5, cash_karp])
+def test_zero_length_interval(solver):
+    X, Y, Yprime = solver(f, (1., 1.), 2., n=5)
+    np.testing.assert_array_equal(X, np.ones(5))
+    np.testing.assert_array_equal(Y, np.full(5, 2.))
+    np.testing.assert_allclose(Yprime, np.full(5, f(1., 2.)))
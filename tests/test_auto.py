@@ -0,0 +1,52 @@
+import numpy as np
+
+from kernel.adaptive import dopri5
+from kernel.auto import auto, auto_solve
+from kernel.equation import Equation
+from kernel.stats import SolveStats
+
+
+VAN_DER_POL = ["y2", "100*(1 - y1**2)*y2 - y1"]
+
+
+def test_van_der_pol_switches_to_stiff_method():
+    stats = SolveStats()
+    X, Y, _ = auto_solve(VAN_DER_POL, (0., 200.), np.array([2., 0.]), rtol=1E-5, atol=1E-8, stats=stats)
+
+    assert stats.stiff_steps > 0 and stats.switches > 0
+    # по одному Якобиану на жесткий шаг: повтор отклоненного шага его не пересчитывает
+    assert stats.jac_evals == stats.stiff_steps
+    # явный метод на этом интервале сделал бы сотни тысяч шагов
+    assert stats.accepted < 5000
+    assert np.all(np.abs(Y[:, 0]) < 2.1)
+
+
+def test_nonstiff_matches_dopri5():
+    f = lambda x, y: np.cos(x) + np.sin(y)
+    stats = SolveStats()
+    X, Y, Yprime = auto(f, lambda x, y: np.cos(y), (0., 10.), 1., n=101, rtol=1E-9, atol=1E-12, stats=stats)
+    Xd, Yd, Yprimed = dopri5(f, (0., 10.), 1., n=101, rtol=1E-9, atol=1E-12)
+
+    assert stats.stiff_steps == 0
+    np.testing.assert_allclose(X, Xd)
+    np.testing.assert_allclose(Y, Yd, atol=1E-7)
+    np.testing.assert_allclose(Yprime, Yprimed, atol=1E-7)
+
+
+def test_scalar_dense_output():
+    X, Y, _, dense = auto_solve("-50*(y - cos(x))", (0., 2.), 0., n=101, dense=True)
+    assert Y.shape == dense(X).shape == (101,)
+    np.testing.assert_allclose(dense(X), Y, atol=1E-12)
+
+
+def test_equation_stiffness():
+    equation = Equation(VAN_DER_POL)
+    equation.solve("auto", (0., 200.), np.array([2., 0.]), n=1000)
+    assert equation.stiffness is True
+
+    equation.solve("dopri5", (0., 1.), np.array([2., 0.]), n=10)
+    assert equation.stiffness is None
+
+    equation = Equation("cos(x) + sin(y)")
+    equation.solve("auto", (0., 10.), 1., n=100)
+    assert equation.stiffness is False
@@ -0,0 +1,67 @@
+import numpy as np
+import pytest
+import sympy as sp
+
+from kernel import backend, cache
+from kernel.solvers import TABLEAUS, explicit_rk
+
+pytestmark = pytest.mark.skipif(backend.numba is None, reason="нужен numba")
+
+
+def test_lambdify_compiles():
+    x, y = sp.symbols('x y')
+    expr = sp.cos(x) + sp.sin(y) * sp.exp(-x)
+    jitted = backend.lambdify((x, y), expr, jit=True)
+    plain = backend.lambdify((x, y), expr, jit=False)
+
+    assert backend.is_compiled(jitted) and not backend.is_compiled(plain)
+    for point in [(0., 0.), (1.5, -2.), (10., 3.)]:
+        assert jitted(*point) == pytest.approx(plain(*point), rel=1E-14)
+    # для вычислений на массивах берется исходная функция numpy
+    X = np.linspace(0., 1., 5)
+    np.testing.assert_allclose(backend.python_function(jitted)(X, X), plain(X, X))
+
+
+def test_lambdify_into():
+    x, y1, y2 = sp.symbols('x y1 y2')
+    exprs = [y2, -4 * y1 + sp.sin(x), sp.Integer(3)]
+    out = {}
+    for jit in (True, False):
+        kernel, initial = backend.lambdify_into((x, y1, y2), exprs, jit=jit)
+        out[jit] = kernel(initial.copy(), .5, 1., 2.)
+    np.testing.assert_allclose(out[True], out[False], rtol=1E-14)
+    np.testing.assert_allclose(out[False], [2., -4 + np.sin(.5), 3.])
+
+
+def test_uncompilable_expression_falls_back():
+    x, y = sp.symbols('x y')
+    # np.heaviside numba не поддерживает - остается функция numpy
+    func = backend.lambdify((x, y), sp.Heaviside(x) * y, jit=True)
+    assert not backend.is_compiled(func)
+    assert func(1., 2.) == 2. and func(-1., 2.) == 0.
+
+
+@pytest.mark.parametrize("name", list(TABLEAUS))
+def test_fused_loop_matches_python(name, monkeypatch):
+    calls = []
+    fused_rk = backend.fused_rk
+    monkeypatch.setattr(backend, "FUSED_MIN_STEPS", 10)
+    monkeypatch.setattr(backend, "fused_rk", lambda *args, **kwargs: calls.append(args) or fused_rk(*args, **kwargs))
+
+    x, y = sp.symbols('x y')
+    f = cache.lambdify((x, y), cache.sympify("cos(x) - y"))
+    X, Y, Yprime = explicit_rk(f, (0., 2.), 0., TABLEAUS[name], 100)
+    assert len(calls) == 1  # скомпилированная f интегрируется слитым циклом
+
+    Xp, Yp, Yprimep = explicit_rk(lambda x, y: np.cos(x) - y, (0., 2.), 0., TABLEAUS[name], 100)
+    assert len(calls) == 1
+    np.testing.assert_allclose(X, Xp)
+    np.testing.assert_allclose(Y, Yp, rtol=1E-13, atol=1E-15)
+    np.testing.assert_allclose(Yprime, Yprimep, rtol=1E-13, atol=1E-15)
+
+
+def test_fused_loops_are_bounded():
+    x, y = sp.symbols('x y')
+    for k in range(backend.FUSED_LOOPS + 5):
+        backend._fused_loop(backend.lambdify((x, y), -(k + 1) * y))
+    assert backend._fused_loop.cache_info().currsize == backend.FUSED_LOOPS
@@ -0,0 +1,63 @@
+import numpy as np
+import pytest
+
+from kernel.bdf import bdf, bdf_solve
+from kernel.stats import SolveStats
+
+
+def exact(x):
+    # y' = -50*(y - cos(x)), y(0) = 0
+    return (2500 * np.cos(x) + 50 * np.sin(x) - 2500 * np.exp(-50 * x)) / 2501
+
+
+def f(x, y):
+    return -50 * (y - np.cos(x))
+
+
+def jac(x, y):
+    return -50.
+
+
+@pytest.mark.parametrize("ndf", [False, True])
+def test_error_follows_tolerance(ndf):
+    errors = []
+    for rtol in (1E-4, 1E-6, 1E-8):
+        X, Y, _ = bdf(f, jac, (0., 2.), 0., rtol=rtol, atol=rtol * 1E-3, ndf=ndf)
+        errors.append(np.max(np.abs(Y - exact(X))))
+    assert errors[0] > errors[1] > errors[2]
+    assert errors[2] < 1E-6
+
+
+def test_output_grid_and_dense():
+    X, Y, Yprime, dense = bdf(f, jac, (0., 2.), 0., n=101, rtol=1E-8, atol=1E-11, dense=True)
+    np.testing.assert_allclose(X, np.linspace(0., 2., 101))
+    np.testing.assert_allclose(Y, exact(X), atol=1E-6)
+    np.testing.assert_allclose(Yprime, f(X, Y), atol=1E-4)
+    np.testing.assert_allclose(dense(X), Y, atol=1E-10)
+
+
+def test_robertson_reuses_jacobian():
+    # жесткая задача Робертсона: шагов много меньше, чем у явного метода, а Якобиан почти не пересчитывается
+    stats = SolveStats()
+    X, Y, _ = bdf_solve(["-0.04*y1 + 1E4*y2*y3", "0.04*y1 - 1E4*y2*y3 - 3E7*y2**2", "3E7*y2**2"],
+                        (0., 40.), np.array([1., 0., 0.]), rtol=1E-6, atol=1E-10, stats=stats)
+
+    np.testing.assert_allclose(Y.sum(axis=1), 1., atol=1E-6)
+    np.testing.assert_allclose(Y[-1], [.7158, 9.185E-6, .2842], rtol=1E-3)
+    assert stats.accepted < 500
+    assert stats.jac_evals < stats.accepted / 5
+
+
+def test_max_order():
+    with pytest.raises(ValueError):
+        bdf(f, jac, (0., 1.), 0., max_order=6)
+    with pytest.raises(ValueError):
+        bdf(f, jac, (0., 1.), 0., max_order=0)
+
+    # порядок 1 (неявный метод Эйлера) требует заметно больше шагов
+    steps = []
+    for max_order in (1, 5):
+        stats = SolveStats()
+        bdf(f, jac, (0., 2.), 0., rtol=1E-6, atol=1E-9, max_order=max_order, stats=stats)
+        steps.append(stats.accepted)
+    assert steps[0] > 5 * steps[1]
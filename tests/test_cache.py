@@ -0,0 +1,90 @@
+import threading
+import time
+
+import pytest
+import sympy as sp
+
+from kernel import cache
+from kernel.cache import LRUCache
+
+
+def test_lru_eviction():
+    lru = LRUCache(maxsize=2)
+    lru.get("a", lambda: 1)
+    lru.get("b", lambda: 2)
+    lru.get("a", lambda: None)  # "a" становится последним использованным
+    lru.get("c", lambda: 3)
+
+    assert lru.get("a", lambda: None) == 1
+    assert lru.get("b", lambda: "rebuilt") == "rebuilt"
+    assert lru.info()["misses"] == 4
+
+
+def test_disk_cache(tmp_path):
+    lru = LRUCache(directory=str(tmp_path))
+    lru.get("key", lambda: [1, 2, 3], persistent=True)
+
+    restarted = LRUCache(directory=str(tmp_path))
+    assert restarted.get("key", lambda: None, persistent=True) == [1, 2, 3]
+    assert restarted.info()["disk_hits"] == 1
+
+
+def test_sympify_keeps_inner_whitespace():
+    assert cache.sympify("  x + y ") is cache.sympify("x + y")
+    cache.sympify("xy")
+    with pytest.raises(sp.SympifyError):
+        cache.sympify("x y")
+
+
+def test_same_key_is_built_once():
+    lru = LRUCache()
+    calls = []
+
+    def build():
+        calls.append(1)
+        time.sleep(.2)
+        return object()
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(lru.get("key", build))) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(calls) == 1
+    assert all(result is results[0] for result in results)
+
+
+def test_different_keys_build_in_parallel():
+    lru = LRUCache()
+    started = threading.Event()
+
+    def slow():
+        started.set()
+        time.sleep(.5)
+        return "slow"
+
+    thread = threading.Thread(target=lambda: lru.get("slow", slow))
+    thread.start()
+    started.wait()
+    start = time.perf_counter()
+    assert lru.get("fast", lambda: "fast") == "fast"
+    assert time.perf_counter() - start < .25  # не ждет построения другого ключа
+    thread.join()
+
+
+def test_failed_build_is_not_cached():
+    lru = LRUCache()
+
+    def fail():
+        raise ValueError("ошибка")
+
+    with pytest.raises(ValueError):
+        lru.get("key", fail)
+    assert lru.get("key", lambda: 1) == 1
+
+
+def test_equal_expressions_share_compiled_function():
+    x, y = sp.symbols('x y')
+    assert cache.lambdify((x, y), cache.sympify("x*y + 1")) is cache.lambdify((x, y), cache.sympify("1 + y*x"))
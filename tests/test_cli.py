@@ -0,0 +1,72 @@
+import json
+
+import numpy as np
+import pytest
+
+from kernel import store
+from kernel.__main__ import main
+from kernel.batch import normalize
+from kernel.equation import Equation
+from kernel.high_ord_solver import high_order_solve
+
+
+def test_jobs_from_json(tmp_path, capsys):
+    jobs = [dict(equation="cos(x) - y", interval=[0, "2*pi"], y0=1, n=1000, method="erk4", every=10),
+            dict(equation="cos(x) - y", interval=[0, 3], y0=1, n=50, method="dopri5", rtol=1E-8),
+            dict(equation=["y2", "-4*y1"], interval=[0, 3], y0=[0, 1], n=200, method="erk3", output="system.npy"),
+            dict(kind="high", equation="y_2 + 4*y", order=2, interval=[0, 3], y0="(0, 1, 0)", n=300)]
+    path = tmp_path / "jobs.json"
+    path.write_text(json.dumps(jobs))
+
+    assert main([str(path), "-o", str(tmp_path / "out"), "--workers", "2"]) == 0
+    assert capsys.readouterr().out.count("точек") == 4
+
+    X, Y, _ = store.load(str(tmp_path / "out" / "job_0.npy"))
+    expected = Equation("cos(x) - y").solve("erk4", (0., 2 * np.pi), 1., 1000, get_solution=True)
+    np.testing.assert_array_equal(X, expected[0][::10])
+    np.testing.assert_array_equal(Y, expected[1][::10])
+
+    X, Y, _ = store.load(str(tmp_path / "out" / "job_1.npy"))
+    assert len(X) == 50
+
+    X, Y, _ = store.load(str(tmp_path / "out" / "system.npy"))
+    assert Y.shape == (200, 2)
+
+    X, Y, Yprime = store.load(str(tmp_path / "out" / "job_3.npy"))
+    expected = high_order_solve(2, "y_2 + 4*y", (0., 3.), (0., 1., 0.), 300)
+    np.testing.assert_array_equal(Y, expected[1])
+
+
+def test_single_job_from_flags_and_csv(tmp_path):
+    assert main(["--equation=-y", "--interval", "0", "1", "--y0", "1", "-n", "100", "--method", "ros3",
+                 "-o", str(tmp_path)]) == 0
+    assert len(store.load(str(tmp_path / "job_0.npy"))[0]) == 100
+
+    csv_path = tmp_path / "jobs.csv"
+    csv_path.write_text("equation,x0,x1,y0,n,method,alpha\n-y,0,1,1,100,ros1,(1+1j)/2\n")
+    assert main([str(csv_path), "-o", str(tmp_path / "csv")]) == 0
+    X, Y, _ = store.load(str(tmp_path / "csv" / "job_0.npy"))
+    assert abs(Y[-1] - np.exp(-1)) < 1E-3
+
+
+def test_failures(tmp_path):
+    path = tmp_path / "jobs.json"
+    path.write_text(json.dumps([dict(equation="-y", interval=[0, 1], y0=1, method="unknown")]))
+    assert main([str(path), "-o", str(tmp_path)]) == 1
+    assert main([]) == 2
+
+    with pytest.raises(ValueError):
+        normalize(dict(interval=[0, 1], y0=1))
+
+
+@pytest.mark.parametrize("alpha, expected", [("(1 + j)/2", (1 + 1j) / 2), ("(1+1j)/2", (1 + 1j) / 2), ("1", 1.)])
+def test_alpha(tmp_path, alpha, expected):
+    # значения alpha из вкладок приложения
+    job = normalize(dict(equation="-y", interval=[0, 1], y0=1, n=100, method="rosenbrock", alpha=alpha))
+    assert job["alpha"] == expected
+
+    csv_path = tmp_path / "jobs.csv"
+    csv_path.write_text(f"equation,x0,x1,y0,n,method,alpha\n-y,0,1,1,100,rosenbrock,{alpha}\n")
+    assert main([str(csv_path), "-o", str(tmp_path)]) == 0
+    X, Y, _ = store.load(str(tmp_path / "job_0.npy"))
+    assert abs(Y[-1] - np.exp(-1)) < 1E-2
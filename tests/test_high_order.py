@@ -0,0 +1,41 @@
+import numpy as np
+
+from kernel.high_ord_solver import _chain_solve, high_order_solve
+
+
+def exact(x):
+    # y'' + 4y = 0, y(0) = 0, y'(0) = 1
+    return np.sin(2 * x) / 2
+
+
+def error(n, **options):
+    X, Y, Yprime = high_order_solve(2, "y_2 + 4*y", (0., 5.), (0., 1., 0.), n, **options)
+    return max(np.max(np.abs(Y - exact(X))), np.max(np.abs(Yprime - np.cos(2 * X))))
+
+
+def test_second_order_convergence():
+    order = np.log2(error(1001) / error(2001))
+    assert abs(order - 2) < .2
+
+
+def test_jacobian_reuse_on_linear_equation():
+    # для линейного уравнения Якобиан постоянен - редкий пересчет не меняет решения
+    assert error(1001, jac_update=50) == error(1001)
+
+
+def test_chain_solve_matches_dense_solver():
+    rng = np.random.default_rng(1)
+    m = 4
+    Jm = rng.normal(size=m + 1).astype(complex)
+    ah = (.3 + .3j) * .01
+    r = rng.normal(size=m + 1).astype(complex)
+
+    A = np.zeros((m + 1, m + 1), dtype=complex)
+    A[:m, :m] = np.eye(m)
+    A[np.arange(m), np.arange(1, m + 1)] = -ah
+    A[m] = -ah * Jm
+    q = ah ** np.arange(m, -1, -1).astype(complex)
+    w = _chain_solve(r, Jm, ah, q, -ah * (Jm @ q), np.zeros(m + 1, dtype=complex))
+
+    np.testing.assert_allclose(w, np.linalg.solve(A, r), rtol=1E-10)
+
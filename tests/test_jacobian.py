@@ -0,0 +1,96 @@
+import numpy as np
+import pytest
+
+from kernel.equation import Equation
+from kernel.jacobian import ComplexStepJacobian, FiniteDifferenceJacobian, color_columns, provider
+from kernel.stats import SolveStats
+
+
+def diffusion(x, y):
+    # одномерная сетка: df_i/dy_j != 0 только при |i - j| <= 1
+    return np.concatenate([[0.], y[:-2] - 2 * y[1:-1] + y[2:], [0.]]) * 100 + np.sin(y)
+
+
+def diffusion_jac(x, y):
+    m = len(y)
+    J = 100 * (np.eye(m, k=-1) - 2 * np.eye(m) + np.eye(m, k=1))
+    J[0] = J[-1] = 0
+    return J + np.diag(np.cos(y))
+
+
+TRIDIAGONAL = np.abs(np.subtract.outer(np.arange(10), np.arange(10))) <= 1
+
+
+def test_color_columns():
+    colors = color_columns(TRIDIAGONAL)
+    assert colors.max() + 1 == 3
+    for color in range(3):
+        rows = TRIDIAGONAL[:, colors == color]
+        assert np.all(rows.sum(axis=1) <= 1)  # у столбцов одного цвета нет общих строк
+
+
+@pytest.mark.parametrize("kind, atol", [("fd", 1E-5), ("complex", 1E-12)])
+@pytest.mark.parametrize("sparsity", [None, TRIDIAGONAL])
+def test_matches_analytic(kind, atol, sparsity):
+    y = np.linspace(-1., 1., 10)
+    jac = provider(diffusion, kind, sparsity)
+    np.testing.assert_allclose(jac(0., y), diffusion_jac(0., y), atol=atol)
+
+
+def test_scalar():
+    f = lambda x, y: np.sin(x * y)
+    for jac in (FiniteDifferenceJacobian(f), ComplexStepJacobian(f)):
+        np.testing.assert_allclose(jac(2., .3), 2 * np.cos(.6), rtol=1E-7)
+
+
+def test_evaluations_and_reset():
+    y = np.linspace(-1., 1., 10)
+    stats = SolveStats()
+    jac = FiniteDifferenceJacobian(diffusion, TRIDIAGONAL)
+    jac.reset(stats)
+
+    jac(0., y)
+    jac(0., y)  # та же точка - значение запомнено
+    assert jac.evaluations == 1
+    assert stats.f_evals == 1 + 3  # f0 и по одному вычислению на цвет
+
+    jac.reset()
+    assert jac.evaluations == 0
+    jac(0., y)
+    assert jac.evaluations == 1 and stats.f_evals == 4
+
+
+def test_unknown_kind():
+    with pytest.raises(ValueError):
+        provider(diffusion, "symbolic")
+    analytic = provider(diffusion, diffusion_jac)
+    assert analytic is diffusion_jac
+
+
+@pytest.mark.parametrize("method", ["rosenbrock", "ros3", "bdf", "auto"])
+def test_equation_given_as_function(method):
+    calls = []
+
+    def f(x, y):
+        calls.append(x)
+        return -50 * (y - np.cos(x))
+
+    equation = Equation(f)
+    X, Y, _ = equation.solve(method, (0., 2.), 0., n=201, get_solution=True)
+
+    exact = (2500 * np.cos(X) + 50 * np.sin(X) - 2500 * np.exp(-50 * X)) / 2501
+    np.testing.assert_allclose(Y, exact, atol=1E-2)
+    assert equation.stats.f_evals == len(calls)
+    # запросы в той же точке (после отклоненного шага) не вычисляют матрицу заново
+    assert equation.jac.evaluations <= equation.stats.jac_evals
+    if method != "auto":  # auto на этой задаче обходится явным методом без матрицы Якоби
+        assert equation.jac.evaluations > 0
+
+    calls.clear()
+    equation.solve(method, (0., 2.), 0., n=201)
+    assert equation.stats.f_evals == len(calls)
+
+
+def test_symbolic_jacobian_needs_string():
+    with pytest.raises(ValueError):
+        Equation(lambda x, y: -y, jacobian="symbolic")
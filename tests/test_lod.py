@@ -0,0 +1,38 @@
+import numpy as np
+
+from lod import RAW_POINTS_PER_PIXEL, decimate
+
+
+def test_small_lines_are_drawn_as_is():
+    x = np.linspace(0, 1, 100)
+    X, Y = decimate(x, x ** 2, pixels=1000)
+    np.testing.assert_array_equal(X, x)
+    np.testing.assert_array_equal(Y, x ** 2)
+
+
+def test_envelope_keeps_extrema_and_ends():
+    x = np.linspace(0, 100, 10 ** 6)
+    y = np.sin(x) + np.where(np.arange(len(x)) == 123457, 5., 0.)  # одиночный выброс
+    X, Y = decimate(x, y, pixels=500)
+
+    assert len(X) <= 4 * 500 + 4
+    assert Y.max() == y.max() and Y.min() == y.min()
+    assert (X[0], X[-1]) == (x[0], x[-1])
+    assert np.all(np.diff(X) > 0)
+
+
+def test_visible_window():
+    x = np.linspace(0, 100, 10 ** 6)
+    X, _ = decimate(x, np.cos(x), xlim=(40, 60), pixels=300)
+
+    assert X[0] <= 40 < X[1] and X[-2] < 60 <= X[-1]  # одна точка за краем с каждой стороны
+    assert len(X) <= 4 * 300 + 4
+
+
+def test_phase_curve_breaks_outside_view():
+    t = np.linspace(0, 4 * np.pi, RAW_POINTS_PER_PIXEL * 1000 * 3)
+    X, Y = decimate(np.cos(t), np.sin(t), xlim=(0, 2), ylim=(-2, 2), monotonic=False, pixels=1000)
+
+    finite = np.isfinite(X)
+    assert np.all(X[finite] >= -.01)
+    assert np.isnan(X).sum() == 2  # два оборота: три видимых дуги и два разрыва между ними
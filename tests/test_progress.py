@@ -0,0 +1,25 @@
+import pytest
+
+from kernel.equation import Equation
+from kernel.progress import SolverCancelled
+
+METHODS = ["euler", "erk4", "rosenbrock", "dopri5", "ros3"]
+
+
+@pytest.mark.parametrize("method", METHODS)
+def test_progress_is_reported(method):
+    fractions = []
+    Equation("cos(x) - y").solve(method, (0., 10.), 0., n=10000, progress=fractions.append)
+
+    assert fractions
+    assert all(0 <= a <= b <= 1 for a, b in zip(fractions, fractions[1:]))
+
+
+@pytest.mark.parametrize("method", METHODS)
+def test_cancellation(method):
+    def progress(fraction):
+        if fraction > .3:
+            raise SolverCancelled()
+
+    with pytest.raises(SolverCancelled):
+        Equation("cos(x) - y").solve(method, (0., 10.), 0., n=10000, rtol=1E-9, progress=progress)
@@ -0,0 +1,82 @@
+import numpy as np
+import pytest
+
+from kernel.rosenbrock import METHODS, ros_solve, ros_step, rosenbrock
+from kernel.solvers import ros1
+from kernel.stats import SolveStats
+
+
+def exact(x):
+    # y' = -50*(y - cos(x)), y(0) = 0
+    return (2500 * np.cos(x) + 50 * np.sin(x) - 2500 * np.exp(-50 * x)) / 2501
+
+
+def f(x, y):
+    return -50 * (y - np.cos(x))
+
+
+@pytest.mark.parametrize("alpha, order", [(.5, 2), (1, 1), ((1 + 1j) / 2, 2)])
+def test_ros1_order(alpha, order):
+    errors = []
+    for n in (2001, 4001):
+        X, Y, _ = ros1("-50*(y - cos(x))", (0., 2.), 0., alpha, n)
+        errors.append(np.max(np.abs(Y - exact(X))))
+    assert abs(np.log2(errors[0] / errors[1]) - order) < .2
+
+
+@pytest.mark.parametrize("name", METHODS)
+def test_scheme_order(name):
+    # y' = -y + x на неподвижной сетке: порядок схемы без контроля шага
+    tableau = METHODS[name]
+
+    def error(n):
+        h = 1. / n
+        y = np.array([1.])
+        for i in range(n):
+            x = i * h
+            y, _, _ = ros_step(lambda x, y: x - y, tableau, x, y, x - y, h, np.array([[-1.]]), np.array([1.]))
+        return abs(y[0] - (2 * np.exp(-1.)))
+
+    assert abs(np.log2(error(40) / error(80)) - tableau.order) < .25
+
+
+@pytest.mark.parametrize("name", METHODS)
+def test_error_follows_tolerance(name):
+    errors = []
+    for rtol in (1E-3, 1E-6):
+        X, Y, _ = ros_solve("-50*(y - cos(x))", (0., 2.), 0., name, rtol=rtol, atol=rtol * 1E-3)
+        assert X[-1] == 2.
+        errors.append(np.max(np.abs(Y - exact(X))))
+    assert errors[1] < errors[0] / 100
+    assert errors[1] < 1E-4
+
+
+def test_function_with_jacobian():
+    X, Y, _ = rosenbrock(f, lambda x, y: -50., (0., 2.), 0., METHODS["ros3"], n=50, rtol=1E-6, atol=1E-9)
+    assert X.shape == (50,)
+    np.testing.assert_allclose(Y, exact(X), atol=1E-4)
+
+
+def test_scalar_dense_output():
+    X, Y, _, dense = ros_solve("-50*(y - cos(x))", (0., 2.), 0., "rodas3", n=101, rtol=1E-8, atol=1E-11,
+                               dense=True)
+    assert Y.shape == dense(X).shape == dense.derivative(X).shape == (101,)
+    np.testing.assert_allclose(dense(X), Y, atol=1E-12)
+
+
+@pytest.mark.parametrize("jac_update", [1, 5])
+def test_jacobian_not_recomputed_after_rejection(jac_update):
+    points = []
+
+    def jac(x, y):
+        points.append(x)
+        return -50.
+
+    stats = SolveStats()
+    rosenbrock(f, jac, (0., 2.), 0., METHODS["ros3"], rtol=1E-6, atol=1E-9, jac_update=jac_update,
+               h0=.5, stats=stats)
+
+    assert stats.rejected > 0
+    assert len(points) == len(set(points))  # повтор шага из той же точки не вычисляет Якобиан
+    if jac_update == 1:
+        assert stats.jac_evals == stats.accepted
@@ -0,0 +1,37 @@
+import numpy as np
+import sympy as sp
+
+from kernel import cache
+from kernel.slope_field import evaluate_on_mesh, slope_field
+
+
+def compiled(f_str):
+    x, y = sp.symbols('x y')
+    return cache.lambdify((x, y), cache.sympify(f_str))
+
+
+def test_mesh_matches_pointwise_values():
+    f = compiled("cos(x) + sin(y)")
+    X, Y = np.linspace(-3, 3, 7), np.linspace(-2, 2, 5)
+    values = evaluate_on_mesh(f, X, Y)
+
+    assert values.shape == (5, 7)
+    for i, y in enumerate(Y):
+        for j, x in enumerate(X):
+            assert values[i, j] == np.cos(x) + np.sin(y)
+
+
+def test_constant_and_scalar_only_functions():
+    X, Y = np.linspace(0, 1, 4), np.linspace(0, 1, 3)
+    np.testing.assert_array_equal(evaluate_on_mesh(compiled("2"), X, Y), np.full((3, 4), 2.))
+
+    def scalar_only(x, y):
+        return float(x) - float(y)
+
+    np.testing.assert_allclose(evaluate_on_mesh(scalar_only, X, Y), X[None, :] - Y[:, None])
+
+
+def test_arrows_have_slope_f():
+    X, Y, U, V = slope_field(compiled("x - y"), (-1, 1, -1, 1), 10, 8)
+    np.testing.assert_allclose(V / U, X[None, :] - Y[:, None])
+    np.testing.assert_allclose(np.hypot(U, V), np.hypot(.2, .25) / 2)
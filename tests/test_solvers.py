@@ -0,0 +1,83 @@
+import numpy as np
+import pytest
+import sympy as sp
+
+from kernel import cache
+from kernel.solvers import ButcherTableau, TABLEAUS, euler, erk1, erk2, erk3, erk4, explicit_rk, ros1, system
+
+
+def compiled(f_str):
+    x, y = sp.symbols('x y')
+    return cache.lambdify((x, y), cache.sympify(f_str))
+
+
+@pytest.mark.parametrize("solver", [euler, erk1, erk2, erk3, erk4])
+def test_batch_matches_single_trajectories(solver):
+    f = compiled("cos(x) - y")
+    y0 = np.array([-1., 0., .5, 2.])
+    X, Y, Yprime = solver(f, (0., 2.), y0, 200)
+
+    assert Y.shape == Yprime.shape == (200, 4)
+    for k, y in enumerate(y0):
+        Xk, Yk, Yprimek = solver(f, (0., 2.), y, 200)
+        np.testing.assert_allclose(X, Xk)
+        np.testing.assert_allclose(Y[:, k], Yk, rtol=1E-12, atol=1E-14)
+        np.testing.assert_allclose(Yprime[:, k], Yprimek, rtol=1E-12, atol=1E-14)
+
+
+def test_batch_over_parameters():
+    # y' = -a*y, y(0) = 1 для нескольких a сразу
+    a = np.array([.5, 1., 2.])
+    X, Y, _ = erk4(lambda x, y, a: -a * y, (0., 1.), 1., 1000, args=(a,))
+
+    assert Y.shape == (1000, 3)
+    np.testing.assert_allclose(Y[-1], np.exp(-a), rtol=1E-9)
+
+
+def test_system_of_equations():
+    # y1' = y2, y2' = -4*y1: y1 = sin(2x)/2
+    f, jac = system(["y2", "-4*y1"])
+    y = np.array([.3, -.2])
+    np.testing.assert_allclose(f(1., y), [-.2, -1.2])
+    np.testing.assert_allclose(jac(1., y), [[0, 1], [-4, 0]])
+
+    X, Y, Yprime = erk4(f, (0., 5.), np.array([0., 1.]), 2000)
+    assert Y.shape == Yprime.shape == (2000, 2)
+    np.testing.assert_allclose(Y[:, 0], np.sin(2 * X) / 2, atol=1E-9)
+
+    X, Y, _ = ros1(["y2", "-4*y1"], (0., 5.), np.array([0., 1.]), .5, 2000)
+    np.testing.assert_allclose(Y[:, 0], np.sin(2 * X) / 2, atol=1E-4)
+
+
+def exact(X):
+    # y' = cos(x) - y, y(0) = 0
+    return (np.cos(X) + np.sin(X) - np.exp(-X)) / 2
+
+
+def observed_order(solver, n):
+    errors = [np.max(np.abs(Y - exact(X))) for X, Y, _ in (solver(n), solver(2 * n - 1))]
+    return np.log2(errors[0] / errors[1])
+
+
+@pytest.mark.parametrize("name, n", [("euler", 201), ("erk1", 201), ("erk2", 101), ("erk3", 51), ("erk4", 41),
+                                     ("rk5", 21), ("rk8", 6)])
+def test_convergence_order(name, n):
+    tableau = TABLEAUS[name]
+    order = observed_order(lambda n: explicit_rk(lambda x, y: np.cos(x) - y, (0., 2.), 0., tableau, n), n)
+    assert abs(order - tableau.order) < .3
+
+
+def test_custom_tableau():
+    # метод Хойна, таблица задана кортежем (A, b, c)
+    heun = ([[0, 0], [1, 0]], [.5, .5], [0, 1])
+    order = observed_order(lambda n: explicit_rk(lambda x, y: np.cos(x) - y, (0., 2.), 0., heun, n), 101)
+    assert abs(order - 2) < .3
+
+    with pytest.raises(ValueError):
+        ButcherTableau([[0, 1], [0, 0]], [.5, .5], [0, 1])
+
+
+@pytest.mark.parametrize("n", [0, 1])
+def test_too_few_points(n):
+    with pytest.raises(ValueError):
+        erk4(compiled("cos(x) - y"), (0., 1.), 0., n)
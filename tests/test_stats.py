@@ -0,0 +1,50 @@
+import numpy as np
+import pytest
+
+from kernel.equation import Equation
+from kernel.stats import SolveStats
+
+
+def test_fixed_step_counters():
+    equation = Equation("cos(x) - y")
+    equation.solve("erk4", (0., 1.), 0., n=101)
+    assert (equation.stats.f_evals, equation.stats.accepted, equation.stats.rejected) == (1 + 4 * 100, 100, 0)
+    assert equation.stats.method == "erk4"
+
+
+def test_counters_match_real_calls():
+    calls = []
+
+    def f(x, y):
+        calls.append(x)
+        return np.cos(x) - y
+
+    equation = Equation(f)
+    for method in ("erk4", "dopri5", "ros3"):
+        calls.clear()
+        equation.solve(method, (0., 5.), 0., n=100)
+        assert equation.stats.f_evals == len(calls), method
+
+
+def test_timing_memory_and_profile():
+    equation = Equation("cos(x) - y")
+    equation.solve("dopri5", (0., 5.), 0., n=1000, track_memory=True, profiler="cprofile")
+    stats = equation.stats
+
+    assert stats.integrate_time > 0 and stats.compile_time >= 0
+    assert stats.peak_memory > 0
+    assert "dopri5" in stats.profile or "adaptive" in stats.profile
+    assert "Вычислений f" in str(stats)
+
+
+def test_unknown_profiler():
+    with pytest.raises(ValueError):
+        Equation("-y").solve("erk4", (0., 1.), 1., n=10, profiler="unknown")
+
+
+def test_count_wrappers():
+    stats = SolveStats()
+    f = stats.count_f(lambda x, y: x + y)
+    jac = stats.count_jac(lambda x, y: 1.)
+    f(1, 2), f(3, 4), jac(0, 0)
+    assert (stats.f_evals, stats.jac_evals) == (2, 1)
@@ -0,0 +1,86 @@
+import numpy as np
+import pytest
+
+from kernel import store
+from kernel.solvers import stream
+
+FORMATS = [".npy", ".h5", ".parquet"]
+
+
+def solution(shape=()):
+    X = np.linspace(0., 1., 257)
+    scale = np.arange(1., np.prod(shape) + 1).reshape(shape)
+    return X, np.multiply.outer(np.sin(X), scale), np.multiply.outer(np.cos(X), scale)
+
+
+@pytest.fixture(params=FORMATS)
+def ext(request):
+    if request.param == ".h5":
+        pytest.importorskip("h5py")
+    if request.param == ".parquet":
+        pytest.importorskip("pyarrow")
+    return request.param
+
+
+@pytest.mark.parametrize("shape", [(), (3,), (4, 2)])
+@pytest.mark.parametrize("mmap", [True, False])
+def test_round_trip(tmp_path, ext, shape, mmap):
+    path = str(tmp_path / ("solution" + ext))
+    expected = solution(shape)
+
+    assert store.save_solution(path, expected) == 257
+    for column, loaded in zip(expected, store.load(path, mmap)):
+        assert loaded.shape == column.shape
+        np.testing.assert_array_equal(loaded, column)
+
+
+def test_hdf5_is_loaded_lazily(tmp_path):
+    h5py = pytest.importorskip("h5py")
+    path = str(tmp_path / "solution.h5")
+    X, Y, Yprime = solution((3,))
+    store.save_solution(path, (X, Y, Yprime))
+
+    loaded = store.load(path)
+    assert all(isinstance(column, h5py.Dataset) for column in loaded)
+    np.testing.assert_array_equal(loaded[1][100:110], Y[100:110])
+    assert all(isinstance(column, np.ndarray) for column in store.load(path, mmap=False))
+
+
+def test_round_trip_in_chunks(tmp_path, ext):
+    path = str(tmp_path / ("stream" + ext))
+    f = lambda x, y: np.cos(x) - y
+    expected = [np.concatenate(column) for column in zip(*stream("erk4", f, (0., 1.), 0., 1000, chunk=128, every=3))]
+
+    written = store.save(path, stream("erk4", f, (0., 1.), 0., 1000, chunk=128, every=3), length=334)
+    assert written == 334
+    for column, loaded in zip(expected, store.load(path)):
+        np.testing.assert_array_equal(loaded, column)
+
+
+@pytest.mark.parametrize("shape", [(), (2,)])
+def test_npy_is_truncated_to_written_points(tmp_path, shape):
+    path = str(tmp_path / "short.npy")
+    X, Y, Yprime = solution(shape)
+    writer = store.open_writer(path, 1000, shape)
+    writer.append(X[:143], Y[:143], Yprime[:143])
+    writer.close()
+
+    loaded = store.load(path)
+    assert len(np.load(path)) == 143
+    for column, loaded_column in zip((X, Y, Yprime), loaded):
+        np.testing.assert_array_equal(loaded_column, column[:143])
+
+
+def test_npy_overflow_and_missing_length(tmp_path):
+    writer = store.open_writer(str(tmp_path / "a.npy"), 10)
+    with pytest.raises(ValueError):
+        writer.append(np.zeros(11), np.zeros(11), np.zeros(11))
+    writer.close()
+
+    with pytest.raises(ValueError):
+        store.open_writer(str(tmp_path / "b.npy"))
+
+
+def test_unknown_format(tmp_path):
+    with pytest.raises(ValueError):
+        store.save_solution(str(tmp_path / "solution.txt"), solution())
@@ -0,0 +1,62 @@
+import numpy as np
+import pytest
+import sympy as sp
+
+from kernel import cache
+from kernel.high_ord_solver import high_order_solve, high_order_stream
+from kernel.solvers import STREAM_BLOCK, TABLEAUS, explicit_rk, stream
+from kernel.stats import SolveStats
+
+
+def compiled(f_str):
+    x, y = sp.symbols('x y')
+    return cache.lambdify((x, y), cache.sympify(f_str))
+
+
+FUNCTIONS = {"compiled": compiled("cos(x) - y"), "python": lambda x, y: np.cos(x) - y}
+
+
+@pytest.mark.parametrize("kind", FUNCTIONS)
+@pytest.mark.parametrize("method", ["euler", "erk4"])
+@pytest.mark.parametrize("every", [1, 7])
+def test_stream_matches_explicit_rk(kind, method, every):
+    f = FUNCTIONS[kind]
+    n = STREAM_BLOCK + 1234  # несколько блоков скомпилированного цикла
+    expected = explicit_rk(f, (0., 3.), 1., TABLEAUS[method], n)
+    chunks = list(stream(method, f, (0., 3.), 1., n, chunk=1000, every=every))
+
+    assert all(len(chunk[0]) == 1000 for chunk in chunks[:-1])
+    for column, streamed in zip(expected, zip(*chunks)):
+        np.testing.assert_array_equal(np.concatenate(streamed), column[::every])
+
+
+@pytest.mark.parametrize("kind", FUNCTIONS)
+def test_stream_stats(kind):
+    expected, streamed = SolveStats(), SolveStats()
+    explicit_rk(FUNCTIONS[kind], (0., 3.), 1., TABLEAUS["erk4"], 500, stats=expected)
+    list(stream("erk4", FUNCTIONS[kind], (0., 3.), 1., 500, chunk=64, stats=streamed))
+
+    assert (streamed.f_evals, streamed.accepted) == (expected.f_evals, expected.accepted) == (1997, 499)
+
+
+def test_stream_system():
+    f = lambda x, y: np.array([y[1], -4 * y[0]])
+    chunks = list(stream("erk4", f, (0., 3.), np.array([0., 1.]), 1000, chunk=300))
+    X, Y, _ = (np.concatenate(column) for column in zip(*chunks))
+
+    assert Y.shape == (1000, 2)
+    np.testing.assert_allclose(Y[:, 0], np.sin(2 * X) / 2, atol=1E-8)
+
+
+def test_unknown_method():
+    with pytest.raises(ValueError):
+        next(stream("erk7", FUNCTIONS["python"], (0., 1.), 0.))
+
+
+def test_stream_matches_solve():
+    X, Y, Yprime = high_order_solve(2, "y_2 + 4*y", (0., 5.), (0., 1., 0.), 1001)
+    chunks = list(high_order_stream(2, "y_2 + 4*y", (0., 5.), (0., 1., 0.), 1001, chunk=64, every=3))
+
+    assert all(len(chunk[0]) == 64 for chunk in chunks[:-1])
+    for column, streamed in zip((X, Y, Yprime), zip(*chunks)):
+        np.testing.assert_array_equal(np.concatenate(streamed), column[::3])
@@ -0,0 +1,71 @@
+import os
+import pickle
+
+import numpy as np
+import pytest
+
+from kernel.equation import Equation, sweep, sweep_grid
+
+
+def test_sweep_matches_serial_solves():
+    equation = Equation("cos(x) - y")
+    jobs = sweep_grid(["erk4", "dopri5", "ros3"], [(0., 2.), (0., 5.)], [0., 1.], n=300)
+    jobs.append(dict(method="erk4", interval=(0., 1.), y0=np.array([0., .5, 1.]), n=100))
+
+    results = dict(sweep(equation, jobs, workers=2))
+
+    assert sorted(results) == list(range(len(jobs)))
+    for i, job in enumerate(jobs):
+        expected = Equation("cos(x) - y").solve(get_solution=True, **job)
+        for column, expected_column in zip(results[i], expected):
+            np.testing.assert_array_equal(column, expected_column)
+
+
+def test_sweep_system():
+    jobs = [dict(method="erk4", interval=(0., 3.), y0=np.array([0., 1.]), n=500)]
+    (i, (X, Y, Yprime)), = sweep(Equation(["y2", "-4*y1"]), jobs, workers=1)
+    assert Y.shape == Yprime.shape == (500, 2)
+    np.testing.assert_allclose(Y[:, 0], np.sin(2 * X) / 2, atol=1E-6)
+
+
+def test_worker_state_excludes_solution():
+    equation = Equation("cos(x) - y")
+    equation.solve("erk4", (0., 1.), 0., n=100000)
+    state = pickle.loads(pickle.dumps(equation))
+
+    assert state.solution is None and state.stats is None
+    assert len(pickle.dumps(equation)) < 10000
+    np.testing.assert_array_equal(state.solve("erk4", (0., 1.), 0., n=100, get_solution=True)[1],
+                                  equation.solve("erk4", (0., 1.), 0., n=100, get_solution=True)[1])
+
+
+def test_sweep_requires_n():
+    with pytest.raises(ValueError):
+        list(sweep(Equation("cos(x) - y"), [dict(method="dopri5", interval=(0., 1.), y0=0., n=None)]))
+
+
+def test_sweep_rejects_functions():
+    with pytest.raises(ValueError):
+        list(sweep(Equation(lambda x, y: -y), sweep_grid(["erk4"], [(0., 1.)], [1.], n=10)))
+
+
+def shared_blocks():
+    return {name for name in os.listdir("/dev/shm") if name.startswith(("psm_", "wnsm_"))}
+
+
+@pytest.mark.skipif(not os.path.isdir("/dev/shm"), reason="нужен /dev/shm")
+def test_sweep_bounds_and_releases_shared_memory():
+    before = shared_blocks()
+    jobs = sweep_grid(["erk4"], [(0., 1.)], np.linspace(0., 1., 20), n=1000)
+
+    in_use = []
+    for i, solution in sweep(Equation("cos(x) - y"), jobs, workers=2):
+        in_use.append(len(shared_blocks() - before))
+    assert max(in_use) <= 4  # не больше 2 * workers блоков одновременно
+    assert shared_blocks() == before
+
+    # генератор закрыт раньше: оставшиеся задания отменяются, блоки освобождаются
+    results = sweep(Equation("cos(x) - y"), jobs, workers=2)
+    next(results)
+    results.close()
+    assert shared_blocks() == before
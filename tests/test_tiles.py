@@ -0,0 +1,41 @@
+import numpy as np
+import pytest
+
+from kernel.tiles import TiledSlopeField, tile_cache
+
+
+def f(x, y):
+    return x - y
+
+
+@pytest.mark.parametrize("n, xlim, ylim", [(30, (0., 1.), (0., 1.)),
+                                           (20, (-3.3, 7.1), (0., .37)),
+                                           (17, (100., 100.5), (-1., 1.))])
+def test_arrows_cover_view_at_requested_density(n, xlim, ylim):
+    X, Y, U, V = TiledSlopeField(f, n, n).arrows(xlim, ylim)
+
+    assert np.all((X >= xlim[0]) & (X <= xlim[1]) & (Y >= ylim[0]) & (Y <= ylim[1]))
+    assert n / 1.5 <= len(np.unique(X)) <= 1.5 * n
+    assert n / 1.5 <= len(np.unique(Y)) <= 1.5 * n
+    np.testing.assert_allclose(V / U, f(X, Y))
+
+
+def test_coarse_pass_is_sparser():
+    field = TiledSlopeField(f, 30, 30)
+    assert len(field.arrows((0., 1.), (0., 1.), coarse=True)[0]) < len(field.arrows((0., 1.), (0., 1.))[0]) / 2
+
+
+def test_pan_reuses_tiles_and_keeps_arrows_in_place():
+    field = TiledSlopeField(f, 32, 32)
+    X1, Y1, _, _ = field.arrows((0., 1.), (0., 1.))
+    misses = tile_cache.misses
+    X2, Y2, _, _ = field.arrows((.25, 1.25), (0., 1.))
+
+    assert tile_cache.misses - misses <= 2  # только новый столбец тайлов
+    shared = set(zip(X1, Y1)) & set(zip(X2, Y2))
+    assert len(shared) >= .6 * len(X1)
+
+
+def test_empty_view_is_rejected():
+    with pytest.raises(ValueError):
+        TiledSlopeField(f, 10, 10).arrows((1., 1.), (0., 1.))
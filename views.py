@@ -0,0 +1,64 @@
+from lod import DecimatedLine
+
+
+# Виды графика решения: (подпись x, подпись y, столбец по x, столбец по y)
+VIEWS = [("x", "y", 0, 1), ("y", "y'", 1, 2), ("x", "y'", 0, 2)]
+
+
+class SolutionViews:
+    """
+    Графики решения x-y, y-y' и x-y' на одной фигуре: у каждого вида свои оси и линия,
+    которые создаются один раз, а при новом решении только получают новые данные (set_data).
+    Переключение вида меняет видимость осей; если вид уже был нарисован и с тех пор
+    не менялся, его картинка восстанавливается из сохраненного буфера (blitting) без перерисовки.
+    """
+
+    def __init__(self, canvas, toolbar=None):
+        self.canvas = canvas
+        self.figure = canvas.figure
+        self.toolbar = toolbar
+        self.axes = []
+        self.lines = []
+        self.current = 0
+        self.backgrounds = {}  # вид -> (размер холста, сохраненная картинка)
+
+        canvas.mpl_connect('draw_event', self.on_draw)
+
+    def show(self, solution, view: int = 0):
+        """Показывает новое решение (x, y, y')."""
+        for k, (xlabel, ylabel, i, j) in enumerate(VIEWS):
+            if k == len(self.axes):
+                ax = self.figure.add_subplot(111, label=f"{xlabel}-{ylabel}")
+                ax.grid(True)
+                ax.set_xlabel(xlabel)
+                ax.set_ylabel(ylabel)
+                self.axes.append(ax)
+                self.lines.append(DecimatedLine(ax, solution[i], solution[j], monotonic=(i == 0)))
+            else:
+                self.lines[k].set_data(solution[i], solution[j])
+
+        if self.toolbar is not None:
+            self.toolbar.update()  # история масштабирования относится к старому решению
+        self.backgrounds.clear()
+        self.select(view)
+
+    def select(self, view: int):
+        if not self.axes:
+            return
+
+        self.current = view
+        for k, ax in enumerate(self.axes):
+            ax.set_visible(k == view)
+
+        size = self.canvas.get_width_height()
+        saved = self.backgrounds.get(view)
+        if saved is not None and saved[0] == size:
+            self.canvas.restore_region(saved[1])
+            self.canvas.blit(self.figure.bbox)
+        else:
+            self.canvas.draw_idle()
+
+    def on_draw(self, event):
+        if self.axes:
+            self.backgrounds[self.current] = (self.canvas.get_width_height(),
+                                              self.canvas.copy_from_bbox(self.figure.bbox))
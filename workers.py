@@ -0,0 +1,112 @@
+from PyQt5.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal
+from PyQt5.QtWidgets import *
+from PyQt5.QtGui import QFont
+
+from error_panels import solver_failed
+from kernel.progress import SolverCancelled
+from config import *
+
+
+class WorkerSignals(QObject):
+    progress = pyqtSignal(int)
+    finished = pyqtSignal(object)
+    failed = pyqtSignal(str)
+    cancelled = pyqtSignal()
+
+
+class SolveWorker(QRunnable):
+    """
+    Выполняет func(*args, progress=..., **kwargs) в пуле потоков.
+    О ходе вычисления и его результате сообщает сигналами WorkerSignals.
+    """
+
+    def __init__(self, func, *args, **kwargs):
+        super().__init__()
+        self.func = func
+        self.args = args
+        self.kwargs = kwargs
+        self.signals = WorkerSignals()
+
+        self._cancelled = False
+        self._percent = -1
+
+    def cancel(self):
+        self._cancelled = True
+
+    def report(self, fraction):
+        if self._cancelled:
+            raise SolverCancelled()
+
+        percent = int(100 * fraction)
+        if percent != self._percent:
+            self._percent = percent
+            self.signals.progress.emit(percent)
+
+    def run(self):
+        try:
+            result = self.func(*self.args, progress=self.report, **self.kwargs)
+        except SolverCancelled:
+            self.signals.cancelled.emit()
+            return
+        except Exception as error:
+            self.signals.failed.emit(str(error))
+            return
+
+        self.signals.finished.emit(result)
+
+
+class SolverRunner(QWidget):
+    """
+    Полоса прогресса и кнопка отмены. Запускает вычисление в фоновом потоке,
+    чтобы окно не зависало на больших n.
+    """
+    busy = pyqtSignal(bool)
+
+    def __init__(self):
+        super().__init__()
+        self.layout = QHBoxLayout()
+        self.worker = None
+
+        self.progress_bar = QProgressBar(self)
+        self.progress_bar.setRange(0, 100)
+        self.progress_bar.setValue(0)
+
+        self.cancel_btn = QPushButton("ОТМЕНА", self)
+        self.cancel_btn.setFont(QFont(LABELS_FONT, LABELS_FONTSIZE))
+        self.cancel_btn.setEnabled(False)
+        self.cancel_btn.clicked.connect(self.cancel)
+
+        self.layout.addWidget(self.progress_bar)
+        self.layout.addWidget(self.cancel_btn)
+        self.setLayout(self.layout)
+
+    def start(self, on_finished, func, *args, **kwargs):
+        """Запускает func(*args, **kwargs); результат передается в on_finished."""
+        if self.worker is not None:
+            return
+
+        self.worker = SolveWorker(func, *args, **kwargs)
+        self.worker.signals.progress.connect(self.progress_bar.setValue)
+        self.worker.signals.finished.connect(self.done)
+        self.worker.signals.finished.connect(lambda _: self.progress_bar.setValue(100))
+        self.worker.signals.finished.connect(on_finished)
+        self.worker.signals.failed.connect(self.done)
+        self.worker.signals.failed.connect(solver_failed)
+        self.worker.signals.cancelled.connect(self.done)
+
+        self.progress_bar.setValue(0)
+        self.cancel_btn.setEnabled(True)
+        self.busy.emit(True)
+        QThreadPool.globalInstance().start(self.worker)
+
+    def cancel(self):
+        if self.worker is not None:
+            self.worker.cancel()
+
+    def done(self, *_):
+        self.worker = None
+        self.cancel_btn.setEnabled(False)
+        self.busy.emit(False)
+
+    def wait(self):
+        QThreadPool.globalInstance().waitForDone()